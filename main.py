@@ -1,23 +1,74 @@
+import time
+STARTED = time.perf_counter() # Reference point for the startup timings below
+
+import argparse
+import json
 import sys
 import traceback
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 
+class StartupTimer:
+    """Records time-to-first-window, time-to-first-frame (the warmed-up generator's preview)
+    and time-to-first-page (Data Management's first DB answer, rows or error).
+
+    All are measured from process start and recorded into METRICS as
+    startup.<name>. The model and the database both load in the background,
+    so neither delays the first window. With `out_path`, the timings are
+    written as JSON and the application quits once all of them are in.
+    """
+
+    MARKS = ("first_window", "first_frame", "first_page")
+
+    def __init__(self, out_path=None):
+        self.out_path = out_path
+        self.timings = {}
+
+    def mark(self, name):
+        if name in self.timings:
+            return # Only the first occurrence counts
+        from src.metrics import METRICS
+        seconds = time.perf_counter() - STARTED
+        self.timings[name] = seconds
+        METRICS.observe(f"startup.{name}", seconds)
+        print(f"[INFO] Startup: {name} after {seconds:.2f}s")
+        if self.out_path and all(m in self.timings for m in self.MARKS):
+            with open(self.out_path, "w") as f:
+                json.dump(self.timings, f, indent=2)
+            QApplication.instance().quit()
+
+    def on_first_frame(self, model_seconds):
+        self.timings["model_load"] = model_seconds
+        self.mark("first_frame")
+
 def main():
+    parser = argparse.ArgumentParser(description="SteelAI-GAN application.")
+    parser.add_argument("--measure-startup", metavar="PATH", default=None,
+                        help="Write startup timings (JSON) here and quit once the first frame is shown.")
+    args, qt_args = parser.parse_known_args()
+
     print("[DEBUG] Starting application...")
     try:
-        app = QApplication(sys.argv)
+        app = QApplication(sys.argv[:1] + qt_args)
         print("[DEBUG] QApplication created.")
+        startup = StartupTimer(args.measure_startup)
         
         from src.ui.main_window import MainWindow
         print("[DEBUG] Imported MainWindow.")
         
         window = MainWindow()
+        window.dashboard_tab.model_ready.connect(startup.on_first_frame)
+        window.data_tab.model.page_loaded.connect(lambda rows: startup.mark("first_page"))
+        window.data_tab.model.load_failed.connect(lambda message: startup.mark("first_page"))
         print("[DEBUG] MainWindow initialized.")
         
         window.show()
+        QTimer.singleShot(0, lambda: startup.mark("first_window")) # After the first paint
         print("[DEBUG] Window shown. Entering event loop.")
         
-        sys.exit(app.exec_())
+        code = app.exec_()
+        window.close() # Stops workers when quitting without a close event
+        sys.exit(code)
     except Exception:
         print("[ERROR] Critical failure in main:")
         traceback.print_exc()
@@ -0,0 +1,260 @@
+"""Benchmark suite for the hot paths, with baseline regression checks.
+
+Usage:
+    python -m src.benchmarks --out bench.json                 # run, print and save results
+    python -m src.benchmarks --baseline bench_baseline.json   # also fail (exit 1) on regressions
+    python -m src.benchmarks --update-baseline bench_baseline.json
+    python -m src.benchmarks --quick --only mock db           # smaller workloads, selected groups
+
+Every metric records its unit and whether higher is better. A metric
+regresses when it is worse than the baseline by more than --threshold
+(relative). Baselines are only meaningful on the machine that recorded them,
+so the machine info of both runs is stored and a mismatch is reported.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+GROUPS = ("generator", "train", "ingest", "db", "mock", "startup")
+
+def machine_info():
+    import numpy as np
+    import cv2
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+    try:
+        import torch
+        info.update(torch=torch.__version__, torch_threads=torch.get_num_threads(),
+                    cuda=torch.cuda.get_device_name(0) if torch.cuda.is_available() else None)
+    except ImportError:
+        info["torch"] = None
+    return info
+
+def measure(fn, repeat=3, warmup=1):
+    """Median wall time of fn() over `repeat` runs, after `warmup` untimed runs."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+def metric(value, unit, higher_is_better=True):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+def bench_generator(quick):
+    import torch
+    from gan.model import Generator
+    torch.manual_seed(0)
+    netG = Generator(100).eval()
+    results = {}
+    for batch_size in ((1, 4) if quick else (1, 8, 32)):
+        noise = torch.randn(batch_size, 100, 1, 1)
+        with torch.inference_mode():
+            seconds = measure(lambda: netG(noise), repeat=2 if quick else 3)
+        results[f"generator_forward_bs{batch_size}"] = metric(batch_size / seconds, "img/s")
+    return results
+
+def bench_train(quick):
+    import torch
+    from gan.trainer import GANTrainer
+    torch.manual_seed(0)
+    batch_size = 4 if quick else 16
+    with tempfile.TemporaryDirectory() as tmp:
+        trainer = GANTrainer(None, torch.device("cpu"), checkpoint_dir=tmp)
+        real = torch.randn(batch_size, 3, 256, 256)
+        seconds = measure(lambda: trainer.train_step(real), repeat=2 if quick else 3)
+    return {"train_step": metric(batch_size / seconds, "img/s")}
+
+def bench_ingest(quick):
+    import numpy as np
+    import cv2
+    from data.ingestion import ImageLoader, ImageProcessor, IngestionPipeline
+    count = 16 if quick else 64
+    repeat = 2 if quick else 3 # Same sampling as the other groups; one cold run is too noisy to gate on
+    rng = np.random.default_rng(0)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "raw")
+        os.makedirs(raw)
+        for i in range(count):
+            cv2.imwrite(os.path.join(raw, f"img_{i:04d}.png"), rng.integers(0, 255, (512, 512, 3), dtype=np.uint8))
+        loader = ImageLoader(raw_data_path=raw, processed_path=os.path.join(tmp, "processed"))
+        processor = ImageProcessor()
+
+        def serial():
+            for name in sorted(os.listdir(raw)):
+                img = loader.load_image(os.path.join(raw, name))
+                img = processor.resize_image(processor.crop_roi(img, 64, 64, 384, 384))
+                loader.save_image(img, name, subfolder="serial")
+        results["ingest_serial"] = metric(count / measure(serial, repeat=repeat), "files/s")
+
+        def pipeline():
+            # Fresh output folder each run, so nothing is skipped as unchanged
+            subfolder = f"pipeline_{time.perf_counter_ns()}"
+            IngestionPipeline(loader, subfolder=subfolder, roi=(64, 64, 384, 384), workers=os.cpu_count() or 1,
+                              report_every=float("inf")).run()
+        results["ingest_pipeline"] = metric(count / measure(pipeline, repeat=repeat), "files/s")
+    return results
+
+def bench_db(quick):
+    from datetime import datetime
+    from database.db_manager import DBManager
+    rows = 20000 if quick else 200000
+    repeat = 2 if quick else 3
+    results = {}
+    records = [{"filename": f"gen_{i}.png", "file_path": f"data/generated/gen_{i}.png",
+                "image_type": "generated", "defect_type": ("crack", "hole", "nut")[i % 3], "latent_seed": i}
+               for i in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        # Inserts into an empty DB each time (untimed setup), sampled like measure(): warmup + median
+        times = []
+        for run in range(1 + repeat):
+            db = DBManager(db_url=f"sqlite:///{os.path.join(tmp, f'bench_{run}.db')}")
+            t0 = time.perf_counter()
+            db.bulk_insert_images(records)
+            times.append(time.perf_counter() - t0)
+            if run < repeat:
+                db.engine.dispose()
+        results["db_bulk_insert"] = metric(rows / statistics.median(times[1:]), "rows/s")
+
+        first = db.fetch_image_page(limit=500)
+        after = (first[-1][4], first[-1][0])
+        results["db_page_query"] = metric(measure(lambda: db.fetch_image_page(after=after, limit=500)) * 1000.0,
+                                          "ms", higher_is_better=False)
+        # created_at is stored in UTC, so filter on the UTC date or the count is empty around midnight
+        today = datetime.utcnow().date()
+        results["db_filtered_count"] = metric(
+            measure(lambda: db.count_images(date=today, type_filter="crack")) * 1000.0,
+            "ms", higher_is_better=False)
+        db.engine.dispose()
+    return results
+
+def bench_mock(quick):
+    import numpy as np
+    from gan.inference import DefectGenerator
+    gen = DefectGenerator(z_dim=100, device="cpu")
+    gen.netG = None # Mock Mode
+    base = np.full((256, 256, 3), 120, dtype=np.uint8)
+    out = np.empty((256, 256, 3), dtype=np.uint8)
+    frames = 500 if quick else 3000
+
+    def loop():
+        for _ in range(frames):
+            gen.generate_image(base_image=base, out=out)
+    return {"mock_generate_image": metric(frames / measure(loop), "frames/s")}
+
+def bench_startup(quick):
+    """Launches the GUI (offscreen) via main.py --measure-startup; median of the reported timings."""
+    main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    runs = []
+    for _ in range(1 if quick else 3):
+        with tempfile.TemporaryDirectory() as tmp: # main.py writes data/ and the SQLite DB into the cwd
+            out = os.path.join(tmp, "startup.json")
+            # Pinned to SQLite so first_page never depends on (or waits for) a MySQL server
+            env = dict(os.environ, QT_QPA_PLATFORM="offscreen", DB_TYPE="sqlite")
+            subprocess.run([sys.executable, main_py, "--measure-startup", out], cwd=tmp, env=env,
+                           stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           timeout=300, check=True)
+            with open(out) as f:
+                runs.append(json.load(f))
+    return {f"startup_{name}": metric(statistics.median(run[name] for run in runs), "s", higher_is_better=False)
+            for name in ("first_window", "first_frame", "first_page")}
+
+BENCHMARKS = {
+    "generator": bench_generator,
+    "train": bench_train,
+    "ingest": bench_ingest,
+    "db": bench_db,
+    "mock": bench_mock,
+    "startup": bench_startup,
+}
+
+def run_suite(groups=GROUPS, quick=False):
+    metrics = {}
+    for group in groups:
+        t0 = time.perf_counter()
+        metrics.update(BENCHMARKS[group](quick))
+        print(f"[INFO] {group} benchmarks done in {time.perf_counter() - t0:.1f}s")
+    return {"machine": machine_info(), "quick": quick, "timestamp": time.time(), "metrics": metrics}
+
+def compare(results, baseline, threshold=0.15):
+    """Per-metric comparison. Returns a list of dicts with name, value, baseline, change and regressed."""
+    report = []
+    for name, current in results["metrics"].items():
+        previous = baseline["metrics"].get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = current["value"] / previous["value"] - 1.0
+        worse = -change if current["higher_is_better"] else change
+        report.append({
+            "name": name,
+            "value": current["value"],
+            "baseline": previous["value"],
+            "unit": current["unit"],
+            "change": change,
+            "regressed": worse > threshold,
+        })
+    return report
+
+def print_report(results, report=None):
+    for name, m in results["metrics"].items():
+        print(f"  {name:<28} {m['value']:>12.2f} {m['unit']}")
+    if report:
+        print("[INFO] Against baseline:")
+        for r in report:
+            flag = "REGRESSED" if r["regressed"] else "ok"
+            print(f"  {r['name']:<28} {r['change'] * 100:+7.1f}%  ({r['baseline']:.2f} -> {r['value']:.2f} {r['unit']})  {flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hot paths and compare against a baseline.")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads (smoke runs, CI).")
+    parser.add_argument("--out", default=None, help="Write results JSON here.")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against.")
+    parser.add_argument("--update-baseline", default=None, metavar="PATH", help="Save results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown per metric.")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.only, quick=args.quick)
+    report = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != results["machine"]:
+            print("[WARNING] Baseline was recorded on a different machine/software stack; comparisons are rough.")
+        if baseline.get("quick") != results["quick"]:
+            print("[WARNING] Baseline and this run use different workload sizes (--quick).")
+        report = compare(results, baseline, args.threshold)
+    print_report(results, report)
+
+    for path in (args.out, args.update_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    regressed = [r["name"] for r in report or [] if r["regressed"]]
+    if regressed:
+        print(f"[ERROR] {len(regressed)} metric(s) regressed beyond {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import os
+import threading
+from collections import OrderedDict
+import cv2
+
+class ImageCache:
+    """LRU cache of decoded RGB images keyed by path, invalidated when the file's mtime/size changes.
+
+    Each entry holds the full-resolution RGB image plus any resized variants
+    requested so far. Cached arrays are read-only; copy before drawing on them.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict() # path -> {"stamp": (mtime_ns, size), "variants": {key: array}}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _freeze(img):
+        img.setflags(write=False)
+        return img
+
+    def _entry_bytes(self, entry):
+        return sum(v.nbytes for v in entry["variants"].values())
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= self._entry_bytes(entry)
+
+    def _lookup(self, path):
+        """Returns the valid cache entry for `path`, decoding it on a miss."""
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry["stamp"] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                # File changed on disk: drop every stale variant
+                del self._entries[path]
+                self.current_bytes -= self._entry_bytes(entry)
+
+        bgr_img = cv2.imread(str(path))
+        if bgr_img is None:
+            raise ValueError(f"Failed to read image: {path}")
+        rgb_img = self._freeze(cv2.cvtColor(bgr_img, cv2.COLOR_BGR2RGB))
+
+        entry = {"stamp": stamp, "variants": {"rgb": rgb_img}}
+        with self._lock:
+            self.misses += 1
+            existing = self._entries.pop(path, None)
+            if existing is not None:
+                # Another thread missed the same path concurrently and inserted first
+                if existing["stamp"] == stamp:
+                    self._entries[path] = existing
+                    return existing
+                self.current_bytes -= self._entry_bytes(existing)
+            self._entries[path] = entry
+            self.current_bytes += rgb_img.nbytes
+            self._evict()
+        return entry
+
+    def get(self, path):
+        """Full-resolution RGB image."""
+        return self._lookup(path)["variants"]["rgb"]
+
+    def get_resized(self, path, size=(256, 256)):
+        """RGB image resized to `size` (w, h), computed once per file version."""
+        entry = self._lookup(path)
+        key = ("rgb", tuple(size))
+        variant = entry["variants"].get(key)
+        if variant is None:
+            variant = self._freeze(cv2.resize(entry["variants"]["rgb"], tuple(size)))
+            with self._lock:
+                if path in self._entries and self._entries[path] is entry:
+                    entry["variants"][key] = variant
+                    self.current_bytes += variant.nbytes
+                    self._evict()
+        return variant
+
+    def invalidate(self, path=None):
+        """Drops one path, or everything when `path` is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            elif path in self._entries:
+                self.current_bytes -= self._entry_bytes(self._entries.pop(path))
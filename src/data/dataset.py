@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import cv2
+import numpy as np
+
+try:
+    import torch
+    from torch.utils.data import Dataset, DataLoader, Sampler
+except (ImportError, OSError):
+    torch = None
+    Dataset = Sampler = object
+    DataLoader = None
+
+from .ingestion import DataOrganizer, ImageProcessor
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+class CategoryImageDataset(Dataset):
+    """Training Dataset over the data/processed/<category> layout created by DataOrganizer.
+
+    Every image is decoded and resized once into a uint8 N x H x W x 3 memmap
+    under `cache_dir`; later epochs (and DataLoader workers) read straight from it.
+    The cache is keyed by the file list, mtimes and target size, so adding or
+    editing an image triggers a rebuild (and removes the superseded cache).
+    Without `categories`, the DataOrganizer categories present under `root` are
+    used, so other folders there (ingestion output, test runs) are not picked up.
+    Items are (float C x H x W in -1..1, label).
+    """
+
+    def __init__(self, root="data/processed", categories=None, size=256, cache_dir=None):
+        self.root = Path(root)
+        self.size = size
+        if categories is None:
+            categories = sorted(c for c in DataOrganizer.CATEGORIES if (self.root / c).is_dir())
+        self.categories = list(categories)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.root / ".cache"
+
+        self.files = []
+        labels = []
+        for label, category in enumerate(self.categories):
+            cat_dir = self.root / category
+            if not cat_dir.is_dir():
+                raise ValueError(f"Unknown category: {category} (no folder at {cat_dir})")
+            for path in sorted(cat_dir.iterdir()):
+                if path.suffix.lower() in IMAGE_EXTENSIONS:
+                    self.files.append(path)
+                    labels.append(label)
+        self.labels = np.array(labels, dtype=np.int64)
+
+        self.cache_path = self._build_cache()
+        self._images = None
+
+    def _fingerprint(self):
+        h = hashlib.sha1(f"{self.size}".encode())
+        for path in self.files:
+            st = path.stat()
+            h.update(f"{path.relative_to(self.root)}|{st.st_mtime_ns}|{st.st_size}\n".encode())
+        return h.hexdigest()[:16]
+
+    def _build_cache(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_path = self.cache_dir / f"images_{self._fingerprint()}.u8"
+        if cache_path.exists() or not self.files:
+            return cache_path
+
+        print(f"[INFO] Building image cache for {len(self.files)} files: {cache_path}")
+        tmp_path = cache_path.with_suffix(".tmp")
+        images = np.memmap(tmp_path, dtype=np.uint8, mode="w+", shape=(len(self.files), self.size, self.size, 3))
+        for i, path in enumerate(self.files):
+            img = cv2.imread(str(path))
+            if img is None:
+                raise ValueError(f"Failed to read image: {path}")
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            images[i] = ImageProcessor.resize_image(img, (self.size, self.size))
+        images.flush()
+        del images
+        os.replace(tmp_path, cache_path) # Only complete caches are ever visible
+        with open(cache_path.with_suffix(".json"), "w") as f:
+            json.dump({"files": [str(p) for p in self.files], "size": self.size}, f)
+        for stale in self.cache_dir.glob("images_*.u8"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+                stale.with_suffix(".json").unlink(missing_ok=True)
+        return cache_path
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_images"] = None # Workers map the cache themselves
+        return state
+
+    @property
+    def images(self):
+        if self._images is None:
+            self._images = np.memmap(self.cache_path, dtype=np.uint8, mode="r",
+                                     shape=(len(self.files), self.size, self.size, 3))
+        return self._images
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, i):
+        img = torch.from_numpy(np.array(self.images[i])).permute(2, 0, 1).float()
+        return img / 127.5 - 1.0, int(self.labels[i])
+
+    def category_counts(self):
+        return {cat: int((self.labels == label).sum()) for label, cat in enumerate(self.categories)}
+
+class EpochSampler(Sampler):
+    """Deterministic per-epoch shuffling, optionally class-balanced.
+
+    The order depends only on (seed, epoch), so runs are reproducible and
+    resumable. With `balance`, every category contributes the same number of
+    samples per epoch (smaller ones are drawn with replacement).
+    """
+
+    def __init__(self, labels, seed=0, balance=False, shuffle=True):
+        self.labels = np.asarray(labels)
+        self.seed = seed
+        self.balance = balance
+        self.shuffle = shuffle
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _indices(self):
+        rng = np.random.default_rng((self.seed, self.epoch))
+        if not self.balance:
+            indices = np.arange(len(self.labels))
+            return rng.permutation(indices) if self.shuffle else indices
+
+        groups = [np.flatnonzero(self.labels == label) for label in np.unique(self.labels)]
+        per_class = max(len(g) for g in groups)
+        picks = [g if len(g) == per_class else rng.choice(g, per_class, replace=True) for g in groups]
+        indices = np.concatenate(picks)
+        return rng.permutation(indices) if self.shuffle else indices
+
+    def __iter__(self):
+        return iter(self._indices().tolist())
+
+    def __len__(self):
+        if not self.balance:
+            return len(self.labels)
+        counts = np.unique(self.labels, return_counts=True)[1]
+        return int(counts.max() * len(counts)) if len(counts) else 0
+
+def make_dataloader(dataset, batch_size=64, num_workers=0, pin_memory=True, seed=0, balance=False,
+                    drop_last=True):
+    """DataLoader over a CategoryImageDataset with an EpochSampler (call loader.sampler.set_epoch each epoch)."""
+    sampler = EpochSampler(dataset.labels, seed=seed, balance=balance)
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        sampler=sampler,
+        num_workers=num_workers,
+        pin_memory=pin_memory and torch.cuda.is_available(),
+        persistent_workers=num_workers > 0,
+        prefetch_factor=4 if num_workers > 0 else None,
+        drop_last=drop_last,
+    )
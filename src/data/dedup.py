@@ -0,0 +1,129 @@
+import hashlib
+import threading
+from collections import defaultdict
+import cv2
+import numpy as np
+
+HASH_BITS = 64
+
+def content_hash(data):
+    """Hex digest identifying a file's bytes (hashlib releases the GIL on large buffers)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def perceptual_hash(img):
+    """64-bit DCT perceptual hash of an HxWx3 (or HxW) uint8 image.
+
+    Low-frequency DCT coefficients of a 32x32 grayscale thumbnail are compared
+    with their median, so re-encoding, small resizes and mild noise flip only a
+    few bits while different content differs in about half of them.
+    """
+    small = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    if small.ndim == 3:
+        small = small.mean(axis=2) # Channel-order agnostic: ingestion hashes BGR, generation RGB
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:]) # Skip the DC term, it only encodes brightness
+    return int(np.packbits(bits).view(">u8")[0])
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+def to_signed64(h):
+    """Maps an unsigned 64-bit hash into BigInteger (signed) column range."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def from_signed64(h):
+    return h + (1 << 64) if h < 0 else h
+
+class DuplicateIndex:
+    """Exact (content hash) and near (perceptual hash) duplicate lookup.
+
+    Near-duplicate search is a multi-index hash: each 64-bit hash is split
+    into `radius + 1` disjoint chunks and filed under every chunk value. Two
+    hashes within Hamming distance `radius` must agree exactly on at least one
+    chunk (pigeonhole), so a query only inspects the hashes sharing one of its
+    chunks instead of the whole index. Thread-safe.
+    """
+
+    def __init__(self, radius=4):
+        self.radius = radius
+        self.num_chunks = radius + 1
+        bounds = np.linspace(0, HASH_BITS, self.num_chunks + 1).astype(int)
+        self._chunks = [(int(lo), (1 << int(hi - lo)) - 1) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        self._exact = {} # content hash -> key
+        self._hashes = {} # key -> perceptual hash
+        self._tables = [defaultdict(list) for _ in self._chunks]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, key):
+        """True if `key` was indexed with a perceptual hash."""
+        return key in self._hashes
+
+    def _chunk_values(self, phash):
+        return [(phash >> shift) & mask for shift, mask in self._chunks]
+
+    def _add(self, key, content_hash, phash):
+        if content_hash is not None:
+            self._exact.setdefault(content_hash, key)
+        if phash is not None:
+            self._hashes[key] = phash
+            for table, value in zip(self._tables, self._chunk_values(phash)):
+                table[value].append(key)
+
+    def add(self, key, content_hash=None, phash=None):
+        with self._lock:
+            self._add(key, content_hash, phash)
+
+    def _find(self, content_hash, phash, exclude):
+        if content_hash is not None:
+            key = self._exact.get(content_hash)
+            if key is not None and key != exclude:
+                return key, 0
+        if phash is None:
+            return None
+        best = None
+        for table, value in zip(self._tables, self._chunk_values(phash)):
+            for key in table.get(value, ()):
+                if key == exclude:
+                    continue
+                distance = hamming(phash, self._hashes[key])
+                if distance <= self.radius and (best is None or distance < best[1]):
+                    best = (key, distance)
+        return best
+
+    def find(self, content_hash=None, phash=None, exclude=None):
+        """(key, distance) of an indexed duplicate (exact match first), or None. `exclude` skips one key."""
+        with self._lock:
+            return self._find(content_hash, phash, exclude)
+
+    def query(self, phash, radius=None):
+        """All (key, distance) pairs within `radius` (<= the index radius) of `phash`, nearest first."""
+        radius = self.radius if radius is None else min(radius, self.radius)
+        with self._lock:
+            candidates = {key for table, value in zip(self._tables, self._chunk_values(phash))
+                          for key in table.get(value, ())}
+            matches = [(key, hamming(phash, self._hashes[key])) for key in candidates]
+        return sorted((m for m in matches if m[1] <= radius), key=lambda m: m[1])
+
+    def add_if_new(self, key, content_hash=None, phash=None):
+        """Atomically checks and inserts. Returns the duplicate's (key, distance), or None if `key` was added."""
+        with self._lock:
+            match = self._find(content_hash, phash, exclude=key)
+            if match is None:
+                self._add(key, content_hash, phash)
+            return match
+
+    def add_image_if_new(self, key, img, data=None):
+        """add_if_new for a decoded image (and optionally its encoded bytes), hashing it here."""
+        return self.add_if_new(key, None if data is None else content_hash(data), perceptual_hash(img))
+
+    @classmethod
+    def from_db(cls, db_manager, radius=4):
+        """Index over every ImageRecord that has hashes, keyed by file_path (as ingestion and generation key theirs)."""
+        index = cls(radius=radius)
+        for file_path, content_hash, phash in db_manager.iter_image_hashes():
+            index.add(file_path, content_hash, None if phash is None else from_signed64(phash))
+        return index
@@ -1,9 +1,24 @@
+import argparse
+import json
 import os
 import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from pathlib import Path
 
+from .dedup import DuplicateIndex, content_hash, perceptual_hash, to_signed64
+from .writer import png_params
+try:
+    from src.metrics import METRICS
+except ImportError:
+    from metrics import METRICS
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
 class ImageLoader:
     def __init__(self, raw_data_path="data/raw", processed_path="data/processed"):
         self.raw_data_path = Path(raw_data_path)
@@ -13,6 +28,7 @@ class ImageLoader:
         self.raw_data_path.mkdir(parents=True, exist_ok=True)
         self.processed_path.mkdir(parents=True, exist_ok=True)
 
+    @METRICS.timed("loader.load_image")
     def load_image(self, filepath):
         """Loads an image from a path."""
         if not os.path.exists(filepath):
@@ -27,6 +43,7 @@ class ImageLoader:
         img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         return img
 
+    @METRICS.timed("loader.save_image")
     def save_image(self, img, filename, subfolder=""):
         """Saves an image to the processed directory."""
         save_dir = self.processed_path / subfolder
@@ -40,9 +57,11 @@ class ImageLoader:
         return str(full_path)
 
 class DataOrganizer:
+    CATEGORIES = ("normal", "defect_nut", "defect_crack", "defect_hole")
+
     def __init__(self, base_path="data/processed"):
         self.base_path = Path(base_path)
-        self.categories = ["normal", "defect_nut", "defect_crack", "defect_hole"]
+        self.categories = list(self.CATEGORIES)
         
         for cat in self.categories:
             (self.base_path / cat).mkdir(parents=True, exist_ok=True)
@@ -80,9 +99,281 @@ class ImageProcessor:
         """Resizes image to target size."""
         return cv2.resize(img, size)
 
+class IngestionPipeline:
+    """Walks a directory and runs read -> decode -> crop -> resize -> encode -> save on a thread pool.
+
+    OpenCV releases the GIL, so the stages of different files overlap across
+    threads. At most `max_in_flight` files are being processed at once, which
+    bounds memory however large the directory is. A manifest in the output
+    folder records each source file's mtime/size and the crop/resize params it
+    was processed with; files unchanged since the last run under the same
+    params (and whose output still exists) are skipped without being read.
+
+    Content and perceptual hashes are only computed when something uses them.
+    With a DuplicateIndex, exact copies are dropped before decoding and near
+    duplicates (perceptual hash of the processed image within the index
+    radius) before encoding. With a DBManager, an ImageRecord carrying both
+    hashes is inserted for every file written, `db_batch_size` rows at a time.
+
+    Pixels stay in OpenCV's BGR order end to end: crop and resize do not care
+    about channel order, so the RGB round trip of load_image/save_image is skipped.
+    """
+
+    MANIFEST = "ingest_manifest.json"
+    STAGES = ("read", "decode", "crop", "resize", "hash", "encode", "save")
+    OUTCOMES = ("processed", "skipped", "duplicate", "failed")
+
+    def __init__(self, loader=None, processor=None, subfolder="", size=(256, 256), roi=None,
+                 workers=4, max_in_flight=None, compression=None, report_every=5.0,
+                 dedup=None, db_manager=None, defect_type=None, db_batch_size=1000):
+        self.loader = loader if loader is not None else ImageLoader()
+        self.processor = processor if processor is not None else ImageProcessor()
+        self.out_dir = self.loader.processed_path / subfolder
+        self.size = size
+        self.roi = roi # (x, y, w, h) applied to every image, or None for the full frame
+        self.workers = max(1, workers)
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.compression = compression # None: OpenCV's default level (see png_params)
+        self.report_every = report_every
+        self.dedup = dedup
+        self.db_manager = db_manager
+        self.defect_type = defect_type
+        self.db_batch_size = db_batch_size
+
+        self.timings = {stage: 0.0 for stage in self.STAGES}
+        self._timing_lock = threading.Lock()
+
+    def iter_files(self, src_dir):
+        """Image files under `src_dir`, in a stable order, yielded lazily."""
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+    @property
+    def hashing(self):
+        return self.dedup is not None or self.db_manager is not None
+
+    @property
+    def params_key(self):
+        """Identifies the processing params; outputs made with other params are redone."""
+        return f"size={self.size}|roi={self.roi}"
+
+    def load_manifest(self):
+        """{relative source path: {"stamp", "params", "hash", "phash"}} from the previous run."""
+        path = self.out_dir / self.MANIFEST
+        if not path.exists():
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        path = self.out_dir / self.MANIFEST
+        tmp_path = str(path) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def output_path(self, rel_path):
+        return self.out_dir / Path(rel_path).with_suffix(".png")
+
+    def _add_timings(self, stages):
+        with self._timing_lock:
+            for stage, seconds in stages.items():
+                self.timings[stage] += seconds
+        for stage, seconds in stages.items():
+            METRICS.observe(f"ingest.{stage}", seconds)
+
+    def _process(self, src_path, rel_path, previous):
+        """Runs one file through every stage. Returns (outcome, manifest entry)."""
+        stages = {}
+        t0 = time.perf_counter()
+        st = os.stat(src_path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        out_path = self.output_path(rel_path)
+        key = str(out_path) # Same key as the records DuplicateIndex.from_db loads
+        unchanged = (previous is not None and previous.get("params") == self.params_key
+                     and out_path.exists())
+        # A run that now hashes cannot reuse entries recorded without hashes
+        if unchanged and previous.get("stamp") == stamp and (not self.hashing or previous.get("hash")):
+            self._add_timings({"read": time.perf_counter() - t0})
+            return "skipped", previous
+        with open(src_path, "rb") as f:
+            data = f.read()
+        digest = content_hash(data) if self.hashing else None
+        t1 = time.perf_counter()
+        stages["read"] = t1 - t0
+        if unchanged and digest is not None and previous.get("hash") == digest:
+            self._add_timings(stages)
+            return "skipped", {**previous, "stamp": stamp} # Touched, same bytes
+        if self.dedup is not None and self.dedup.find(content_hash=digest, exclude=key):
+            self._add_timings(stages)
+            return "duplicate", {"stamp": stamp, "params": self.params_key, "hash": digest, "phash": None}
+
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError(f"Failed to read image: {src_path}")
+        t2 = time.perf_counter()
+        if self.roi is not None:
+            img = self.processor.crop_roi(img, *self.roi)
+        t3 = time.perf_counter()
+        if self.size is not None:
+            img = self.processor.resize_image(img, self.size)
+        t4 = time.perf_counter()
+        phash = perceptual_hash(img) if self.hashing else None
+        entry = {"stamp": stamp, "params": self.params_key, "hash": digest, "phash": phash}
+        if self.dedup is not None and self.dedup.add_if_new(key, digest, phash):
+            stages.update(decode=t2 - t1, crop=t3 - t2, resize=t4 - t3, hash=time.perf_counter() - t4)
+            self._add_timings(stages)
+            return "duplicate", entry
+        t5 = time.perf_counter()
+        ok, buf = cv2.imencode(".png", img, png_params(self.compression))
+        if not ok:
+            raise ValueError(f"Failed to encode image: {src_path}")
+        t6 = time.perf_counter()
+
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = str(out_path) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buf.tobytes())
+        os.replace(tmp_path, out_path) # The manifest never points at a torn file
+        t7 = time.perf_counter()
+
+        stages.update(decode=t2 - t1, crop=t3 - t2, resize=t4 - t3, hash=t5 - t4, encode=t6 - t5, save=t7 - t6)
+        self._add_timings(stages)
+        return "processed", entry
+
+    def summary(self, counts, elapsed):
+        """Outcome counts, files/sec and mean per-file milliseconds for each stage."""
+        seen = counts["processed"] + counts["skipped"] + counts["duplicate"]
+        return {
+            **counts,
+            "elapsed_sec": elapsed,
+            "files_per_sec": seen / elapsed if elapsed > 0 else 0.0,
+            # Averaged over every file that got past reading, so skipped files lower later stages
+            "stage_ms": {stage: (t / seen * 1000.0 if seen else 0.0) for stage, t in self.timings.items()},
+        }
+
+    def _report(self, stats, final=False):
+        stage_str = ", ".join(f"{stage} {ms:.2f} ms" for stage, ms in stats["stage_ms"].items())
+        prefix = "[DONE]" if final else "[INFO]"
+        print(f"{prefix} {stats['processed']} processed, {stats['skipped']} unchanged, "
+              f"{stats['duplicate']} duplicates, {stats['failed']} failed "
+              f"in {stats['elapsed_sec']:.1f}s ({stats['files_per_sec']:.1f} files/s) | per file: {stage_str}")
+
+    def _record(self, rel_path, entry):
+        """ImageRecord columns for a written file."""
+        out_path = self.output_path(rel_path)
+        return {
+            "filename": out_path.name,
+            "file_path": str(out_path),
+            "image_type": "original",
+            "defect_type": self.defect_type,
+            "content_hash": entry["hash"],
+            "perceptual_hash": to_signed64(entry["phash"]),
+        }
+
+    def run(self, src_dir=None):
+        """Ingests every image under `src_dir` (default: the loader's raw folder). Returns summary()."""
+        src_dir = str(src_dir or self.loader.raw_data_path)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.timings = {stage: 0.0 for stage in self.STAGES}
+        previous = self.load_manifest()
+        if self.dedup is not None:
+            # Unchanged files are skipped before hashing pixels, so seed the index with them
+            for rel_path, entry in previous.items():
+                self.dedup.add(str(self.output_path(rel_path)), entry.get("hash"), entry.get("phash"))
+        manifest = {}
+        records = []
+        counts = {outcome: 0 for outcome in self.OUTCOMES}
+        in_flight = deque() # (src_path, rel_path, future), in submission order
+        t_start = time.perf_counter()
+        last_report = t_start
+
+        def retire(block):
+            while in_flight and (block or in_flight[0][2].done()):
+                src_path, rel_path, future = in_flight.popleft()
+                try:
+                    outcome, entry = future.result()
+                except Exception as e:
+                    print(f"[ERROR] {src_path}: {e}")
+                    counts["failed"] += 1
+                else:
+                    manifest[rel_path] = entry
+                    counts[outcome] += 1
+                    METRICS.count(f"ingest.{outcome}")
+                    if outcome == "processed" and self.db_manager is not None:
+                        records.append(self._record(rel_path, entry))
+                        if len(records) >= self.db_batch_size:
+                            # Committed ahead of the manifest, so a resumed run replays these; skip them then
+                            self.db_manager.insert_new_images(records)
+                            records.clear()
+                block = len(in_flight) >= self.max_in_flight
+
+        completed_walk = False
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                for src_path in self.iter_files(src_dir):
+                    rel_path = os.path.relpath(src_path, src_dir)
+                    in_flight.append((src_path, rel_path, pool.submit(self._process, src_path, rel_path,
+                                                                      previous.get(rel_path))))
+                    retire(block=len(in_flight) >= self.max_in_flight)
+
+                    now = time.perf_counter()
+                    if now - last_report >= self.report_every:
+                        self._report(self.summary(counts, now - t_start))
+                        last_report = now
+                while in_flight:
+                    retire(block=True)
+                completed_walk = True
+            finally:
+                for _, _, future in in_flight:
+                    future.cancel()
+                # A full walk drops entries for deleted sources; an interrupted one keeps
+                # the old hashes of files it did not reach, so the next run still skips them
+                self.save_manifest(manifest if completed_walk else {**previous, **manifest})
+                if records:
+                    self.db_manager.insert_new_images(records)
+
+        stats = self.summary(counts, time.perf_counter() - t_start)
+        self._report(stats, final=True)
+        return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crop/resize every image under a folder into data/processed.")
+    parser.add_argument("--src", default="data/raw", help="Folder to walk.")
+    parser.add_argument("--out", default="data/processed", help="Processed data root.")
+    parser.add_argument("--subfolder", default="ingested", help="Output folder under --out.")
+    parser.add_argument("--size", type=int, default=256, help="Output side length in pixels.")
+    parser.add_argument("--roi", type=int, nargs=4, default=None, metavar=("X", "Y", "W", "H"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--compression", type=int, default=None,
+                        help="PNG compression level (0-9). Default: OpenCV's, about 2x faster than 3.")
+    parser.add_argument("--dedup-radius", type=int, default=None,
+                        help="Drop images within this perceptual-hash Hamming distance of one already seen.")
+    parser.add_argument("--db", action="store_true",
+                        help="Record ingested images in the database; with --dedup-radius, also drop "
+                             "repeats of images already recorded there.")
+    parser.add_argument("--defect-type", default=None, help="defect_type stored on the database records.")
+    args = parser.parse_args(argv)
+
+    loader = ImageLoader(raw_data_path=args.src, processed_path=args.out)
+    db_manager = None
+    if args.db:
+        from src.database.db_manager import DBManager
+        db_manager = DBManager()
+    dedup = None
+    if args.dedup_radius is not None:
+        if db_manager is not None:
+            dedup = DuplicateIndex.from_db(db_manager, radius=args.dedup_radius)
+            print(f"[INFO] Dedup index seeded with {len(dedup)} hashes from the database.")
+        else:
+            dedup = DuplicateIndex(radius=args.dedup_radius)
+    pipeline = IngestionPipeline(loader, subfolder=args.subfolder, size=(args.size, args.size), roi=args.roi,
+                                 workers=args.workers, compression=args.compression, dedup=dedup,
+                                 db_manager=db_manager, defect_type=args.defect_type)
+    pipeline.run()
+
 if __name__ == "__main__":
-    # Test script
-    loader = ImageLoader()
-    organizer = DataOrganizer()
-    processor = ImageProcessor()
-    print("DataLoader, Organizer, and Processor initialized.")
+    main()
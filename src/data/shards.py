@@ -0,0 +1,217 @@
+"""Append-only shard files for generated datasets.
+
+A shard is three files sharing a prefix:
+    <prefix>.bin   record payloads, back to back
+    <prefix>.idx   little-endian uint64 (offset, length) per record
+    <prefix>.json  format metadata
+
+In "raw" mode every record is one uint8 HWC image of a fixed shape, so the
+.bin file is a plain NHWC array that can be opened with np.memmap. In
+"png" mode records are PNG-encoded bytes of variable length.
+"""
+import bisect
+import json
+import os
+import cv2
+import numpy as np
+
+from .writer import png_params
+
+try:
+    import torch
+    from torch.utils.data import Dataset
+except (ImportError, OSError):
+    torch = None
+    Dataset = object
+
+MODES = ("raw", "png")
+INDEX_DTYPE = np.dtype("<u8")
+
+def _paths(prefix):
+    prefix = str(prefix)
+    return prefix + ".bin", prefix + ".idx", prefix + ".json"
+
+class ShardWriter:
+    """Appends images to a shard. Reopening an existing shard continues after its last indexed record."""
+
+    def __init__(self, prefix, mode="raw", shape=(256, 256, 3), compression=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown shard mode: {mode}. Valid modes: {MODES}")
+
+        self.bin_path, self.idx_path, self.meta_path = _paths(prefix)
+        os.makedirs(os.path.dirname(self.bin_path) or ".", exist_ok=True)
+        self.compression = compression
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if meta["mode"] != mode:
+                raise ValueError(f"Shard {prefix} is in {meta['mode']} mode, not {mode}")
+            self.mode = meta["mode"]
+            self.shape = tuple(meta["shape"]) if meta["shape"] else None
+        else:
+            self.mode = mode
+            self.shape = tuple(shape) if mode == "raw" else None
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": 1, "mode": self.mode, "shape": self.shape, "dtype": "uint8"}, f)
+            os.replace(tmp_path, self.meta_path)
+
+        self._recover()
+        self._bin = open(self.bin_path, "ab")
+        self._idx = open(self.idx_path, "ab")
+
+    def _recover(self):
+        """Drops a torn index entry and any payload bytes past the last indexed record."""
+        for path in (self.bin_path, self.idx_path):
+            if not os.path.exists(path):
+                open(path, "wb").close()
+
+        entry_size = 2 * INDEX_DTYPE.itemsize
+        idx_size = os.path.getsize(self.idx_path)
+        if idx_size % entry_size:
+            os.truncate(self.idx_path, idx_size - idx_size % entry_size)
+
+        index = np.fromfile(self.idx_path, dtype=INDEX_DTYPE).reshape(-1, 2)
+        # Index entries whose payload never reached the disk are dropped too
+        valid = int(np.searchsorted(index.sum(axis=1), os.path.getsize(self.bin_path), side="right"))
+        if valid < len(index):
+            index = index[:valid]
+            os.truncate(self.idx_path, valid * entry_size)
+        end = int(index[-1].sum()) if len(index) else 0
+        if os.path.getsize(self.bin_path) > end:
+            os.truncate(self.bin_path, end)
+        self.count = len(index)
+        self._offset = end
+
+    def _append(self, payload):
+        self._bin.write(payload)
+        self._idx.write(np.array([self._offset, len(payload)], dtype=INDEX_DTYPE).tobytes())
+        self._offset += len(payload)
+        self.count += 1
+        return self.count - 1
+
+    def _encode(self, img):
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        if self.mode == "raw":
+            if img.shape != self.shape:
+                raise ValueError(f"Expected image of shape {self.shape}, got {img.shape}")
+            return memoryview(img).cast("B")
+        # OpenCV expects BGR
+        img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        ok, buf = cv2.imencode(".png", img_bgr, png_params(self.compression))
+        if not ok:
+            raise ValueError("Failed to encode image")
+        return buf.tobytes()
+
+    def write(self, img):
+        """Appends one RGB HWC image. Returns its record index."""
+        return self._append(self._encode(img))
+
+    def write_batch(self, images):
+        """Appends an N x H x W x C batch (e.g. DefectGenerator.generate_batch output)."""
+        images = np.asarray(images, dtype=np.uint8)
+        if self.mode == "raw" and images.shape[1:] == self.shape:
+            # One contiguous payload write plus one index write for the whole batch
+            images = np.ascontiguousarray(images)
+            record_bytes = int(np.prod(self.shape))
+            offsets = self._offset + np.arange(len(images), dtype=INDEX_DTYPE) * record_bytes
+            index = np.stack([offsets, np.full(len(images), record_bytes, dtype=INDEX_DTYPE)], axis=1)
+            self._bin.write(memoryview(images).cast("B"))
+            self._idx.write(index.astype(INDEX_DTYPE).tobytes())
+            self._offset += record_bytes * len(images)
+            self.count += len(images)
+            return
+        for img in images:
+            self.write(img)
+
+    def flush(self):
+        # Payload first so a flushed index never points past the data
+        self._bin.flush()
+        self._idx.flush()
+
+    def close(self):
+        if self._bin.closed:
+            return
+        self.flush()
+        self._bin.close()
+        self._idx.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ShardReader:
+    """Random access to a shard. Files are memory-mapped lazily, so readers are cheap to pickle into workers."""
+
+    def __init__(self, prefix):
+        self.prefix = str(prefix)
+        self.bin_path, self.idx_path, self.meta_path = _paths(prefix)
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        self.mode = meta["mode"]
+        self.shape = tuple(meta["shape"]) if meta["shape"] else None
+        self.index = np.fromfile(self.idx_path, dtype=INDEX_DTYPE).reshape(-1, 2)
+        self._data = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_data"] = None # Never ship the mapping itself to worker processes
+        return state
+
+    def _mapped(self):
+        if self._data is None:
+            if len(self.index) == 0:
+                self._data = np.empty(0, dtype=np.uint8)
+            else:
+                end = int(self.index[-1].sum())
+                self._data = np.memmap(self.bin_path, dtype=np.uint8, mode="r", shape=(end,))
+        return self._data
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def array(self):
+        """All records as an N x H x W x C memmap (raw mode only)."""
+        if self.mode != "raw":
+            raise ValueError("Only raw shards can be viewed as an array")
+        return self._mapped().reshape((len(self),) + self.shape)
+
+    def __getitem__(self, i):
+        """Record `i` as an RGB HWC uint8 image."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"Record {i} out of range for shard with {len(self)} records")
+        offset, length = (int(v) for v in self.index[i])
+        payload = self._mapped()[offset:offset + length]
+        if self.mode == "raw":
+            return payload.reshape(self.shape)
+        img_bgr = cv2.imdecode(np.asarray(payload), cv2.IMREAD_COLOR)
+        return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+
+class ShardDataset(Dataset):
+    """torch Dataset over one or more shards. Yields float C x H x W tensors in -1..1 (Generator output range)."""
+
+    def __init__(self, prefixes, transform=None):
+        if isinstance(prefixes, (str, os.PathLike)):
+            prefixes = [prefixes]
+        self.readers = [ShardReader(p) for p in prefixes]
+        self.transform = transform
+        self.cumulative = np.cumsum([len(r) for r in self.readers]).tolist()
+
+    def __len__(self):
+        return self.cumulative[-1] if self.cumulative else 0
+
+    def __getitem__(self, i):
+        shard = bisect.bisect_right(self.cumulative, i)
+        local = i - (self.cumulative[shard - 1] if shard else 0)
+        img = self.readers[shard][local]
+        if self.transform is not None:
+            return self.transform(img)
+        # uint8 HWC -> float CHW, 0..255 -> -1..1
+        img_t = torch.from_numpy(np.array(img)).permute(2, 0, 1).float()
+        return img_t / 127.5 - 1.0
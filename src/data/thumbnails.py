@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+from .dedup import content_hash
+
+DEFAULT_SIZES = {
+    "preview": (300, 300), # Dashboard image panes
+    "row": (64, 64), # Data Management table rows
+}
+
+class ThumbnailCache:
+    """Two-level thumbnail cache: PNGs on disk keyed by content hash, decoded arrays in an LRU.
+
+    One decode of the full-resolution file produces every size in `sizes` at
+    once. Thumbnails are resized to exactly the target size (the same stretch
+    the 300x300 panes applied when painting), so they can be shown without
+    further scaling. Because the disk layer is keyed by content, renamed or
+    copied files reuse existing thumbnails and edited files never see stale ones.
+
+    get() works synchronously; request() does the same on a background pool and
+    invokes a callback, so the UI thread never decodes full-resolution files.
+    """
+
+    def __init__(self, cache_dir="data/thumbnails", sizes=None, max_bytes=64 * 1024 * 1024, workers=2):
+        self.cache_dir = cache_dir
+        self.sizes = dict(sizes or DEFAULT_SIZES)
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._memory = OrderedDict() # (content hash, kind) -> read-only RGB array
+        self._digests = {} # path -> ((mtime_ns, size), content hash)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ThumbnailCache")
+        self._pending = {} # (path, kind) -> Future
+
+    def digest(self, path):
+        """Content hash of `path`, re-read only when its mtime/size changes."""
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            known = self._digests.get(path)
+        if known is not None and known[0] == stamp:
+            return known[1]
+        with open(path, "rb") as f:
+            digest = content_hash(f.read())
+        with self._lock:
+            self._digests[path] = (stamp, digest)
+        return digest
+
+    def thumbnail_path(self, digest, kind):
+        w, h = self.sizes[kind]
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{w}x{h}.png")
+
+    def _remember(self, digest, kind, img):
+        img.setflags(write=False)
+        with self._lock:
+            key = (digest, kind)
+            if key not in self._memory:
+                self._memory[key] = img
+                self.current_bytes += img.nbytes
+            while self.current_bytes > self.max_bytes and len(self._memory) > 1:
+                _, old = self._memory.popitem(last=False)
+                self.current_bytes -= old.nbytes
+        return img
+
+    def _from_memory(self, digest, kind):
+        with self._lock:
+            img = self._memory.get((digest, kind))
+            if img is not None:
+                self._memory.move_to_end((digest, kind))
+                self.hits += 1
+            return img
+
+    def _from_disk(self, digest, kind):
+        path = self.thumbnail_path(digest, kind)
+        if not os.path.exists(path):
+            return None
+        bgr_img = cv2.imread(path)
+        if bgr_img is None:
+            return None # Unreadable leftover: regenerate it
+        with self._lock:
+            self.disk_hits += 1
+        return self._remember(digest, kind, cv2.cvtColor(bgr_img, cv2.COLOR_BGR2RGB))
+
+    def _generate(self, path, digest):
+        """Decodes the source once and writes every size to disk. Returns {kind: RGB array}."""
+        bgr_img = cv2.imread(str(path))
+        if bgr_img is None:
+            raise ValueError(f"Failed to read image: {path}")
+        with self._lock:
+            self.misses += 1
+        thumbs = {}
+        for kind, size in self.sizes.items():
+            thumb = cv2.resize(bgr_img, size, interpolation=cv2.INTER_AREA)
+            out_path = self.thumbnail_path(digest, kind)
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            tmp_path = out_path + ".tmp.png"
+            cv2.imwrite(tmp_path, thumb, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            os.replace(tmp_path, out_path) # Readers never see a half-written thumbnail
+            thumbs[kind] = self._remember(digest, kind, cv2.cvtColor(thumb, cv2.COLOR_BGR2RGB))
+        return thumbs
+
+    def get(self, path, kind="preview"):
+        """RGB thumbnail of `path` at the `kind` size: memory, then disk, then generated."""
+        digest = self.digest(path)
+        img = self._from_memory(digest, kind)
+        if img is None:
+            img = self._from_disk(digest, kind)
+        if img is None:
+            img = self._generate(path, digest)[kind]
+        return img
+
+    def request(self, path, kind="preview", callback=None):
+        """get() on the background pool. `callback(path, kind, img_or_None)` runs on a pool thread.
+
+        Concurrent requests for the same path share one decode.
+        """
+        def run():
+            try:
+                img = self.get(path, kind)
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Thumbnail failed for {path}: {e}")
+                img = None
+            finally:
+                with self._lock:
+                    self._pending.pop((path, kind), None)
+            if callback is not None:
+                callback(path, kind, img)
+            return img
+
+        with self._lock:
+            future = self._pending.get((path, kind))
+            if future is None:
+                future = self._pool.submit(run)
+                self._pending[(path, kind)] = future
+                return future
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(path, kind, f.result()))
+        return future
+
+    def prefetch(self, paths):
+        """Warms the cache for `paths` in the background (e.g. rows about to scroll into view).
+
+        One request per path is enough: a miss decodes the source once and writes every size.
+        """
+        for path in paths:
+            self.request(path, next(iter(self.sizes)))
+
+    def close(self):
+        self._pool.shutdown(wait=True)
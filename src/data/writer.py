@@ -0,0 +1,121 @@
+import os
+import queue
+import threading
+import cv2
+
+def png_params(compression=None):
+    """cv2 PNG encode params. None keeps OpenCV's own default, which encodes
+    about twice as fast as an explicit level 3 for files only slightly larger."""
+    return [] if compression is None else [cv2.IMWRITE_PNG_COMPRESSION, compression]
+
+class AsyncImageWriter:
+    """Write-behind PNG saver: callers enqueue RGB frames, a worker pool encodes and writes them."""
+
+    POLICIES = ("block", "drop")
+
+    def __init__(self, num_workers=2, max_queue=64, compression=None, policy="drop"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy: {policy}. Valid policies: {self.POLICIES}")
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1, otherwise nothing drains the queue")
+
+        self.compression = compression # cv2.IMWRITE_PNG_COMPRESSION, 0 (fast) .. 9 (small); None = cv2 default
+        self.policy = policy
+        self.queued = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = []
+        for i in range(num_workers):
+            t = threading.Thread(target=self._run, name=f"AsyncImageWriter-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    def submit(self, img, filepath, copy=False):
+        """Enqueues an RGB image for saving. Returns False if it was dropped."""
+        if self._closed:
+            raise RuntimeError("AsyncImageWriter is closed")
+        if copy:
+            img = img.copy()
+
+        try:
+            if self.policy == "block":
+                self._queue.put((img, filepath)) # Backpressure: wait for a free slot
+            else:
+                self._queue.put_nowait((img, filepath))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        with self._lock:
+            self.queued += 1
+        return True
+
+    def _run(self):
+        params = png_params(self.compression)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            img, filepath = item
+            try:
+                os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+                # OpenCV expects BGR
+                img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+                ok = cv2.imwrite(filepath, img_bgr, params)
+            except Exception as e:
+                print(f"[ERROR] Failed to write {filepath}: {e}")
+                ok = False
+            with self._lock:
+                if ok:
+                    self.written += 1
+                else:
+                    self.failed += 1
+            self._queue.task_done()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "written": self.written,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "pending": self.pending,
+            }
+
+    def flush(self):
+        """Blocks until every queued image has been written."""
+        self._queue.join()
+
+    def close(self, wait=True):
+        """Stops the workers, optionally after draining the queue."""
+        if self._closed:
+            return
+        self._closed = True
+        if wait:
+            self.flush()
+        else:
+            # Discard whatever has not been picked up yet
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                with self._lock:
+                    self.dropped += 1
+                self._queue.task_done()
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for t in self._workers:
+                t.join()
@@ -1,14 +1,45 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, select, delete, func, or_, tuple_
 from sqlalchemy.orm import sessionmaker
-from .schema import Base
+from .schema import Base, ImageRecord, LabelRecord
+try:
+    from src.metrics import METRICS
+except ImportError:
+    from metrics import METRICS
+from datetime import datetime, timedelta
+import csv
 import os
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers (e.g. the UI) run during bulk writes; NORMAL sync is safe under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    # One histogram for all statements; executemany batches are timed as a whole
+    METRICS.observe("db.executemany" if executemany else "db.execute", time.perf_counter() - context._metrics_start)
+
+def _session_begin(session, transaction, connection):
+    session.info["metrics_begin"] = time.perf_counter()
+
+def _session_end(session, transaction):
+    # Outermost transaction only: time from first statement to commit/rollback/close
+    begin = session.info.pop("metrics_begin", None) if transaction.parent is None else None
+    if begin is not None:
+        METRICS.observe("db.session_transaction", time.perf_counter() - begin)
+
 class DBManager:
-    def __init__(self):
+    def __init__(self, db_url=None):
         # Fetch DB config from .env
         user = os.getenv("DB_USER", "root")
         password = os.getenv("DB_PASSWORD", "")
@@ -18,7 +49,9 @@ class DBManager:
         
         # Construct connection string
         # Fallback to SQLite if env vars are missing or explicitly set to sqlite
-        if os.getenv("DB_TYPE", "mysql") == "sqlite":
+        if db_url:
+            self.db_url = db_url
+        elif os.getenv("DB_TYPE", "mysql") == "sqlite":
             self.db_url = "sqlite:///steelai_gan.db"
         else:
             self.db_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{db_name}"
@@ -27,8 +60,14 @@ class DBManager:
         
         try:
             self.engine = create_engine(self.db_url, pool_recycle=3600)
+            if self.engine.dialect.name == "sqlite":
+                event.listen(self.engine, "connect", _set_sqlite_pragmas)
+            event.listen(self.engine, "before_cursor_execute", _before_execute)
+            event.listen(self.engine, "after_cursor_execute", _after_execute)
             Base.metadata.create_all(self.engine)
             self.Session = sessionmaker(bind=self.engine)
+            event.listen(self.Session, "after_begin", _session_begin)
+            event.listen(self.Session, "after_transaction_end", _session_end)
         except Exception as e:
             print(f"[ERROR] Database Connection Failed: {e}")
             # Ensure calling get_session doesn't crash immediately, though it will likely fail later
@@ -36,10 +75,178 @@ class DBManager:
 
     def get_session(self):
         if self.Session:
+            METRICS.count("db.sessions")
             return self.Session()
         else:
             raise ConnectionError("Database session could not be created. Check your connection settings.")
 
+    @METRICS.timed("db.bulk_insert")
+    def _bulk_insert(self, table, rows, chunk_size, defaults=None):
+        """Core INSERT executemany in chunks, all in one transaction. Returns the row count."""
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        stmt = insert(table)
+        total = 0
+        chunk = []
+        with self.engine.begin() as conn:
+            for row in rows:
+                if defaults:
+                    row = {**defaults, **row}
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    conn.execute(stmt, chunk)
+                    total += len(chunk)
+                    chunk = []
+            if chunk:
+                conn.execute(stmt, chunk)
+                total += len(chunk)
+        return total
+
+    def bulk_insert_images(self, rows, chunk_size=10000):
+        """Inserts ImageRecord rows (dicts of column values) from any iterable, `chunk_size` per executemany."""
+        # Resolve created_at once instead of per row
+        defaults = {"created_at": datetime.utcnow(), "defect_type": None, "parent_image_id": None,
+                    "generation_model_version": None, "latent_seed": None,
+                    "content_hash": None, "perceptual_hash": None}
+        return self._bulk_insert(ImageRecord.__table__, rows, chunk_size, defaults)
+
+    def insert_new_images(self, rows, chunk_size=500):
+        """Like bulk_insert_images, but skips rows whose (file_path, content_hash) is already recorded.
+
+        Lets a resumed run replay a batch that was committed before its
+        manifest was saved without duplicating records. Returns the number inserted.
+        """
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        rows = list(rows)
+        hashes = list({row["content_hash"] for row in rows if row.get("content_hash")})
+        seen = set()
+        with self.engine.connect() as conn:
+            for start in range(0, len(hashes), chunk_size):
+                stmt = select(ImageRecord.file_path, ImageRecord.content_hash).where(
+                    ImageRecord.content_hash.in_(hashes[start:start + chunk_size]))
+                seen.update(tuple(row) for row in conn.execute(stmt))
+        fresh = [row for row in rows if (row.get("file_path"), row.get("content_hash")) not in seen]
+        return self.bulk_insert_images(fresh) if fresh else 0
+
+    def bulk_insert_labels(self, rows, chunk_size=10000):
+        """Inserts LabelRecord rows (dicts of column values), `chunk_size` per executemany."""
+        return self._bulk_insert(LabelRecord.__table__, rows, chunk_size)
+
+    def iter_image_hashes(self, yield_per=10000):
+        """Streams (file_path, content_hash, perceptual_hash) for every image that has either hash."""
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        stmt = select(ImageRecord.file_path, ImageRecord.content_hash, ImageRecord.perceptual_hash).where(
+            or_(ImageRecord.content_hash.is_not(None), ImageRecord.perceptual_hash.is_not(None)))
+        with self.engine.connect() as conn:
+            for row in conn.execution_options(stream_results=True, yield_per=yield_per).execute(stmt):
+                yield tuple(row)
+
+    # Columns shown in the Data Management table, in display order
+    IMAGE_LIST_COLUMNS = (ImageRecord.id, ImageRecord.filename, ImageRecord.image_type,
+                          ImageRecord.defect_type, ImageRecord.created_at)
+
+    @staticmethod
+    def _filter_images(stmt, date=None, type_filter=None):
+        """Applies the Data Management filters as index-friendly predicates.
+
+        `date` (datetime.date) becomes a half-open created_at range rather than
+        a DATE() call, so the created_at index still applies; `type_filter`
+        matches either the image type or the defect type (both indexed).
+        """
+        if date is not None:
+            start = datetime(date.year, date.month, date.day)
+            stmt = stmt.where(ImageRecord.created_at >= start, ImageRecord.created_at < start + timedelta(days=1))
+        if type_filter:
+            stmt = stmt.where(or_(ImageRecord.image_type == type_filter, ImageRecord.defect_type == type_filter))
+        return stmt
+
+    @METRICS.timed("db.fetch_image_page")
+    def fetch_image_page(self, after=None, limit=500, date=None, type_filter=None):
+        """Keyset page of image rows, newest first.
+
+        `after` is the (created_at, id) of the last row of the previous page;
+        the (created_at, id) index makes every page an index range scan, no OFFSET.
+        """
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        stmt = self._filter_images(select(*self.IMAGE_LIST_COLUMNS), date, type_filter)
+        if after is not None:
+            stmt = stmt.where(tuple_(ImageRecord.created_at, ImageRecord.id) < tuple_(*after))
+        stmt = stmt.order_by(ImageRecord.created_at.desc(), ImageRecord.id.desc()).limit(limit)
+        with self.engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(stmt)]
+
+    def count_images(self, date=None, type_filter=None):
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        stmt = self._filter_images(select(func.count()).select_from(ImageRecord), date, type_filter)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar_one()
+
+    def iter_images(self, date=None, type_filter=None, yield_per=1000):
+        """Streams every matching image row (all columns), newest first.
+
+        Uses a server-side cursor where the driver has one, fetching
+        `yield_per` rows at a time, so memory stays flat however many rows match.
+        """
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        stmt = self._filter_images(select(*ImageRecord.__table__.columns), date, type_filter)
+        stmt = stmt.order_by(ImageRecord.created_at.desc(), ImageRecord.id.desc())
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=yield_per).execute(stmt)
+            for row in result:
+                yield tuple(row)
+
+    def export_images_csv(self, path, date=None, type_filter=None, progress=None, progress_every=5000):
+        """Writes matching image rows to a CSV file and returns the row count.
+
+        Rows go from the cursor straight to the file. `progress(done, total)` is
+        called every `progress_every` rows. The file is written under a temp
+        name and renamed into place, so a failed export leaves no partial CSV.
+        """
+        total = self.count_images(date, type_filter)
+        tmp_path = path + ".tmp"
+        done = 0
+        try:
+            with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow([c.name for c in ImageRecord.__table__.columns])
+                for row in self.iter_images(date, type_filter):
+                    writer.writerow(row)
+                    done += 1
+                    if progress and done % progress_every == 0:
+                        progress(done, total)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if progress:
+            progress(done, total)
+        return done
+
+    def delete_images(self, ids, chunk_size=500, progress=None):
+        """Deletes images and their labels with batched `WHERE id IN (...)` statements, in one transaction.
+
+        Labels are deleted explicitly so databases created without enforced
+        foreign keys are cleaned up too. Returns the number of images deleted.
+        """
+        if not self.Session:
+            raise ConnectionError("Database session could not be created. Check your connection settings.")
+        ids = list(ids)
+        deleted = 0
+        with self.engine.begin() as conn:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                conn.execute(delete(LabelRecord).where(LabelRecord.image_id.in_(chunk)))
+                deleted += conn.execute(delete(ImageRecord).where(ImageRecord.id.in_(chunk))).rowcount
+                if progress:
+                    progress(min(start + chunk_size, len(ids)), len(ids))
+        return deleted
+
 # Simple test to verify connection
 if __name__ == "__main__":
     db = DBManager()
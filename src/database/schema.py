@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, create_engine
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, ForeignKey, Index, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -10,19 +10,29 @@ class ImageRecord(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)
-    image_type = Column(String(50), nullable=False) # 'original', 'generated'
-    defect_type = Column(String(50), nullable=True) # 'normal', 'nut_error', 'crack', etc.
-    created_at = Column(DateTime, default=datetime.utcnow)
+    image_type = Column(String(50), nullable=False, index=True) # 'original', 'generated'
+    defect_type = Column(String(50), nullable=True, index=True) # 'normal', 'nut_error', 'crack', etc.
+    created_at = Column(DateTime, default=datetime.utcnow) # Indexed together with id below
     
     # Metadata for generated images
-    parent_image_id = Column(Integer, nullable=True) # ID of source image if applicable
+    parent_image_id = Column(Integer, ForeignKey('images.id', ondelete='SET NULL'), nullable=True, index=True) # ID of source image if applicable
     generation_model_version = Column(String(50), nullable=True)
+    latent_seed = Column(BigInteger, nullable=True) # With the model version, fully determines a generated image
+
+    # Duplicate detection (see src/data/dedup.py)
+    content_hash = Column(String(32), nullable=True, index=True) # blake2b-128 of the file bytes
+    perceptual_hash = Column(BigInteger, nullable=True) # 64-bit DCT hash, stored signed
+
+    __table_args__ = (
+        # Keyset pagination for the Data Management view (newest first)
+        Index('ix_images_created_at_id', 'created_at', 'id'),
+    )
 
 class LabelRecord(Base):
     __tablename__ = 'labels'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    image_id = Column(Integer, nullable=False)
+    image_id = Column(Integer, ForeignKey('images.id', ondelete='CASCADE'), nullable=False, index=True)
     class_id = Column(Integer, nullable=False)
     x_center = Column(Float, nullable=False)
     y_center = Column(Float, nullable=False)
@@ -0,0 +1,167 @@
+import glob
+import json
+import os
+import random
+import threading
+import numpy as np
+import torch
+
+def _to_cpu(obj):
+    """Deep-copies every tensor in a (nested) state dict to CPU memory."""
+    if torch.is_tensor(obj):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: _to_cpu(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu(v) for v in obj)
+    return obj
+
+def capture_rng_state():
+    state = {
+        "torch": torch.get_rng_state(),
+        "numpy": np.random.get_state(),
+        "python": random.getstate(),
+    }
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+def restore_rng_state(state):
+    torch.set_rng_state(state["torch"])
+    np.random.set_state(state["numpy"])
+    random.setstate(state["python"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+class CheckpointManager:
+    """Asynchronous, atomic training checkpoints with retention and full resume.
+
+    `save` only snapshots state (a CPU copy of every tensor) on the calling
+    thread; serialization and the write happen on a background thread into a
+    temp file that is renamed into place, so a crash never leaves a torn
+    checkpoint. At most one save is in flight. Retention keeps the newest
+    `keep_last` checkpoints plus the `keep_best` ones with the lowest metric.
+    """
+
+    MANIFEST = "checkpoints.json"
+
+    def __init__(self, checkpoint_dir="checkpoints", keep_last=3, keep_best=1, higher_is_better=False):
+        self.checkpoint_dir = checkpoint_dir
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.higher_is_better = higher_is_better
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        self._thread = None
+        self._error = None
+        self._lock = threading.Lock()
+        self.entries = self._load_manifest() # [{"path", "step", "epoch", "metric"}], oldest first
+
+    def _load_manifest(self):
+        path = os.path.join(self.checkpoint_dir, self.MANIFEST)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            entries = json.load(f)
+        return [e for e in entries if os.path.exists(os.path.join(self.checkpoint_dir, e["path"]))]
+
+    def _write_manifest(self):
+        path = os.path.join(self.checkpoint_dir, self.MANIFEST)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def snapshot(self, trainer, step, epoch, extra=None):
+        """Everything needed to resume, detached from the live training tensors."""
+        return {
+            "step": step,
+            "epoch": epoch,
+            "state": _to_cpu(trainer.state_dict()),
+            "rng": capture_rng_state(),
+            "extra": extra or {},
+        }
+
+    def save(self, trainer, step, epoch, metric=None, extra=None):
+        """Snapshots now and writes in the background. Returns the checkpoint filename."""
+        self.wait() # Bound memory: never more than one pending snapshot
+        snapshot = self.snapshot(trainer, step, epoch, extra)
+        filename = f"ckpt_step_{step:09d}.pt"
+        entry = {"path": filename, "step": step, "epoch": epoch, "metric": metric}
+
+        self._thread = threading.Thread(target=self._write, args=(snapshot, entry),
+                                        name="CheckpointManager-writer", daemon=True)
+        self._thread.start()
+        return filename
+
+    def _write(self, snapshot, entry):
+        try:
+            final_path = os.path.join(self.checkpoint_dir, entry["path"])
+            tmp_path = final_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                torch.save(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, final_path)
+
+            with self._lock:
+                self.entries = [e for e in self.entries if e["path"] != entry["path"]] + [entry]
+                self._apply_retention()
+                self._write_manifest()
+        except Exception as e:
+            print(f"[ERROR] Checkpoint write failed: {e}")
+            self._error = e
+
+    def _apply_retention(self):
+        keep = {e["path"] for e in self.entries[-self.keep_last:]} if self.keep_last else set()
+        scored = [e for e in self.entries if e["metric"] is not None]
+        scored.sort(key=lambda e: e["metric"], reverse=self.higher_is_better)
+        keep.update(e["path"] for e in scored[:self.keep_best])
+
+        for e in self.entries:
+            if e["path"] not in keep:
+                try:
+                    os.remove(os.path.join(self.checkpoint_dir, e["path"]))
+                except FileNotFoundError:
+                    pass
+        self.entries = [e for e in self.entries if e["path"] in keep]
+
+    def wait(self):
+        """Blocks until the pending write (if any) is on disk; re-raises its error."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def latest(self):
+        with self._lock:
+            if self.entries:
+                return os.path.join(self.checkpoint_dir, max(self.entries, key=lambda e: e["step"])["path"])
+        # No manifest (e.g. copied directory): fall back to the newest file on disk
+        paths = sorted(glob.glob(os.path.join(self.checkpoint_dir, "ckpt_step_*.pt")))
+        return paths[-1] if paths else None
+
+    def best(self):
+        with self._lock:
+            scored = [e for e in self.entries if e["metric"] is not None]
+        if not scored:
+            return None
+        pick = max if self.higher_is_better else min
+        return os.path.join(self.checkpoint_dir, pick(scored, key=lambda e: e["metric"])["path"])
+
+    def resume(self, trainer, path=None):
+        """Restores models, optimizers and RNG state. Returns the checkpoint dict (step, epoch, extra) or None."""
+        self.wait()
+        path = path or self.latest()
+        if path is None:
+            return None
+        checkpoint = torch.load(path, map_location="cpu", weights_only=False)
+        trainer.load_state_dict(checkpoint["state"])
+        restore_rng_state(checkpoint["rng"])
+        print(f"[INFO] Resumed from {path} (step {checkpoint['step']}, epoch {checkpoint['epoch']})")
+        return checkpoint
+
+    def close(self):
+        self.wait()
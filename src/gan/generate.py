@@ -0,0 +1,278 @@
+"""Headless bulk augmentation.
+
+Usage:
+    python -m src.gan.generate --model checkpoints/netG_epoch_10.pth --count 1000000 \
+        --out data/generated --workers 4
+    python -m src.gan.generate --count 10000 --dedup-radius 4 --db   # skip repeats of recorded images
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+
+from .inference import DefectGenerator
+
+try:
+    from src.data.dedup import content_hash, perceptual_hash, to_signed64
+    from src.data.writer import png_params
+except ImportError:
+    from data.dedup import content_hash, perceptual_hash, to_signed64
+    from data.writer import png_params
+
+PROGRESS_FILE = "progress.json"
+HASHES_FILE = "hashes.jsonl" # One {"index", "hash", "phash"} line per written image
+STAGES = ("forward", "postprocess", "encode", "dedup", "write")
+
+class BulkGenerator:
+    """Streams DefectGenerator output to sharded PNG folders with resumable progress.
+
+    `workers` threads only encode, hash and write PNGs. The batched forward
+    pass stays on one prefetch thread (parallel only through torch's intra-op
+    threads); for multi-process inference use InferencePool (src/gan/pool.py).
+
+    With a DuplicateIndex (src/data/dedup.py), images that exactly or nearly
+    repeat one already indexed are not written; their index is left as a gap
+    in the shard folders and counted in `duplicates`. The hashes of written
+    images are appended to hashes.jsonl, which seeds the index when a run
+    resumes. With a DBManager, an ImageRecord carrying both hashes is inserted
+    for every written image as progress is saved; pass an index built with
+    DuplicateIndex.from_db to also drop repeats of earlier runs and ingested data.
+    """
+
+    def __init__(self, generator, out_dir, workers=4, batch_size=32, shard_size=1000,
+                 compression=None, report_every=5.0, dedup=None, db_manager=None):
+        self.generator = generator
+        self.out_dir = out_dir
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.shard_size = shard_size
+        self.compression = compression
+        self.report_every = report_every
+        self.dedup = dedup
+        self.db_manager = db_manager
+        self.duplicates = 0
+
+        self.timings = {stage: 0.0 for stage in STAGES}
+        self._timing_lock = threading.Lock()
+
+    def image_path(self, index):
+        shard = index // self.shard_size
+        return os.path.join(self.out_dir, f"shard_{shard:05d}", f"img_{index:09d}.png")
+
+    def load_progress(self):
+        """Number of images already completed by a previous run (contiguous from 0)."""
+        path = os.path.join(self.out_dir, PROGRESS_FILE)
+        if not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            return int(json.load(f).get("completed", 0))
+
+    def save_progress(self, completed, count):
+        path = os.path.join(self.out_dir, PROGRESS_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"completed": completed, "count": count, "shard_size": self.shard_size}, f)
+        os.replace(tmp_path, path) # Atomic: an interrupted run never sees a torn file
+
+    def load_hashes(self, before):
+        """{index: (content hash, perceptual hash)} of images below `before` written by earlier runs."""
+        path = os.path.join(self.out_dir, HASHES_FILE)
+        hashes = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue # Torn last line of an interrupted run
+                    if entry["index"] < before:
+                        hashes[entry["index"]] = (entry["hash"], entry["phash"]) # Later lines win
+        return hashes
+
+    def _record(self, index, entry):
+        """ImageRecord columns for a written image."""
+        path = self.image_path(index)
+        return {
+            "filename": os.path.basename(path),
+            "file_path": path,
+            "image_type": "generated",
+            "content_hash": entry["hash"],
+            "perceptual_hash": to_signed64(entry["phash"]),
+        }
+
+    def _add_timing(self, stage, seconds):
+        with self._timing_lock:
+            self.timings[stage] += seconds
+
+    def _encode_and_write(self, img, index):
+        """Returns the written image's {"hash", "phash"} (None without dedup or DB), or False for a duplicate."""
+        t0 = time.perf_counter()
+        # OpenCV expects BGR
+        img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        ok, buf = cv2.imencode(".png", img_bgr, png_params(self.compression))
+        if not ok:
+            raise ValueError(f"Failed to encode image {index}")
+        t1 = time.perf_counter()
+        self._add_timing("encode", t1 - t0)
+
+        entry = None
+        if self.dedup is not None or self.db_manager is not None:
+            entry = {"hash": content_hash(buf), "phash": perceptual_hash(img)}
+        if self.dedup is not None:
+            # Keyed by path, like the records DuplicateIndex.from_db loads
+            duplicate = self.dedup.add_if_new(self.image_path(index), entry["hash"], entry["phash"])
+            self._add_timing("dedup", time.perf_counter() - t1)
+            if duplicate is not None:
+                with self._timing_lock:
+                    self.duplicates += 1
+                return False
+        t2 = time.perf_counter()
+
+        path = self.image_path(index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(buf.tobytes())
+        self._add_timing("write", time.perf_counter() - t2)
+        return entry
+
+    def _report(self, done, elapsed, final=False):
+        rate = done / elapsed if elapsed > 0 else 0.0
+        per_image = {stage: (t / done * 1000.0 if done else 0.0) for stage, t in self.timings.items()}
+        stage_str = ", ".join(f"{stage} {ms:.2f} ms" for stage, ms in per_image.items())
+        prefix = "[DONE]" if final else "[INFO]"
+        dup_str = f", {self.duplicates} duplicates dropped" if self.dedup is not None else ""
+        print(f"{prefix} {done} images{dup_str} in {elapsed:.1f}s ({rate:.1f} img/s) | per image: {stage_str}")
+
+    def run(self, count, resume=True):
+        os.makedirs(self.out_dir, exist_ok=True)
+        # Per-run totals, so a second run() reports only its own images
+        self.timings = {stage: 0.0 for stage in STAGES}
+        self.duplicates = 0
+        start = self.load_progress() if resume else 0
+        if start >= count:
+            print(f"[INFO] Nothing to do: {start}/{count} images already generated.")
+            return 0
+        if start:
+            print(f"[INFO] Resuming at image {start}/{count}.")
+        hashes_file = None
+        if self.dedup is not None:
+            if start and self.db_manager is None: # With a DB, its records already seeded the index
+                for index, (digest, phash) in self.load_hashes(start).items():
+                    if self.image_path(index) not in self.dedup: # Same index object reused across runs
+                        self.dedup.add(self.image_path(index), digest, phash)
+            hashes_file = open(os.path.join(self.out_dir, HASHES_FILE), "a" if start else "w")
+        records = []
+
+        # Generator timings (forward/postprocess) are filled in by the prefetch thread
+        gen_timings = {}
+        max_in_flight = self.workers * 4
+        in_flight = deque() # (index, future), in submission order
+        completed = start
+        last_saved = start
+        t_start = time.perf_counter()
+        last_report = t_start
+
+        def retire(block):
+            """Retires finished writes in submission order; waits for the oldest if `block`."""
+            nonlocal completed
+            while in_flight:
+                index, future = in_flight[0]
+                if not (block or future.done()):
+                    break
+                entry = future.result() # Re-raise encode/write errors
+                in_flight.popleft()
+                completed += 1
+                if entry:
+                    if hashes_file is not None:
+                        hashes_file.write(json.dumps({"index": index, **entry}) + "\n")
+                    if self.db_manager is not None:
+                        records.append(self._record(index, entry))
+                block = len(in_flight) >= max_in_flight
+
+        def checkpoint():
+            """Persists hashes and DB records of the completed prefix, then the progress marker."""
+            if hashes_file is not None:
+                hashes_file.flush()
+            if records:
+                self.db_manager.insert_new_images(records)
+                records.clear()
+            self.save_progress(completed, count)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                frames = self.generator.iter_images(count - start, batch_size=self.batch_size,
+                                                    timings=gen_timings)
+                for offset, img in enumerate(frames):
+                    index = start + offset
+                    in_flight.append((index, pool.submit(self._encode_and_write, img, index)))
+                    retire(block=len(in_flight) >= max_in_flight)
+
+                    # Progress only advances over a contiguous prefix of finished images
+                    if completed - last_saved >= self.batch_size:
+                        checkpoint()
+                        last_saved = completed
+
+                    now = time.perf_counter()
+                    if now - last_report >= self.report_every:
+                        self.timings.update({k: gen_timings.get(k, 0.0) for k in ("forward", "postprocess")})
+                        self._report(completed - start, now - t_start)
+                        last_report = now
+
+                while in_flight:
+                    retire(block=True)
+            finally:
+                # Also reached on Ctrl+C, so the next run resumes from here
+                checkpoint()
+                if hashes_file is not None:
+                    hashes_file.close()
+
+        self.timings.update({k: gen_timings.get(k, 0.0) for k in ("forward", "postprocess")})
+        self._report(completed - start, time.perf_counter() - t_start, final=True)
+        return completed - start
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bulk GAN augmentation.")
+    parser.add_argument("--model", default=None, help="Generator state_dict (.pth). Omit for random weights.")
+    parser.add_argument("--count", type=int, required=True, help="Total number of images to generate.")
+    parser.add_argument("--out", default="data/generated", help="Output directory.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PNG encode/hash/write threads. The forward pass is not split across them.")
+    parser.add_argument("--batch-size", type=int, default=32, help="Images per generator batch.")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Images per output subdirectory.")
+    parser.add_argument("--compression", type=int, default=None,
+                        help="PNG compression level (0-9). Default: OpenCV's, about 2x faster than 3.")
+    parser.add_argument("--z-dim", type=int, default=100)
+    parser.add_argument("--device", default=None, help="cpu / cuda (auto-detected by default).")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start from 0.")
+    parser.add_argument("--dedup-radius", type=int, default=None,
+                        help="Drop images within this perceptual-hash Hamming distance of one already generated.")
+    parser.add_argument("--db", action="store_true",
+                        help="Record generated images in the database; with --dedup-radius, also drop "
+                             "repeats of images already recorded there (earlier runs, ingested data).")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    generator = DefectGenerator(model_path=args.model, z_dim=args.z_dim, device=args.device)
+    db_manager = None
+    if args.db:
+        from src.database.db_manager import DBManager
+        db_manager = DBManager()
+    dedup = None
+    if args.dedup_radius is not None:
+        from src.data.dedup import DuplicateIndex
+        if db_manager is not None:
+            dedup = DuplicateIndex.from_db(db_manager, radius=args.dedup_radius)
+            print(f"[INFO] Dedup index seeded with {len(dedup)} hashes from the database.")
+        else:
+            dedup = DuplicateIndex(radius=args.dedup_radius)
+    bulk = BulkGenerator(generator, args.out, workers=args.workers, batch_size=args.batch_size,
+                         shard_size=args.shard_size, compression=args.compression, dedup=dedup,
+                         db_manager=db_manager)
+    bulk.run(args.count, resume=not args.restart)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
 import sys
 import os
+import queue
+import threading
+import time
 import numpy as np
-import cv2
+
+try:
+    from src.gan.mock import MockEngine
+except ImportError:
+    from .mock import MockEngine
+
+try:
+    from src.metrics import METRICS
+except ImportError:
+    from metrics import METRICS
 
 # Global flag to track if Torch is available
 TORCH_AVAILABLE = False
@@ -12,18 +24,36 @@ try:
     # Ensure proper import whether run as script or module
     try:
         from src.gan.model import Generator
+        from src.gan.optimize import build_inference_generator
     except ImportError:
         from .model import Generator
+        from .optimize import build_inference_generator
     TORCH_AVAILABLE = True
 except (ImportError, OSError) as e:
     print(f"Warning: Failed to load PyTorch or Model ({e}). Running in Mock Mode.")
     TORCH_AVAILABLE = False
 
+def seeded_latents(seeds, z_dim):
+    """Latent batch where row i depends only on seeds[i]."""
+    generator = torch.Generator(device="cpu")
+    latents = torch.empty(len(seeds), z_dim, 1, 1)
+    for i, seed in enumerate(seeds):
+        generator.manual_seed(int(seed))
+        latents[i] = torch.randn(z_dim, 1, 1, generator=generator)
+    return latents
+
 class DefectGenerator:
-    def __init__(self, model_path=None, z_dim=100, device=None):
+    def __init__(self, model_path=None, z_dim=100, device=None, max_batch_mb=512, optimize=False, bf16=False):
         self.z_dim = z_dim
         self.device = None
         self.netG = None
+        self.mock = None
+        self.reference_netG = None # Training-form Generator; netG may be its optimized build
+        self.optimize = optimize # Fold BN + channels_last (see src.gan.optimize)
+        self.bf16 = bf16
+        self.max_batch_mb = max_batch_mb # Memory cap for one forward micro-batch
+        self.img_size = 256
+        self._sample_bytes = None
         
         if TORCH_AVAILABLE:
             try:
@@ -33,12 +63,14 @@ class DefectGenerator:
                 
                 print(f"[INFO] GAN Inference running on: {device}")
                 self.device = torch.device(device)
-                self.netG = Generator(z_dim).to(self.device)
+                self.reference_netG = Generator(z_dim).to(self.device)
+                self.netG = self.reference_netG
                 if model_path:
                     self.load_model(model_path)
                 else:
                     print("Warning: No model path provided. Generating random noise images.")
-                self.netG.eval()
+                self.reference_netG.eval()
+                self._build_inference_model()
             except Exception as e:
                 print(f"Error initializing GAN: {e}. Switching to Mock Mode.")
                 self.netG = None
@@ -46,59 +78,165 @@ class DefectGenerator:
     def load_model(self, path):
         if not self.netG: return
         try:
-            state_dict = torch.load(path, map_location=self.device)
-            self.netG.load_state_dict(state_dict)
+            state_dict = torch.load(path, map_location=self.device, weights_only=False)
+            if "state" in state_dict:
+                # Full training checkpoint written by CheckpointManager
+                state_dict = state_dict["state"]["netG"]
+            self.reference_netG.load_state_dict(state_dict)
+            self._build_inference_model()
             print(f"Model loaded from {path}")
         except Exception as e:
             print(f"Failed to load model: {e}")
 
-    def generate_image(self, base_image=None):
-        """Generates a single image."""
+    def _build_inference_model(self):
+        """Re-derives netG from the reference weights (they change on load_model)."""
+        if self.optimize:
+            self.netG = build_inference_generator(self.reference_netG, bf16=self.bf16)
+        else:
+            self.netG = self.reference_netG
+
+    def _estimate_sample_bytes(self):
+        """Estimates peak forward activation bytes per sample and the output size."""
+        peak = 0
+        size = 1
+        for m in self.netG.modules():
+            if isinstance(m, torch.nn.ConvTranspose2d):
+                out_size = (size - 1) * m.stride[0] - 2 * m.padding[0] + m.kernel_size[0]
+                in_bytes = m.in_channels * size * size * 4
+                out_bytes = m.out_channels * out_size * out_size * 4
+                # Conv input + output, or BN/ReLU producing a second copy of the output
+                peak = max(peak, in_bytes + out_bytes, 2 * out_bytes)
+                size = out_size
+        self.img_size = size
+        self._sample_bytes = peak
+        return peak
+
+    def micro_batch_size(self, max_batch_mb=None):
+        """Number of samples per forward pass that fits under the memory cap."""
+        if max_batch_mb is None:
+            max_batch_mb = self.max_batch_mb
+        sample_bytes = self._sample_bytes or self._estimate_sample_bytes()
+        return max(1, int(max_batch_mb * 1024 * 1024 // sample_bytes))
+
+    @staticmethod
+    def _to_uint8_nhwc(fake_imgs):
+        """Tanh output (N x C x H x W, -1..1) -> uint8 N x H x W x C, on the source device."""
+        imgs = (fake_imgs + 1) / 2.0 * 255.0
+        return imgs.clamp_(0, 255).to(torch.uint8).permute(0, 2, 3, 1)
+
+    @METRICS.timed("generator.generate_image")
+    def generate_image(self, base_image=None, out=None):
+        """Generates a single image, written into `out` (uint8 H x W x 3) when given."""
+        batch_out = None if out is None else out[None]
         if self.netG and TORCH_AVAILABLE:
-            with torch.no_grad():
-                noise = torch.randn(1, self.z_dim, 1, 1).to(self.device)
-                fake_img = self.netG(noise)
-                
-                # Post-processing: Normalize to 0-255 and change to HWC
-                img_t = fake_img[0].detach().cpu()
-                img_np = (img_t.numpy() + 1) / 2.0 * 255.0 # Tanh -1..1 to 0..255
-                img_np = img_np.astype(np.uint8)
-                img_np = np.transpose(img_np, (1, 2, 0)) # CHW -> HWC
-                return img_np
+            return self.generate_batch(1, out=batch_out)[0]
         else:
-            # Mock Mode / Demo Mode
-            if base_image is not None:
-                # Demo Effect: Apply a stylistic change to the reference image
-                # e.g., Convert to grayscale and add red tint to simulate 'defect analysis' style
-                # Resize to 256x256 first
-                img_resized = cv2.resize(base_image, (256, 256))
-                
-                # Create a "Defect Map" look (Blue/Purple tint)
-                # Just for show: Invert colors or shift channels
-                # BGR -> RGB already handled in UI, this assumes input is RGB or just modifies array
-                # Let's add some random "Defect" boxes
-                demo_img = img_resized.copy()
-                
-                # Add a simulated defect overlay (Red box)
-                h, w, _ = demo_img.shape
-                x = np.random.randint(50, 200)
-                y = np.random.randint(50, 200)
-                cv2.rectangle(demo_img, (x, y), (x+30, y+30), (255, 0, 0), 2) # Red box
-                
-                # Add some noise to look "generated"
-                noise = np.random.randint(0, 50, (h, w, 3), dtype=np.uint8)
-                demo_img = cv2.addWeighted(demo_img, 0.8, noise, 0.2, 0)
-                
-                return demo_img
+            # Mock Mode / Demo Mode: reference image + noise + red "defect" box,
+            # or plain random noise if no ref image
+            return self.mock_engine().generate(1, base_image=base_image, out=batch_out)[0]
+
+    def mock_engine(self):
+        """Vectorized batch engine used in Mock Mode (created on first use)."""
+        if self.mock is None:
+            self.mock = MockEngine(size=256)
+        return self.mock
+
+    @staticmethod
+    def _add_timing(timings, stage, seconds):
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def latents_for_seeds(self, seeds):
+        """One latent vector per seed; the same seed always gives the same latent (N x z_dim x 1 x 1, CPU)."""
+        return seeded_latents(seeds, self.z_dim)
+
+    @METRICS.timed("generator.generate_batch")
+    def generate_batch(self, batch_size=4, max_batch_mb=None, timings=None, seeds=None, base_image=None, out=None):
+        """Generates a batch of images as a contiguous uint8 N x H x W x 3 array.
+
+        With `seeds`, image i is fully determined by (weights, seeds[i]) and
+        batch_size is len(seeds). `base_image` only affects Mock Mode. If
+        `timings` is a dict, seconds spent in 'forward' and 'postprocess' are added to it.
+        Pass a preallocated `out` array to have the images written into it.
+        """
+        if seeds is not None:
+            batch_size = len(seeds)
+        METRICS.count("generator.images", batch_size)
+        if not (self.netG and TORCH_AVAILABLE):
+            t0 = time.perf_counter()
+            out = self.mock_engine().generate(batch_size, base_image=base_image, seeds=seeds, out=out)
+            self._add_timing(timings, "forward", time.perf_counter() - t0)
+            return out
+
+        step = self.micro_batch_size(max_batch_mb)
+        if out is None:
+            out = np.empty((batch_size, self.img_size, self.img_size, 3), dtype=np.uint8)
+        with torch.inference_mode():
+            # Draw all latents at once so results don't depend on the micro-batch size
+            if seeds is None:
+                noise = torch.randn(batch_size, self.z_dim, 1, 1).to(self.device)
             else:
-                # Fallback to random noise if no ref image
-                return np.random.randint(0, 255, (256, 256, 3), dtype=np.uint8)
-
-    def generate_batch(self, batch_size=4):
-        images = []
-        for _ in range(batch_size):
-            images.append(self.generate_image())
-        return images
+                noise = self.latents_for_seeds(seeds).to(self.device)
+            for start in range(0, batch_size, step):
+                t0 = time.perf_counter()
+                fake_imgs = self.netG(noise[start:start + step])
+                t1 = time.perf_counter()
+                out[start:start + step] = self._to_uint8_nhwc(fake_imgs).cpu().numpy()
+                self._add_timing(timings, "forward", t1 - t0)
+                self._add_timing(timings, "postprocess", time.perf_counter() - t1)
+        return out
+
+    def iter_images(self, total, batch_size=16, prefetch=2, timings=None):
+        """Lazily yields `total` uint8 HWC images while the next batches are generated in the background."""
+        batches = queue.Queue(maxsize=max(1, prefetch))
+        stop = threading.Event()
+
+        def produce():
+            try:
+                remaining = total
+                while remaining > 0 and not stop.is_set():
+                    batch = self.generate_batch(min(batch_size, remaining), timings=timings)
+                    remaining -= len(batch)
+                    self._put_until_stopped(batches, batch, stop)
+            except Exception as e:
+                self._put_until_stopped(batches, e, stop)
+            finally:
+                self._put_until_stopped(batches, None, stop) # End-of-stream marker
+
+        worker = threading.Thread(target=produce, name="DefectGenerator-prefetch", daemon=True)
+        worker.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                for img in batch:
+                    yield img
+        finally:
+            # Consumer finished or abandoned the iterator: release the producer
+            stop.set()
+            worker.join()
+
+    def generate_to_shard(self, writer, total, batch_size=32):
+        """Appends `total` generated images to a ShardWriter (src.data.shards) batch by batch."""
+        remaining = total
+        while remaining > 0:
+            batch = self.generate_batch(min(batch_size, remaining))
+            writer.write_batch(batch)
+            remaining -= len(batch)
+        writer.flush()
+        return writer.count
+
+    @staticmethod
+    def _put_until_stopped(q, item, stop):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
 
 if __name__ == "__main__":
     gen = DefectGenerator()
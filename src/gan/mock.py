@@ -0,0 +1,101 @@
+import numpy as np
+import cv2
+
+class MockEngine:
+    """Vectorized stand-in for the Generator, used when torch is unavailable (CI, UI load tests).
+
+    Produces the same look as the original per-image demo effect (reference
+    image at 80% + 20% noise, red "defect" box), but for a whole batch with
+    array ops: noise comes from a fixed-size pre-drawn pool viewed at random
+    offsets (larger batches are filled in pool-sized chunks), the weighted
+    reference is computed once per reference image, and box outlines are drawn
+    for all images with one fancy-indexed assignment.
+    """
+
+    BOX_SIZE = 30
+    BOX_COLOR = (204, 0, 0) # Red (255, 0, 0) after the 0.8 reference weight
+    POOL_SEED = 0 # Initial pool content is fixed, so seeded output is the same in every process
+
+    def __init__(self, seed=None, size=256, pool_frames=16):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.frame_bytes = size * size * 3
+        self.pool_frames = pool_frames
+
+        # Pools are drawn once and never grow; batches view them at random offsets
+        rng = np.random.default_rng(self.POOL_SEED)
+        n = (pool_frames + 1) * self.frame_bytes
+        self._blend_noise = rng.integers(0, 50, n, dtype=np.uint8) // 5 # 0.2 * U[0, 50), i.e. 0..9
+        self._full_noise = rng.integers(0, 255, n, dtype=np.uint8) # U[0, 255), used when there is no reference image
+        self._seed_limit = pool_frames * self.frame_bytes
+
+        self._base_src = None # Copy of the last reference, so in-place edits are noticed
+        self._base_part = None
+
+        # Box outline offsets (2 px thick), relative to the box corner
+        k = self.BOX_SIZE
+        band = np.arange(-1, k + 1)
+        edge = np.array([-1, 0, k - 1, k])
+        rows = np.concatenate([np.repeat(edge, len(band)), np.tile(band, len(edge))])
+        cols = np.concatenate([np.tile(band, len(edge)), np.repeat(edge, len(band))])
+        self._box_rows = rows
+        self._box_cols = cols
+
+    def _base(self, base_image):
+        """0.8 * reference at the output size, cached while the reference content is unchanged."""
+        src = self._base_src
+        # One compare of the raw reference is far cheaper than the resize and weighting
+        if src is None or src.shape != base_image.shape or not np.array_equal(src, base_image):
+            img = base_image
+            if img.shape[:2] != (self.size, self.size):
+                img = cv2.resize(img, (self.size, self.size))
+            self._base_part = (img.astype(np.uint16) * 4 // 5).astype(np.uint8)
+            self._base_src = base_image.copy()
+        return self._base_part
+
+    def _window(self, pool, offset, frames):
+        return pool[offset:offset + frames * self.frame_bytes].reshape(frames, self.size, self.size, 3)
+
+    def generate(self, batch_size, base_image=None, seeds=None, out=None):
+        """uint8 N x H x W x 3 batch. Writes into `out` when given (e.g. a preallocated frame buffer)."""
+        if seeds is not None:
+            batch_size = len(seeds)
+        if out is None:
+            out = np.empty((batch_size, self.size, self.size, 3), dtype=np.uint8)
+        if batch_size == 0:
+            return out
+
+        if seeds is None:
+            pool = self._full_noise if base_image is None else self._blend_noise
+            base = None if base_image is None else self._base(base_image)
+            # One contiguous pool window per chunk of up to pool_frames images
+            for start in range(0, batch_size, self.pool_frames):
+                frames = min(self.pool_frames, batch_size - start)
+                offset = int(self.rng.integers(0, len(pool) - frames * self.frame_bytes + 1))
+                noise = self._window(pool, offset, frames)
+                if base is None:
+                    np.copyto(out[start:start + frames], noise)
+                else:
+                    np.add(base, noise, out=out[start:start + frames])
+            xs = self.rng.integers(50, 200, batch_size)
+            ys = self.rng.integers(50, 200, batch_size)
+        else:
+            # Per-seed offsets and boxes so each image depends only on its seed
+            xs = np.empty(batch_size, dtype=np.int64)
+            ys = np.empty(batch_size, dtype=np.int64)
+            pool = self._full_noise if base_image is None else self._blend_noise
+            base = None if base_image is None else self._base(base_image)
+            for i, seed in enumerate(seeds):
+                rng = np.random.default_rng(int(seed))
+                offset = int(rng.integers(0, self._seed_limit))
+                xs[i], ys[i] = rng.integers(50, 200, 2)
+                noise = self._window(pool, offset, 1)[0]
+                if base is None:
+                    np.copyto(out[i], noise)
+                else:
+                    np.add(base, noise, out=out[i])
+
+        if base_image is not None:
+            n_idx = np.arange(batch_size)[:, None]
+            out[n_idx, ys[:, None] + self._box_rows, xs[:, None] + self._box_cols] = self.BOX_COLOR
+        return out
@@ -0,0 +1,120 @@
+"""Inference build of the Generator: BatchNorm folded into the transposed convs,
+channels_last activations and optional bfloat16 weights.
+
+Usage:
+    python -m src.gan.optimize --model checkpoints/netG_epoch_10.pth --bf16
+"""
+import argparse
+import copy
+import time
+import torch
+import torch.nn as nn
+
+from .model import Generator
+
+def fold_conv_transpose_bn(conv, bn):
+    """Returns a ConvTranspose2d (with bias) equivalent to conv followed by eval-mode bn."""
+    fused = copy.deepcopy(conv)
+    scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    bias = conv.bias if conv.bias is not None else torch.zeros_like(bn.running_mean)
+
+    # ConvTranspose2d weight is (in_channels, out_channels, kH, kW): scale per output channel
+    fused.weight = nn.Parameter(conv.weight * scale.view(1, -1, 1, 1))
+    fused.bias = nn.Parameter((bias - bn.running_mean) * scale + bn.bias)
+    return fused
+
+def fold_batchnorm(generator):
+    """Flattens Generator.net into one Sequential with every ConvTranspose2d + BatchNorm2d pair fused."""
+    layers = []
+    for module in generator.net.modules():
+        if isinstance(module, nn.Sequential):
+            continue
+        if isinstance(module, nn.BatchNorm2d):
+            layers[-1] = fold_conv_transpose_bn(layers[-1], module)
+        else:
+            layers.append(module)
+    return nn.Sequential(*layers)
+
+class InferenceGenerator(nn.Module):
+    """Wraps a folded Generator; casts inputs to its dtype/memory format and returns float32 NCHW-shaped output."""
+
+    def __init__(self, net, dtype=torch.float32, channels_last=True):
+        super().__init__()
+        self.net = net
+        self.dtype = dtype
+        self.memory_format = torch.channels_last if channels_last else torch.contiguous_format
+
+    def forward(self, x):
+        x = x.to(dtype=self.dtype).contiguous(memory_format=self.memory_format)
+        return self.net(x).float()
+
+def build_inference_generator(generator, bf16=False, channels_last=True):
+    """Builds an eval-only copy of `generator` for fast CPU inference. The original is left untouched.
+
+    Dynamic quantization is intentionally not offered: torch only quantizes
+    Linear/RNN layers dynamically, and this network is all ConvTranspose2d.
+    """
+    generator = copy.deepcopy(generator).eval()
+    with torch.no_grad():
+        net = fold_batchnorm(generator)
+    dtype = torch.bfloat16 if bf16 else torch.float32
+    memory_format = torch.channels_last if channels_last else torch.contiguous_format
+    net = net.to(dtype=dtype, memory_format=memory_format)
+    for p in net.parameters():
+        p.requires_grad_(False)
+    return InferenceGenerator(net, dtype=dtype, channels_last=channels_last).eval()
+
+@torch.inference_mode()
+def parity_check(reference, optimized, batch_size=2, z_dim=100, device="cpu", seed=0):
+    """Max absolute difference between the two models on the same latents (outputs are in -1..1)."""
+    generator = torch.Generator(device="cpu").manual_seed(seed)
+    noise = torch.randn(batch_size, z_dim, 1, 1, generator=generator).to(device)
+    ref = reference.eval()(noise).float()
+    opt = optimized(noise).float()
+    return (ref - opt).abs().max().item()
+
+@torch.inference_mode()
+def benchmark(model, batch_size=8, iters=5, warmup=1, z_dim=100, device="cpu"):
+    """Images/sec of `model` for the given batch size."""
+    model.eval()
+    noise = torch.randn(batch_size, z_dim, 1, 1, device=device)
+    for _ in range(warmup):
+        model(noise)
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        model(noise)
+    return batch_size * iters / (time.perf_counter() - t0)
+
+def speedup_report(reference, optimized, batch_size=8, iters=5, z_dim=100, device="cpu"):
+    ref_ips = benchmark(reference, batch_size, iters, z_dim=z_dim, device=device)
+    opt_ips = benchmark(optimized, batch_size, iters, z_dim=z_dim, device=device)
+    report = {
+        "batch_size": batch_size,
+        "reference_img_per_sec": ref_ips,
+        "optimized_img_per_sec": opt_ips,
+        "speedup": opt_ips / ref_ips,
+        "max_abs_diff": parity_check(reference, optimized, z_dim=z_dim, device=device),
+    }
+    print(f"[INFO] batch {batch_size}: reference {ref_ips:.2f} img/s, optimized {opt_ips:.2f} img/s "
+          f"({report['speedup']:.2f}x), max |diff| {report['max_abs_diff']:.2e}")
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and benchmark the inference-optimized Generator.")
+    parser.add_argument("--model", default=None, help="Generator state_dict (.pth). Omit for random weights.")
+    parser.add_argument("--bf16", action="store_true")
+    parser.add_argument("--no-channels-last", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--iters", type=int, default=5)
+    parser.add_argument("--z-dim", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    reference = Generator(args.z_dim)
+    if args.model:
+        reference.load_state_dict(torch.load(args.model, map_location="cpu"))
+    reference.eval()
+    optimized = build_inference_generator(reference, bf16=args.bf16, channels_last=not args.no_channels_last)
+    speedup_report(reference, optimized, batch_size=args.batch_size, iters=args.iters, z_dim=args.z_dim)
+
+if __name__ == "__main__":
+    main()
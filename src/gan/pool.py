@@ -0,0 +1,173 @@
+"""Multi-process CPU inference with one shared copy of the Generator weights.
+
+The parent loads (and optionally optimizes) the Generator once and moves its
+tensors into shared memory; worker processes receive handles to those
+tensors, not copies. Each worker runs with its own small intra-op thread
+count and writes finished uint8 NHWC batches into preallocated shared-memory
+result slots, so only (task id, slot) tuples cross the process boundary.
+"""
+import argparse
+import os
+import queue
+import time
+from collections import deque
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from .model import Generator
+from .optimize import build_inference_generator
+from .inference import DefectGenerator, seeded_latents
+
+def _worker_main(model, z_dim, threads, task_q, result_q, out_buffer):
+    torch.set_num_threads(threads)
+    model.eval()
+    while True:
+        task = task_q.get()
+        if task is None:
+            break
+        task_id, slot, n, seeds = task
+        try:
+            with torch.inference_mode():
+                if seeds is None:
+                    noise = torch.randn(n, z_dim, 1, 1)
+                else:
+                    noise = seeded_latents(seeds, z_dim)
+                out_buffer[slot, :n].copy_(DefectGenerator._to_uint8_nhwc(model(noise)))
+            result_q.put((task_id, slot, n, None))
+        except Exception as e:
+            result_q.put((task_id, slot, n, repr(e)))
+
+class InferencePool:
+    """Process pool generating images from shared Generator weights.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, model_path=None, workers=None, threads_per_worker=1, batch_size=16, z_dim=100,
+                 optimize=True, bf16=False, img_size=256, start_method="spawn"):
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.batch_size = batch_size
+        self.z_dim = z_dim
+
+        model = Generator(z_dim)
+        if model_path:
+            state_dict = torch.load(model_path, map_location="cpu", weights_only=False)
+            if "state" in state_dict:
+                state_dict = state_dict["state"]["netG"]
+            model.load_state_dict(state_dict)
+        model.eval()
+        if optimize:
+            model = build_inference_generator(model, bf16=bf16)
+        self.model = model.share_memory() # Workers attach to these pages instead of copying them
+
+        ctx = mp.get_context(start_method)
+        self.num_slots = self.workers * 2 # One batch in flight plus one being consumed per worker
+        self.out_buffer = torch.empty(self.num_slots, batch_size, img_size, img_size, 3,
+                                      dtype=torch.uint8).share_memory_()
+        self._task_q = ctx.Queue()
+        self._result_q = ctx.Queue()
+        self._procs = []
+        for _ in range(self.workers):
+            p = ctx.Process(target=_worker_main,
+                            args=(self.model, z_dim, threads_per_worker, self._task_q, self._result_q, self.out_buffer),
+                            daemon=True)
+            p.start()
+            self._procs.append(p)
+        self._closed = False
+
+    def _get_result(self):
+        while True:
+            try:
+                return self._result_q.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p for p in self._procs if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"{len(dead)} inference worker(s) exited unexpectedly")
+
+    def iter_batches(self, total, base_seed=None):
+        """Yields (start_index, uint8 N x H x W x 3 array) in completion order.
+
+        The array is a view into shared memory and is only valid until the next
+        iteration; copy it if it must outlive that. With `base_seed`, image i
+        uses seed base_seed + i (same images as DefectGenerator.generate_batch(seeds=...)).
+        """
+        free_slots = deque(range(self.num_slots))
+        pending = {}
+        next_start = 0
+        task_id = 0
+        try:
+            while next_start < total or pending:
+                while free_slots and next_start < total:
+                    n = min(self.batch_size, total - next_start)
+                    seeds = None if base_seed is None else list(range(base_seed + next_start, base_seed + next_start + n))
+                    slot = free_slots.popleft()
+                    self._task_q.put((task_id, slot, n, seeds))
+                    pending[task_id] = next_start
+                    next_start += n
+                    task_id += 1
+
+                done_id, slot, n, error = self._get_result()
+                start = pending.pop(done_id)
+                if error is not None:
+                    raise RuntimeError(f"Inference worker failed: {error}")
+                yield start, self.out_buffer[slot, :n].numpy()
+                free_slots.append(slot) # Consumer moved on: the slot can be reused
+        finally:
+            # Abandoned early: collect outstanding results so the next call starts clean
+            while pending:
+                done_id = self._get_result()[0]
+                pending.pop(done_id, None)
+
+    def generate(self, total, base_seed=None):
+        """All `total` images as one contiguous uint8 N x H x W x 3 array, in index order."""
+        out = np.empty((total,) + tuple(self.out_buffer.shape[2:]), dtype=np.uint8)
+        for start, batch in self.iter_batches(total, base_seed=base_seed):
+            out[start:start + len(batch)] = batch
+        return out
+
+    def benchmark(self, total=256):
+        """Sustained images/sec over `total` images."""
+        t0 = time.perf_counter()
+        for _ in self.iter_batches(total):
+            pass
+        return total / (time.perf_counter() - t0)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._procs:
+            self._task_q.put(None)
+        for p in self._procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure InferencePool images/sec scaling over worker counts.")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--total", type=int, default=256)
+    parser.add_argument("--bf16", action="store_true")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        with InferencePool(args.model, workers=workers, threads_per_worker=args.threads_per_worker,
+                           batch_size=args.batch_size, bf16=args.bf16) as pool:
+            pool.benchmark(total=pool.batch_size * workers) # Warm-up: workers load torch lazily
+            ips = pool.benchmark(total=args.total)
+        baseline = baseline or ips
+        print(f"[INFO] {workers} worker(s): {ips:.2f} img/s ({ips / baseline:.2f}x)")
+
+if __name__ == "__main__":
+    main()
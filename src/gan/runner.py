@@ -0,0 +1,211 @@
+"""Epoch training driver around GANTrainer.
+
+Usage:
+    python -m src.gan.runner --data data/processed --epochs 20 --batch-size 64 --accum 4 --bf16
+"""
+import argparse
+import time
+import numpy as np
+import torch
+
+from .trainer import GANTrainer
+from .telemetry import TrainingTelemetry, exporter_for_path
+from .checkpoint import CheckpointManager
+
+class TrainingRunner:
+    """Runs GANTrainer over its dataloader for a number of epochs/steps and reports throughput.
+
+    A "step" is one optimizer update of each network; with
+    `accumulation_steps` > 1 it consumes that many dataloader batches.
+    """
+
+    def __init__(self, trainer, epochs=1, max_steps=None, accumulation_steps=1, compile=False,
+                 log_every=50, checkpoint_every=1, telemetry=None, checkpoint_manager=None,
+                 checkpoint_every_steps=None):
+        self.trainer = trainer
+        self.epochs = epochs
+        self.max_steps = max_steps
+        self.accumulation_steps = max(1, accumulation_steps)
+        self.log_every = log_every
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_manager = checkpoint_manager
+        self.checkpoint_every_steps = checkpoint_every_steps
+
+        self.step = 0
+        self.start_epoch = 0
+        self.skip_steps = 0 # Steps of start_epoch already done before a resume
+        self.images_seen = 0 # All-time, restored on resume (checkpoint extra)
+        self.session_images = 0 # This process only, matching step_times for throughput
+        self.step_times = []
+        # Metrics stay on the device between log points
+        self.telemetry = telemetry if telemetry is not None else TrainingTelemetry(flush_every=log_every)
+
+        if compile:
+            trainer.compile_models()
+
+    @staticmethod
+    def _images_from_batch(batch):
+        # Datasets yield either bare tensors or (images, labels) tuples
+        if isinstance(batch, (list, tuple)):
+            batch = batch[0]
+        return batch
+
+    def _micro_batches(self, epoch):
+        dataloader = self.trainer.dataloader
+        sampler = getattr(dataloader, "sampler", None)
+        if hasattr(sampler, "set_epoch"):
+            sampler.set_epoch(epoch)
+
+        pending = []
+        skip = self.skip_steps * self.accumulation_steps if epoch == self.start_epoch else 0
+        for i, batch in enumerate(dataloader):
+            if i < skip:
+                continue # Same sampler order as the interrupted run; these were already trained on
+            real_images = self._images_from_batch(batch).to(self.trainer.device, non_blocking=True)
+            pending.append(real_images)
+            if len(pending) == self.accumulation_steps:
+                yield pending
+                pending = []
+        if pending:
+            yield pending # Short last group; train_step_accumulated weights by its actual size
+
+    def resume(self, path=None):
+        """Restores trainer + RNG state and the step/epoch position from the checkpoint manager."""
+        checkpoint = self.checkpoint_manager.resume(self.trainer, path)
+        if checkpoint is None:
+            return False
+        extra = checkpoint["extra"]
+        self.step = checkpoint["step"]
+        self.telemetry.step = self.step # Exported step numbers continue instead of restarting at 0
+        self.images_seen = extra.get("images_seen", 0)
+        if extra.get("epoch_complete", True):
+            self.start_epoch, self.skip_steps = checkpoint["epoch"] + 1, 0
+        else:
+            self.start_epoch, self.skip_steps = checkpoint["epoch"], extra.get("epoch_step", 0)
+        return True
+
+    def _checkpoint(self, epoch, epoch_step, epoch_complete):
+        if self.checkpoint_manager is None:
+            self.trainer.save_checkpoint(epoch)
+            return
+        latest = self.telemetry.latest()
+        metric = latest["errG"] if latest else None
+        extra = {"images_seen": self.images_seen, "epoch_step": epoch_step, "epoch_complete": epoch_complete}
+        self.checkpoint_manager.save(self.trainer, self.step, epoch, metric=metric, extra=extra)
+
+    def _done(self):
+        return self.max_steps is not None and self.step >= self.max_steps
+
+    def timing_summary(self):
+        """Images/sec and step-time percentiles (ms) over every step so far."""
+        if not self.step_times:
+            return {}
+        times = np.array(self.step_times)
+        p50, p90, p99 = np.percentile(times, [50, 90, 99]) * 1000.0
+        return {
+            "steps": len(times),
+            "images_per_sec": self.session_images / times.sum(),
+            "step_ms_p50": p50,
+            "step_ms_p90": p90,
+            "step_ms_p99": p99,
+        }
+
+    def _log(self, epoch, entry):
+        t = self.timing_summary()
+        print(f"[{epoch}/{self.epochs}][step {self.step}] Loss_D: {entry['errD']:.4f} Loss_G: {entry['errG']:.4f} "
+              f"D(x): {entry['D_x']:.4f} D(G(z)): {entry['D_G_z1']:.4f} / {entry['D_G_z2']:.4f} | "
+              f"{t['images_per_sec']:.1f} img/s, step p50 {t['step_ms_p50']:.1f} ms "
+              f"p90 {t['step_ms_p90']:.1f} ms p99 {t['step_ms_p99']:.1f} ms")
+
+    def run(self):
+        for epoch in range(self.start_epoch, self.epochs):
+            epoch_step = self.skip_steps if epoch == self.start_epoch else 0
+            for micro_batches in self._micro_batches(epoch):
+                t0 = time.perf_counter()
+                if len(micro_batches) == 1:
+                    losses = self.trainer.train_step(micro_batches[0], return_tensors=True)
+                else:
+                    losses = self.trainer.train_step_accumulated(micro_batches, return_tensors=True)
+                self.step_times.append(time.perf_counter() - t0)
+
+                self.step += 1
+                epoch_step += 1
+                images = sum(b.size(0) for b in micro_batches)
+                self.images_seen += images
+                self.session_images += images
+                entry = self.telemetry.record(*losses)
+                if entry is not None:
+                    self._log(epoch, entry)
+                if self.checkpoint_every_steps and self.step % self.checkpoint_every_steps == 0:
+                    self._checkpoint(epoch, epoch_step, epoch_complete=False)
+                if self._done():
+                    break
+
+            if self.checkpoint_every and (epoch + 1) % self.checkpoint_every == 0:
+                self._checkpoint(epoch, epoch_step, epoch_complete=not self._done())
+            if self._done():
+                break
+
+        self.telemetry.close()
+        if self.checkpoint_manager is not None:
+            self.checkpoint_manager.wait()
+        summary = self.timing_summary()
+        if summary:
+            print(f"[DONE] {self.step} steps, {self.images_seen} images, {summary['images_per_sec']:.1f} img/s, "
+                  f"step p50 {summary['step_ms_p50']:.1f} ms p90 {summary['step_ms_p90']:.1f} ms "
+                  f"p99 {summary['step_ms_p99']:.1f} ms")
+        return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the DCGAN on data/processed category folders.")
+    parser.add_argument("--data", default="data/processed", help="Root with one folder per category.")
+    parser.add_argument("--categories", nargs="*", default=None,
+                        help="Category folders to train on. Default: the DataOrganizer ones present under --data.")
+    parser.add_argument("--balance", action="store_true", help="Class-balanced sampling.")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--max-steps", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64, help="Micro-batch size per forward pass.")
+    parser.add_argument("--accum", type=int, default=1, help="Micro-batches per optimizer step.")
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes.")
+    parser.add_argument("--bf16", action="store_true", help="bfloat16 autocast for forward passes.")
+    parser.add_argument("--compile", action="store_true", help="torch.compile netG/netD.")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads.")
+    parser.add_argument("--lr", type=float, default=0.0002)
+    parser.add_argument("--checkpoint-dir", default="checkpoints")
+    parser.add_argument("--checkpoint-steps", type=int, default=None, help="Also checkpoint every N steps.")
+    parser.add_argument("--keep-last", type=int, default=3, help="Checkpoints to keep besides the best.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the latest checkpoint.")
+    parser.add_argument("--log-every", type=int, default=50, help="Steps between metric flushes/log lines.")
+    parser.add_argument("--metrics", default=None, help="Export flushed metrics to this .csv/.jsonl file.")
+    parser.add_argument("--device", default=None)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported here so the runner module itself has no data-layer dependency
+    from src.data.dataset import CategoryImageDataset, make_dataloader
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    device = torch.device(args.device or ("cuda" if torch.cuda.is_available() else "cpu"))
+
+    dataset = CategoryImageDataset(args.data, categories=args.categories)
+    dataloader = make_dataloader(dataset, batch_size=args.batch_size, num_workers=args.workers,
+                                 balance=args.balance)
+    print(f"[INFO] Training on {len(dataset)} images {dataset.category_counts()} ({device})")
+
+    trainer = GANTrainer(dataloader, device, lr=args.lr, checkpoint_dir=args.checkpoint_dir,
+                         autocast_dtype=torch.bfloat16 if args.bf16 else None)
+    exporter = exporter_for_path(args.metrics) if args.metrics else None
+    telemetry = TrainingTelemetry(flush_every=args.log_every, exporter=exporter)
+    manager = CheckpointManager(args.checkpoint_dir, keep_last=args.keep_last)
+    runner = TrainingRunner(trainer, epochs=args.epochs, max_steps=args.max_steps,
+                            accumulation_steps=args.accum, compile=args.compile, log_every=args.log_every,
+                            telemetry=telemetry, checkpoint_manager=manager,
+                            checkpoint_every_steps=args.checkpoint_steps)
+    if args.resume:
+        runner.resume()
+    runner.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import csv
+import json
+import time
+from collections import deque
+import torch
+
+FIELDS = ("errD", "errG", "D_x", "D_G_z1", "D_G_z2")
+
+class CSVExporter:
+    """Appends flushed metric rows to a CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", newline="")
+        self._writer = None
+
+    def export(self, entry):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(entry.keys()))
+            if self._file.tell() == 0:
+                self._writer.writeheader()
+        self._writer.writerow(entry)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+class JSONLExporter:
+    """Appends flushed metric rows to a JSON-lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a")
+
+    def export(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def exporter_for_path(path):
+    """Picks an exporter by file extension (.csv or .jsonl)."""
+    if path.endswith(".csv"):
+        return CSVExporter(path)
+    if path.endswith(".jsonl") or path.endswith(".json"):
+        return JSONLExporter(path)
+    raise ValueError(f"Unknown metrics file type: {path} (expected .csv or .jsonl)")
+
+class TrainingTelemetry:
+    """Accumulates per-step GAN metrics on the device and syncs to the host only on flush.
+
+    `record` takes the detached 0-d tensors returned by
+    GANTrainer.train_step(..., return_tensors=True). Every `flush_every` steps
+    (or on `flush()`), the means since the last flush are copied to the host
+    in one transfer, appended to a bounded history and handed to the exporter.
+    """
+
+    def __init__(self, flush_every=50, history_size=10000, exporter=None):
+        self.flush_every = flush_every
+        self.history = deque(maxlen=history_size)
+        self.exporter = exporter
+        self.step = 0
+
+        self._sum = None
+        self._count = 0
+
+    def record(self, *values):
+        """Adds one step's metrics. Returns the flushed entry when this step triggered a flush."""
+        vec = torch.stack([v.detach().float() for v in values])
+        if self._sum is None:
+            self._sum = torch.zeros_like(vec)
+        self._sum.add_(vec)
+        self._count += 1
+        self.step += 1
+        if self.flush_every and self._count >= self.flush_every:
+            return self.flush()
+        return None
+
+    def flush(self):
+        if not self._count:
+            return None
+        means = (self._sum / self._count).tolist() # The only host sync
+        self._sum.zero_()
+
+        entry = {"step": self.step, "steps": self._count, "time": time.time()}
+        entry.update(zip(FIELDS, means))
+        self._count = 0
+
+        self.history.append(entry)
+        if self.exporter is not None:
+            self.exporter.export(entry)
+        return entry
+
+    def latest(self):
+        return self.history[-1] if self.history else None
+
+    def close(self):
+        self.flush()
+        if self.exporter is not None:
+            self.exporter.close()
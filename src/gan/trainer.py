@@ -4,6 +4,11 @@ import torch.optim as optim
 import torchvision.utils as vutils
 from torch.utils.data import DataLoader
 from .model import Generator, Discriminator, initialize_weights
+try:
+    from src.metrics import METRICS
+except ImportError:
+    from metrics import METRICS
+import contextlib
 import os
 
 class GANTrainer:
@@ -14,12 +19,14 @@ class GANTrainer:
                  beta1=0.5, 
                  z_dim=100,
                  img_channels=3,
-                 checkpoint_dir="checkpoints"):
+                 checkpoint_dir="checkpoints",
+                 autocast_dtype=None):
         
         self.dataloader = dataloader
         self.device = device
         self.z_dim = z_dim
         self.checkpoint_dir = checkpoint_dir
+        self.autocast_dtype = autocast_dtype # e.g. torch.bfloat16 for CPU mixed precision
         
         os.makedirs(self.checkpoint_dir, exist_ok=True)
         
@@ -40,32 +47,62 @@ class GANTrainer:
         # Fixed noise for visualization
         self.fixed_noise = torch.randn(32, z_dim, 1, 1).to(device)
 
-    def train_step(self, real_images):
-        """Performs one training step."""
+    def _autocast(self):
+        """Mixed-precision context for forward passes (no-op when autocast_dtype is None)."""
+        if self.autocast_dtype is None:
+            return contextlib.nullcontext()
+        return torch.autocast(device_type=torch.device(self.device).type, dtype=self.autocast_dtype)
+
+    def _loss(self, output, label):
+        # BCE is computed in fp32 outside autocast for numerical safety
+        return self.criterion(output.float().view(-1), label)
+
+    def compile_models(self, **kwargs):
+        """Compiles netG/netD forward in place (state_dict keys are unchanged)."""
+        self.netG.compile(**kwargs)
+        self.netD.compile(**kwargs)
+
+    @staticmethod
+    def _finish(stats, return_tensors):
+        """Returns detached 0-d tensors as-is, or converts them with a single host sync."""
+        if return_tensors:
+            return stats
+        return tuple(torch.stack(stats).tolist())
+
+    @METRICS.timed("trainer.train_step")
+    def train_step(self, real_images, return_tensors=False):
+        """Performs one training step.
+
+        Returns (errD, errG, D_x, D_G_z1, D_G_z2) as floats, or as detached
+        0-d tensors with `return_tensors=True` so the step never blocks on the device.
+        """
         b_size = real_images.size(0)
+        METRICS.count("trainer.images", b_size)
         real_label = 1.0
         fake_label = 0.0
         
         # =======================
         # Train Discriminator
         # =======================
-        self.netD.zero_grad()
+        self.netD.zero_grad(set_to_none=True)
         
         # Real batch
         label = torch.full((b_size,), real_label, dtype=torch.float, device=self.device)
-        output = self.netD(real_images).view(-1)
-        errD_real = self.criterion(output, label)
+        with self._autocast():
+            output = self.netD(real_images)
+        errD_real = self._loss(output, label)
         errD_real.backward()
-        D_x = output.mean().item()
+        D_x = output.detach().float().mean()
         
         # Fake batch
         noise = torch.randn(b_size, self.z_dim, 1, 1, device=self.device)
-        fake_images = self.netG(noise)
+        with self._autocast():
+            fake_images = self.netG(noise)
+            output = self.netD(fake_images.detach())
         label.fill_(fake_label)
-        output = self.netD(fake_images.detach()).view(-1)
-        errD_fake = self.criterion(output, label)
+        errD_fake = self._loss(output, label)
         errD_fake.backward()
-        D_G_z1 = output.mean().item()
+        D_G_z1 = output.detach().float().mean()
         
         errD = errD_real + errD_fake
         self.optimizerD.step()
@@ -73,16 +110,83 @@ class GANTrainer:
         # =======================
         # Train Generator
         # =======================
-        self.netG.zero_grad()
+        self.netG.zero_grad(set_to_none=True)
         label.fill_(real_label) # Flip labels for Generator cost
-        output = self.netD(fake_images).view(-1)
-        errG = self.criterion(output, label)
+        with self._autocast():
+            output = self.netD(fake_images)
+        errG = self._loss(output, label)
         errG.backward()
-        D_G_z2 = output.mean().item()
+        D_G_z2 = output.detach().float().mean()
+        
+        self.optimizerG.step()
+        
+        return self._finish((errD.detach(), errG.detach(), D_x, D_G_z1, D_G_z2), return_tensors)
+
+    @METRICS.timed("trainer.train_step_accumulated")
+    def train_step_accumulated(self, micro_batches, return_tensors=False):
+        """One optimizer step per network, with gradients accumulated over several micro-batches.
+
+        The Discriminator is updated over all micro-batches first, then the
+        Generator over fresh latents, so only one micro-batch graph is alive at a time.
+        """
+        total = sum(b.size(0) for b in micro_batches)
+        METRICS.count("trainer.images", total)
+        # Running sums stay on the device; no per-micro-batch host sync
+        errD, errG, D_x, D_G_z1, D_G_z2 = torch.zeros(5, device=self.device).unbind()
+        
+        # Train Discriminator
+        self.netD.zero_grad(set_to_none=True)
+        for real_images in micro_batches:
+            b_size = real_images.size(0)
+            weight = b_size / total
+            ones = torch.ones(b_size, device=self.device)
+            zeros = torch.zeros(b_size, device=self.device)
+            noise = torch.randn(b_size, self.z_dim, 1, 1, device=self.device)
+            with self._autocast():
+                out_real = self.netD(real_images)
+                with torch.no_grad():
+                    fake_images = self.netG(noise)
+                out_fake = self.netD(fake_images)
+            err = self._loss(out_real, ones) + self._loss(out_fake, zeros)
+            (err * weight).backward()
+            errD = errD + err.detach() * weight
+            D_x = D_x + out_real.detach().float().mean() * weight
+            D_G_z1 = D_G_z1 + out_fake.detach().float().mean() * weight
+        self.optimizerD.step()
         
+        # Train Generator
+        self.netG.zero_grad(set_to_none=True)
+        for real_images in micro_batches:
+            b_size = real_images.size(0)
+            weight = b_size / total
+            ones = torch.ones(b_size, device=self.device)
+            noise = torch.randn(b_size, self.z_dim, 1, 1, device=self.device)
+            with self._autocast():
+                output = self.netD(self.netG(noise))
+            err = self._loss(output, ones)
+            (err * weight).backward()
+            errG = errG + err.detach() * weight
+            D_G_z2 = D_G_z2 + output.detach().float().mean() * weight
         self.optimizerG.step()
         
-        return errD.item(), errG.item(), D_x, D_G_z1, D_G_z2
+        return self._finish((errD, errG, D_x, D_G_z1, D_G_z2), return_tensors)
+
+    def state_dict(self):
+        """Models, optimizers and visualization noise (see CheckpointManager for full resume)."""
+        return {
+            "netG": self.netG.state_dict(),
+            "netD": self.netD.state_dict(),
+            "optimizerG": self.optimizerG.state_dict(),
+            "optimizerD": self.optimizerD.state_dict(),
+            "fixed_noise": self.fixed_noise,
+        }
+
+    def load_state_dict(self, state):
+        self.netG.load_state_dict(state["netG"])
+        self.netD.load_state_dict(state["netD"])
+        self.optimizerG.load_state_dict(state["optimizerG"])
+        self.optimizerD.load_state_dict(state["optimizerD"])
+        self.fixed_noise = state["fixed_noise"].to(self.device)
 
     def save_checkpoint(self, epoch):
         """Saves model checkpoints."""
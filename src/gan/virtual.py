@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import torch
+    from torch.utils.data import Dataset
+except (ImportError, OSError):
+    torch = None
+    Dataset = object
+
+class VirtualGeneratedDataset(Dataset):
+    """Dataset of generated images stored only as seeds.
+
+    Item i is regenerated on demand from (generator weights, seed_i). Misses
+    are filled a whole aligned block of `batch_size` seeds at a time, so
+    sequential or nearby access costs one batched forward pass per block; an
+    LRU cache of decoded pixels sits in front of the generator.
+
+    Seeds are either an explicit sequence or `base_seed + i` for i < length.
+    """
+
+    def __init__(self, generator, length=None, seeds=None, base_seed=0, batch_size=32,
+                 cache_size=1024, transform=None, model_version=None):
+        if seeds is None and length is None:
+            raise ValueError("Either `length` or `seeds` is required")
+        self.generator = generator
+        self.seeds = None if seeds is None else np.asarray(seeds, dtype=np.int64)
+        self.length = len(self.seeds) if self.seeds is not None else length
+        self.base_seed = base_seed
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.transform = transform
+        self.model_version = model_version
+
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict() # index -> uint8 HWC
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.length
+
+    @staticmethod
+    def _freeze(img):
+        img.setflags(write=False) # Cached arrays are shared with every caller
+        return img
+
+    def seed(self, i):
+        if self.seeds is not None:
+            return int(self.seeds[i])
+        return self.base_seed + i
+
+    def _fill_block(self, i):
+        start = (i // self.batch_size) * self.batch_size
+        stop = min(start + self.batch_size, self.length)
+        images = self.generator.generate_batch(seeds=[self.seed(j) for j in range(start, stop)])
+        # Own copies, not views of the block: evicting an item frees it, so cache_size bounds memory
+        items = [self._freeze(images[offset].copy()) for offset in range(stop - start)]
+        with self._lock:
+            for j, img in zip(range(start, stop), items):
+                self._cache[j] = img
+                self._cache.move_to_end(j)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return items[i - start]
+
+    def get_image(self, i):
+        """uint8 HWC RGB image for item i."""
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError(f"Index {i} out of range for {self.length} virtual images")
+        with self._lock:
+            img = self._cache.get(i)
+            if img is not None:
+                self._cache.move_to_end(i)
+                self.hits += 1
+                return img
+            self.misses += 1
+        return self._fill_block(i)
+
+    def __getitem__(self, i):
+        img = self.get_image(i)
+        if self.transform is not None:
+            return self.transform(img)
+        # uint8 HWC -> float CHW, 0..255 -> -1..1
+        img_t = torch.from_numpy(np.array(img)).permute(2, 0, 1).float()
+        return img_t / 127.5 - 1.0
+
+    def records(self, defect_type=None):
+        """ImageRecord column dicts (seed + model version, no pixels) for registering the dataset in the DB."""
+        for i in range(self.length):
+            yield {
+                "filename": f"virtual_{self.seed(i)}",
+                "file_path": "",
+                "image_type": "generated",
+                "defect_type": defect_type,
+                "generation_model_version": self.model_version,
+                "latent_seed": self.seed(i),
+            }
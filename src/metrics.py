@@ -0,0 +1,261 @@
+"""In-process hot-path instrumentation.
+
+Named timers and counters are aggregated into fixed log-scale histograms, so
+recording is a perf_counter() pair plus one bucket increment and memory does
+not grow with traffic. The shared registry is METRICS:
+
+    with METRICS.timer("generator.generate_batch"):
+        ...
+    METRICS.count("trainer.images", len(batch))
+    METRICS.dump_json("metrics.json")
+
+METRICS.request_trace() arms a bounded torch.profiler capture: the next thread
+to enter an instrumented span records a trace for at most `duration` seconds
+or `max_spans` spans and writes it as a Chrome trace.
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+class Histogram:
+    """Log-scale histogram of durations in seconds: 8 buckets per power of two from 1 us up."""
+
+    BUCKETS_PER_OCTAVE = 8
+    MIN_VALUE = 1e-6
+    NUM_BUCKETS = 8 * 32 # 1 us .. ~70 min
+
+    def __init__(self):
+        self.buckets = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value):
+        if value <= self.MIN_VALUE:
+            return 0
+        return min(int(math.log2(value / self.MIN_VALUE) * self.BUCKETS_PER_OCTAVE), self.NUM_BUCKETS - 1)
+
+    def _upper(self, index):
+        return self.MIN_VALUE * 2 ** ((index + 1) / self.BUCKETS_PER_OCTAVE)
+
+    def record(self, value):
+        self.buckets[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        """Upper edge of the bucket holding the q-th percentile (within ~9% of the true value)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_sec": self.total,
+            "mean_ms": self.total / self.count * 1000.0 if self.count else 0.0,
+            "min_ms": self.min * 1000.0 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000.0,
+            "p90_ms": self.percentile(90) * 1000.0,
+            "p99_ms": self.percentile(99) * 1000.0,
+            "max_ms": self.max * 1000.0,
+        }
+
+class _TraceCapture:
+    def __init__(self, path, duration, max_spans, prefix):
+        self.path = path
+        self.duration = duration
+        self.max_spans = max_spans
+        self.prefix = prefix
+        self.profiler = None
+        self.thread = None # Ident of the owner thread
+        self.owner = None
+        self.watchdog = None
+        self.started = 0.0
+        self.spans = 0
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = True
+        self.started = time.time()
+        self.last_trace = None # Path of the last finished trace
+        self._histograms = {}
+        self._counters = {}
+        self._trace = None
+        self._finishing = {} # thread ident -> expired capture its owner still has to stop and export
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        """Records one duration under `name`."""
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.record(seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, name):
+        """Times the block into histogram `name`."""
+        if not self.enabled:
+            yield
+            return
+        if self._trace is not None or self._finishing:
+            self._trace_enter(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+            if self._trace is not None or self._finishing:
+                self._trace_exit()
+
+    def timed(self, name):
+        """Decorator form of timer()."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Plain dict of every histogram summary and counter."""
+        with self._lock:
+            timers = {name: hist.summary() for name, hist in sorted(self._histograms.items())}
+            counters = dict(sorted(self._counters.items()))
+        return {"uptime_sec": time.time() - self.started, "timers": timers, "counters": counters}
+
+    def dump_json(self, path):
+        snapshot = self.snapshot()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, path)
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started = time.time()
+
+    # --- torch.profiler capture ---
+
+    def request_trace(self, path, duration=5.0, max_spans=200, prefix=None):
+        """Arms a trace capture (ignored if one is already pending or running). Returns True if armed.
+
+        Only a span whose name starts with `prefix` (any span if None) can start
+        the capture. torch.profiler only records, and can only be stopped by, the
+        thread that started it; so once `duration` seconds have passed since this
+        call the capture ends regardless of that thread, and the owner writes the
+        file when it next enters or leaves a span.
+        """
+        with self._lock:
+            if self._trace is not None:
+                return False
+            trace = self._trace = _TraceCapture(path, duration, max_spans, prefix)
+            trace.watchdog = threading.Timer(duration, self._expire_trace, args=(trace,))
+            trace.watchdog.daemon = True
+            trace.watchdog.start()
+            return True
+
+    @property
+    def tracing(self):
+        return self._trace is not None
+
+    def _expire_trace(self, trace):
+        """Watchdog: ends a capture whose owner did not reach its limit in time."""
+        with self._lock:
+            if self._trace is not trace:
+                return # Already finished by its owner
+            self._trace = None
+            if trace.profiler is not None and trace.owner.is_alive():
+                self._finishing[trace.thread] = trace
+                return
+        if trace.profiler is None:
+            print(f"[WARNING] Profiler trace expired after {trace.duration}s without a matching span")
+        else:
+            print(f"[WARNING] Profiler trace discarded: thread {trace.owner.name} exited while recording")
+
+    def _trace_enter(self, name):
+        if self._finishing:
+            self._finish_expired() # Before this span, so it is not part of the expired capture
+        trace = self._trace
+        if trace is None or trace.thread is not None:
+            return
+        if trace.prefix is not None and not name.startswith(trace.prefix):
+            return
+        with self._lock:
+            if trace.thread is not None or self._trace is not trace:
+                return
+            trace.thread = threading.get_ident() # Profile the thread that first hits a span
+            trace.owner = threading.current_thread()
+        try:
+            import torch
+            from torch.profiler import profile, ProfilerActivity
+            activities = [ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(ProfilerActivity.CUDA)
+            trace.profiler = profile(activities=activities, record_shapes=True)
+            trace.profiler.__enter__()
+            trace.started = time.perf_counter()
+        except Exception as e:
+            print(f"[ERROR] Could not start profiler: {e}")
+            trace.watchdog.cancel()
+            with self._lock:
+                if self._trace is trace:
+                    self._trace = None
+
+    def _trace_exit(self):
+        if self._finishing:
+            self._finish_expired()
+        trace = self._trace
+        if trace is None or trace.thread != threading.get_ident() or trace.profiler is None:
+            return
+        trace.spans += 1
+        if trace.spans < trace.max_spans and time.perf_counter() - trace.started < trace.duration:
+            return
+        with self._lock:
+            if self._trace is trace:
+                self._trace = None
+            else:
+                self._finishing.pop(trace.thread, None) # The watchdog expired it meanwhile
+        trace.watchdog.cancel()
+        self._finish_trace(trace)
+
+    def _finish_expired(self):
+        with self._lock:
+            trace = self._finishing.pop(threading.get_ident(), None)
+        if trace is not None:
+            self._finish_trace(trace)
+
+    def _finish_trace(self, trace):
+        """Stops the profiler and exports the trace; runs on the owner thread."""
+        try:
+            trace.profiler.__exit__(None, None, None)
+            os.makedirs(os.path.dirname(os.path.abspath(trace.path)), exist_ok=True)
+            trace.profiler.export_chrome_trace(trace.path)
+            self.last_trace = trace.path
+            print(f"[INFO] Profiler trace ({trace.spans} spans) written to {trace.path}")
+        except Exception as e:
+            print(f"[ERROR] Profiler trace failed: {e}")
+
+METRICS = MetricsRegistry()
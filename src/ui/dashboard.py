@@ -1,7 +1,7 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, 
-                             QLabel, QSlider, QPushButton, QProgressBar, QGridLayout, QFileDialog, QCheckBox)
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QImage, QPixmap
+                             QLabel, QSlider, QPushButton, QProgressBar, QGridLayout, QFileDialog, QCheckBox,
+                             QDoubleSpinBox)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import cv2
 import numpy as np
 import sys
@@ -11,9 +11,22 @@ import time
 # Ensure we can import from src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from src.gan.inference import DefectGenerator
+from src.data.writer import AsyncImageWriter
+from src.data.thumbnails import ThumbnailCache
+from src.ui.workers import GenerationWorker, ModelLoader
+from src.ui.frames import FrameView, wrap_rgb
+from src.metrics import METRICS
 
 class DashboardWidget(QWidget):
+    PANE_SIZE = (300, 300)
+    CAMERA_NOISE_FRAMES = 8
+    DEFECT_INFO = "Inspection Result: DEFECT DETECTED (GAN Generated)"
+
+    # Emitted from ThumbnailCache pool threads; delivered on the GUI thread
+    thumbnail_ready = pyqtSignal(str, str, object)
+    # The generator is warmed up and its first frame is on screen (seconds spent loading)
+    model_ready = pyqtSignal(float)
+
     def __init__(self):
         super().__init__()
         
@@ -21,6 +34,14 @@ class DashboardWidget(QWidget):
         self.loaded_image_path = None # State for loaded image
         self.generated_dir = os.path.join(os.getcwd(), "data", "generated")
         os.makedirs(self.generated_dir, exist_ok=True)
+        self.metrics_dir = os.path.join(os.getcwd(), "data", "metrics")
+        
+        # Auto-save runs write-behind so PNG encoding never blocks the GUI thread
+        self.writer = AsyncImageWriter(num_workers=2, max_queue=64, policy="drop")
+        
+        # Reference images are shown as pane-sized thumbnails decoded off the GUI thread
+        self.thumbnails = ThumbnailCache(os.path.join(os.getcwd(), "data", "thumbnails"))
+        self.thumbnail_ready.connect(self.on_thumbnail_ready)
         
         # Left Panel: Controls & Status
         self.left_panel = QVBoxLayout()
@@ -33,13 +54,33 @@ class DashboardWidget(QWidget):
         self.setup_monitor_panel()
         self.layout.addLayout(self.right_panel, 2) # 2/3 width
         
-        # Initialize GAN Generator (Mock/Random for now if model not found)
-        self.gan = DefectGenerator(z_dim=100)
+        # GAN Generator (Mock/Random for now if model not found): torch import, build and
+        # warm-up run on a loader thread once the window is up, so START waits for it
+        self.gan = None
+        self.model_loader = ModelLoader(z_dim=100)
+        self.model_loader.loaded.connect(self.on_model_loaded)
+        self.model_loader.failed.connect(self.on_model_failed)
+        self.set_status("STATUS: MODEL WARMING", "orange")
+        self.btn_start.setEnabled(False)
+        self.lbl_gan.setText("GAN Augmentation\n(model warming up...)")
+        QTimer.singleShot(0, self.model_loader.start)
+        
+        # Generation runs on a worker thread; the GUI only displays the latest frame
+        self.worker = GenerationWorker(self.gan, target_fps=self.fps_spin.value())
+        self.worker.frame_ready.connect(self.on_frame_ready)
+        self.worker.stats_updated.connect(self.on_generation_stats)
+        self.fps_spin.valueChanged.connect(self.worker.set_target_fps)
+        
+        # Simulated camera feed: a few noise frames drawn once and cycled, not one new array per tick
+        w, h = self.PANE_SIZE
+        self.camera_noise = np.random.randint(0, 255, (self.CAMERA_NOISE_FRAMES, h, w, 3), dtype=np.uint8)
+        self.camera_noise_images = [wrap_rgb(frame) for frame in self.camera_noise]
+        self.camera_noise_index = 0
         
-        # Timer for simulating real-time feed
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_monitor)
-        # self.timer.start(2000) # Update every 2 seconds
+        # Display FPS bookkeeping
+        self.display_frames = 0
+        self.display_window_start = time.perf_counter()
+        self.display_fps = 0.0
 
     def setup_control_panel(self):
         group = QGroupBox("Equipment Control")
@@ -59,16 +100,23 @@ class DashboardWidget(QWidget):
         self.light_slider.setValue(80)
         layout.addWidget(self.light_slider, 1, 1)
         
+        # Generation Rate
+        layout.addWidget(QLabel("Target FPS (0 = max)"), 2, 0)
+        self.fps_spin = QDoubleSpinBox()
+        self.fps_spin.setRange(0.0, 120.0)
+        self.fps_spin.setValue(10.0)
+        layout.addWidget(self.fps_spin, 2, 1)
+        
         # Reference Image Loader
         btn_load = QPushButton("Load Ref Image")
         btn_load.setStyleSheet("background-color: #555555; color: white;")
         btn_load.clicked.connect(self.load_reference_image)
-        layout.addWidget(btn_load, 2, 0, 1, 2)
+        layout.addWidget(btn_load, 3, 0, 1, 2)
         
         # Auto-Save Checkbox
         self.chk_autosave = QCheckBox("Auto-Save Generated Images")
         self.chk_autosave.setStyleSheet("margin-top: 10px; font-weight: bold;")
-        layout.addWidget(self.chk_autosave, 3, 0, 1, 2)
+        layout.addWidget(self.chk_autosave, 4, 0, 1, 2)
         
         # Start/Stop Buttons
         btn_layout = QHBoxLayout()
@@ -82,7 +130,7 @@ class DashboardWidget(QWidget):
         
         btn_layout.addWidget(self.btn_start)
         btn_layout.addWidget(self.btn_stop)
-        layout.addLayout(btn_layout, 4, 0, 1, 2)
+        layout.addLayout(btn_layout, 5, 0, 1, 2)
         
         group.setLayout(layout)
         self.left_panel.addWidget(group)
@@ -104,6 +152,31 @@ class DashboardWidget(QWidget):
         self.lbl_save_status.setStyleSheet("color: #888888; font-size: 11px;")
         layout.addWidget(self.lbl_save_status)
         
+        self.lbl_fps = QLabel("Gen FPS: - | Display FPS: - | Dropped: 0")
+        self.lbl_fps.setStyleSheet("color: #888888; font-size: 11px;")
+        layout.addWidget(self.lbl_fps)
+        
+        # Live hot-path timings (p50 / p99 per named timer)
+        self.lbl_metrics = QLabel("Timers: -")
+        self.lbl_metrics.setStyleSheet("color: #888888; font-size: 11px; font-family: monospace;")
+        layout.addWidget(self.lbl_metrics)
+        
+        metrics_btns = QHBoxLayout()
+        btn_dump = QPushButton("Dump Metrics")
+        btn_dump.setStyleSheet("background-color: #555555; color: white;")
+        btn_dump.clicked.connect(self.dump_metrics)
+        metrics_btns.addWidget(btn_dump)
+        
+        self.btn_trace = QPushButton("Capture Trace")
+        self.btn_trace.setStyleSheet("background-color: #555555; color: white;")
+        self.btn_trace.clicked.connect(self.capture_trace)
+        metrics_btns.addWidget(self.btn_trace)
+        layout.addLayout(metrics_btns)
+        
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.refresh_metrics)
+        self.metrics_timer.start(1000)
+        
         group.setLayout(layout)
         self.left_panel.addWidget(group)
         self.left_panel.addStretch()
@@ -115,18 +188,13 @@ class DashboardWidget(QWidget):
         screen_layout = QHBoxLayout()
         
         # Original (Camera Feed) Placeholder
-        self.lbl_camera = QLabel("Camera Feed / Ref Image")
-        self.lbl_camera.setFixedSize(300, 300)
-        self.lbl_camera.setStyleSheet("background-color: black; border: 1px solid #333;")
-        self.lbl_camera.setAlignment(Qt.AlignCenter)
-        self.lbl_camera.setScaledContents(True)
+        self.lbl_camera = FrameView("Camera Feed / Ref Image")
+        self.lbl_camera.setFixedSize(*self.PANE_SIZE)
         
         # GAN Result Placeholder
-        self.lbl_gan = QLabel("GAN Augmentation")
-        self.lbl_gan.setFixedSize(300, 300)
-        self.lbl_gan.setStyleSheet("background-color: black; border: 1px solid #333;")
-        self.lbl_gan.setAlignment(Qt.AlignCenter)
-        self.lbl_gan.setScaledContents(True)
+        # Painted straight from the worker's frame ring buffers
+        self.lbl_gan = FrameView("GAN Augmentation")
+        self.lbl_gan.setFixedSize(*self.PANE_SIZE)
         
         screen_layout.addWidget(self.lbl_camera)
         screen_layout.addWidget(self.lbl_gan)
@@ -151,45 +219,104 @@ class DashboardWidget(QWidget):
         print(f"[DEBUG] File Selected: {file_path}")
         if file_path:
             self.loaded_image_path = file_path
-            # Display immediately
-            pixmap = QPixmap(file_path)
-            self.lbl_camera.setPixmap(pixmap)
+            self.worker.set_reference_path(file_path)
+            # Shown when the 300x300 thumbnail is ready (instant if cached)
+            self.lbl_camera.setText("Loading...")
+            self.thumbnails.request(file_path, "preview", callback=self.thumbnail_ready.emit)
+
+    def on_thumbnail_ready(self, path, kind, img):
+        if path != self.loaded_image_path:
+            return # A newer reference image was picked meanwhile
+        if img is None:
+            self.lbl_camera.setText("Failed to load image")
+            return
+        self.lbl_camera.set_image(wrap_rgb(img), owner=img) # Shares the cached (read-only) array
+
+    def set_status(self, text, color):
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(f"color: {color}; font-weight: bold; font-size: 16px;")
+
+    def on_model_loaded(self, gan, warmup_frame, seconds):
+        self.gan = gan
+        self.worker.generator = gan
+        print(f"[INFO] Generator ready in {seconds:.2f}s")
+        self.lbl_gan.set_image(wrap_rgb(warmup_frame), owner=warmup_frame)
+        self.lbl_gan.repaint() # On screen before model_ready is reported
+        self.set_status("STATUS: STANDBY", "orange")
+        self.btn_start.setEnabled(True)
+        self.model_ready.emit(seconds)
+
+    def on_model_failed(self, message):
+        print(f"[ERROR] Generator failed to load: {message}")
+        self.set_status("STATUS: MODEL ERROR", "#ff4444")
+        self.lbl_gan.setText(f"Generator failed to load:\n{message}")
 
     def start_system(self):
-        self.status_label.setText("STATUS: RUNNING")
-        self.status_label.setStyleSheet("color: #00ff99; font-weight: bold; font-size: 16px;")
+        if self.gan is None:
+            return # Still warming up
+        self.set_status("STATUS: RUNNING", "#00ff99")
         self.pbar.setRange(0, 0) # Infinite loading
-        self.timer.start(1500) # Start generating images
+        if not self.worker.isRunning():
+            self.worker.start() # Start generating images
         
     def stop_system(self):
-        self.status_label.setText("STATUS: STOPPED")
-        self.status_label.setStyleSheet("color: #ff4444; font-weight: bold; font-size: 16px;")
+        self.set_status("STATUS: STOPPED", "#ff4444")
         self.pbar.setRange(0, 100)
         self.pbar.setValue(0)
-        self.timer.stop()
+        self.worker.stop()
 
-    def update_monitor(self):
-        # Prepare Base Image for Mock Generation if available
-        base_img_for_gan = None
-        if self.loaded_image_path:
-             # cv2 reads as BGR, but QT displays RGB. 
-             # Let's read it for processing.
-             bgr_img = cv2.imread(self.loaded_image_path)
-             if bgr_img is not None:
-                 base_img_for_gan = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2RGB)
+    def shutdown(self):
+        """Stops generation and flushes pending auto-saves."""
+        self.metrics_timer.stop()
+        self.model_loader.wait() # An in-progress torch import cannot be interrupted
+        self.worker.stop()
+        self.writer.close(wait=True)
+        self.thumbnails.close()
 
-        # 1. Generate Fake Defect Image
-        # Pass base image for "CycleGAN-like" demo effect in Mock Mode
-        fake_img = self.gan.generate_image(base_image=base_img_for_gan) # HWC, RGB
+    def on_frame_ready(self):
+        slot = self.worker.take_frame()
+        if slot is None:
+            return
+        # The slot stays reserved for display until the next take_frame()
+        self.update_monitor(self.worker.ring.buffers[slot], self.worker.ring.images[slot])
         
-        # 2. Display on Label
-        h, w, ch = fake_img.shape
-        bytes_per_line = ch * w
-        # Convert RGB to QImage
-        q_img = QImage(fake_img.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(q_img) #.scaled(300, 300, Qt.KeepAspectRatio) -> handled by setScaledContents
+        self.display_frames += 1
+        now = time.perf_counter()
+        if now - self.display_window_start >= 1.0:
+            self.display_fps = self.display_frames / (now - self.display_window_start)
+            self.display_frames = 0
+            self.display_window_start = now
+
+    def refresh_metrics(self):
+        snapshot = METRICS.snapshot()
+        lines = [f"{name:<28} p50 {t['p50_ms']:7.2f} ms  p99 {t['p99_ms']:7.2f} ms  n={t['count']}"
+                 for name, t in snapshot["timers"].items()]
+        self.lbl_metrics.setText("\n".join(lines) if lines else "Timers: -")
+        self.btn_trace.setEnabled(not METRICS.tracing)
+
+    def dump_metrics(self):
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        path = os.path.join(self.metrics_dir, f"metrics_{int(time.time())}.json")
+        METRICS.dump_json(path)
+        self.lbl_save_status.setText(f"Metrics: {path}")
+
+    def capture_trace(self):
+        path = os.path.join(self.metrics_dir, f"trace_{int(time.time())}.json")
+        # Recorded on the generation thread the next time it enters a timed span
+        if METRICS.request_trace(path, duration=3.0, max_spans=200, prefix="generator."):
+            self.btn_trace.setEnabled(False)
+            self.lbl_save_status.setText(f"Trace: capturing to {path}")
+
+    def on_generation_stats(self, gen_fps, dropped):
+        self.lbl_fps.setText(f"Gen FPS: {gen_fps:.1f} | Display FPS: {self.display_fps:.1f} | Dropped: {dropped}")
+
+    def update_monitor(self, fake_img, q_img=None):
+        # 1. Fake Defect Image comes from the generation worker (HWC, RGB)
         
-        self.lbl_gan.setPixmap(pixmap)
+        # 2. Display on the pane; ring frames come with a QImage already wrapping them
+        if q_img is None:
+            q_img = wrap_rgb(fake_img)
+        self.lbl_gan.set_image(q_img, owner=fake_img)
         
         # 3. Save if Checkbox is enabled
         if self.chk_autosave.isChecked():
@@ -197,11 +324,13 @@ class DashboardWidget(QWidget):
             filename = f"gen_{timestamp}.png"
             filepath = os.path.join(self.generated_dir, filename)
             
-            # Convert RGB to BGR for OpenCV
-            fake_img_bgr = cv2.cvtColor(fake_img, cv2.COLOR_RGB2BGR)
-            cv2.imwrite(filepath, fake_img_bgr)
+            # Encoding + disk write happen on the writer pool; copied because ring buffers are reused
+            self.writer.submit(fake_img, filepath, copy=True)
             
-            self.lbl_save_status.setText(f"Saved: {filename}")
+            stats = self.writer.stats()
+            self.lbl_save_status.setText(
+                f"Saved: {filename} | queued {stats['queued']}, written {stats['written']}, "
+                f"failed {stats['failed']}, dropped {stats['dropped']}")
         
         # 4. Simulate Camera Feed OR Use Loaded Image
         if self.loaded_image_path:
@@ -210,11 +339,10 @@ class DashboardWidget(QWidget):
             pass 
         else:
             # Generate random noise/feed simulation if nothing loaded
-            noise = np.random.randint(0, 255, (256, 256, 3), dtype=np.uint8)
-            q_img_cam = QImage(noise.data, 256, 256, 256*3, QImage.Format_RGB888)
-            pixmap_cam = QPixmap.fromImage(q_img_cam)
-            self.lbl_camera.setPixmap(pixmap_cam)
-        
-        # 5. Update Info
-        self.lbl_info.setText("Inspection Result: DEFECT DETECTED (GAN Generated)")
-        self.lbl_info.setStyleSheet("font-size: 18px; font-weight: bold; color: #ff5555;")
+            self.camera_noise_index = (self.camera_noise_index + 1) % self.CAMERA_NOISE_FRAMES
+            self.lbl_camera.set_image(self.camera_noise_images[self.camera_noise_index])
+        
+        # 5. Update Info (restyling re-polishes the widget, so only on change)
+        if self.lbl_info.text() != self.DEFECT_INFO:
+            self.lbl_info.setText(self.DEFECT_INFO)
+            self.lbl_info.setStyleSheet("font-size: 18px; font-weight: bold; color: #ff5555;")
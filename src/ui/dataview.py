@@ -1,11 +1,22 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QPushButton, QHeaderView, QLabel, QLineEdit)
-from PyQt5.QtCore import Qt
-# Mock data for now, real implementation would query DB via DBManager
+import threading
+from datetime import datetime
+from functools import partial
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, QAbstractItemView,
+                             QPushButton, QHeaderView, QLabel, QLineEdit, QProgressBar,
+                             QFileDialog, QMessageBox)
+from src.database.db_manager import DBManager
+from .models import ImageTableModel
+from .workers import DBTaskWorker
 
 class DataViewWidget(QWidget):
-    def __init__(self):
+    PAGE_SIZE = 500
+
+    def __init__(self, db_manager=None, db_factory=None):
+        """Without `db_manager`, `db_factory()` (DBManager) is connected on the first query, off the GUI thread."""
         super().__init__()
+        self.db_manager = db_manager
+        self.db_factory = db_factory or DBManager
+        self._db_lock = threading.Lock()
         
         layout = QVBoxLayout(self)
         
@@ -14,56 +25,150 @@ class DataViewWidget(QWidget):
         filter_layout.addWidget(QLabel("Date Filter:"))
         self.date_input = QLineEdit()
         self.date_input.setPlaceholderText("YYYY-MM-DD")
+        self.date_input.returnPressed.connect(self.apply_filters)
         filter_layout.addWidget(self.date_input)
         
         filter_layout.addWidget(QLabel("Type:"))
         self.type_input = QLineEdit()
         self.type_input.setPlaceholderText("normal/defect_nut/etc")
+        self.type_input.returnPressed.connect(self.apply_filters)
         filter_layout.addWidget(self.type_input)
         
         btn_search = QPushButton("Search")
         btn_search.setStyleSheet("background-color: #555555;")
+        btn_search.clicked.connect(self.apply_filters)
         filter_layout.addWidget(btn_search)
         
         layout.addLayout(filter_layout)
         
-        # Table View
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "Filename", "Type", "Defect", "Created At"])
+        # Table View: rows are paged in from the DB as the view scrolls
+        self.model = ImageTableModel(partial(self.call_db, "fetch_image_page"), page_size=self.PAGE_SIZE, parent=self)
+        self.model.page_loaded.connect(self.on_page_loaded)
+        self.model.load_failed.connect(self.on_load_failed)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setAlternatingRowColors(True)
-        self.table.setStyleSheet("QTableWidget { gridline-color: #333333; } QHeaderView::section { background-color: #2d2d2d; padding: 4px; border: 1px solid #3e3e3e; }")
+        self.table.setStyleSheet("QTableView { gridline-color: #333333; } QHeaderView::section { background-color: #2d2d2d; padding: 4px; border: 1px solid #3e3e3e; }")
         
         layout.addWidget(self.table)
         
         # Pagination / Actions
         action_layout = QHBoxLayout()
-        btn_export = QPushButton("Export to CSV")
-        btn_export.setStyleSheet("background-color: #007acc;")
-        action_layout.addWidget(btn_export)
+        self.btn_export = QPushButton("Export to CSV")
+        self.btn_export.setStyleSheet("background-color: #007acc;")
+        self.btn_export.clicked.connect(self.export_csv)
+        action_layout.addWidget(self.btn_export)
         
-        btn_delete = QPushButton("Delete Selected")
-        btn_delete.setStyleSheet("background-color: #ff4444;")
-        action_layout.addWidget(btn_delete)
+        self.btn_delete = QPushButton("Delete Selected")
+        self.btn_delete.setStyleSheet("background-color: #ff4444;")
+        self.btn_delete.clicked.connect(self.delete_selected)
+        action_layout.addWidget(self.btn_delete)
         
-        layout.addLayout(action_layout)
+        self.lbl_rows = QLabel("Loading...")
+        action_layout.addWidget(self.lbl_rows)
         
-        # Load mock data
-        self.load_mock_data()
-
-    def load_mock_data(self):
-        # In a real app, use self.db_manager.get_session()
-        data = [
-            (1, "img_001.png", "Original", "Normal", "2023-10-27 10:00:00"),
-            (2, "img_002.png", "Original", "Defect_Nut", "2023-10-27 10:05:00"),
-            (3, "gen_001.png", "Generated", "Defect_Crack", "2023-10-27 10:10:00"),
-            (4, "gen_002.png", "Generated", "Defect_Hole", "2023-10-27 10:12:00"),
-        ]
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        action_layout.addWidget(self.progress)
+        
+        layout.addLayout(action_layout)
         
-        self.table.setRowCount(len(data))
-        for row_idx, row_data in enumerate(data):
-            for col_idx, col_data in enumerate(row_data):
-                item = QTableWidgetItem(str(col_data))
-                item.setTextAlignment(Qt.AlignCenter)
-                self.table.setItem(row_idx, col_idx, item)
+        self.filters = {"date": None, "type_filter": None}
+        self.task = None
+        self.model.fetchMore()
+
+    def database(self):
+        """The DBManager, created on first use. Runs on the page/task threads (engine setup, create_all)."""
+        with self._db_lock:
+            if self.db_manager is None:
+                db = self.db_factory()
+                if db.Session is None:
+                    # Not kept, so the next query (e.g. Search) retries the connection
+                    raise ConnectionError("Database connection failed. Check your connection settings.")
+                self.db_manager = db
+            return self.db_manager
+
+    def call_db(self, method, *args, **kwargs):
+        return getattr(self.database(), method)(*args, **kwargs)
+
+    def apply_filters(self):
+        text = self.date_input.text().strip()
+        try:
+            date = datetime.strptime(text, "%Y-%m-%d").date() if text else None
+        except ValueError:
+            self.lbl_rows.setText("Date must be YYYY-MM-DD")
+            return
+        self.filters = {"date": date, "type_filter": self.type_input.text().strip() or None}
+        self.lbl_rows.setText("Loading...")
+        self.model.reset(partial(self.call_db, "fetch_image_page", **self.filters))
+
+    def run_task(self, fn, *args, on_success=None, **kwargs):
+        """Runs a DB operation on a DBTaskWorker, with the action buttons disabled until it ends."""
+        if self.task is not None:
+            return
+        self.btn_export.setEnabled(False)
+        self.btn_delete.setEnabled(False)
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+
+        self.task = DBTaskWorker(fn, *args, parent=self, **kwargs)
+        self.task.progress.connect(self.on_task_progress)
+        if on_success is not None:
+            self.task.succeeded.connect(on_success)
+        self.task.failed.connect(self.on_task_failed)
+        self.task.finished.connect(self.on_task_finished)
+        self.task.start()
+
+    def on_task_progress(self, done, total):
+        self.progress.setMaximum(max(total, 1))
+        self.progress.setValue(done)
+
+    def on_task_failed(self, message):
+        QMessageBox.warning(self, "Database Error", message)
+
+    def on_task_finished(self):
+        self.task.deleteLater()
+        self.task = None
+        self.progress.setVisible(False)
+        self.btn_export.setEnabled(True)
+        self.btn_delete.setEnabled(True)
+
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export to CSV", "images.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        self.run_task(partial(self.call_db, "export_images_csv"), path, on_success=self.on_export_done, **self.filters)
+
+    def on_export_done(self, count):
+        self.lbl_rows.setText(f"Exported {count} rows")
+
+    def delete_selected(self):
+        ids = [self.model.row_data(index.row())[0] for index in self.table.selectionModel().selectedRows()]
+        if not ids:
+            return
+        answer = QMessageBox.question(self, "Delete Selected",
+                                      f"Delete {len(ids)} image record(s) and their labels?")
+        if answer != QMessageBox.Yes:
+            return
+        self.run_task(partial(self.call_db, "delete_images"), ids, on_success=self.on_delete_done)
+
+    def on_delete_done(self, count):
+        self.model.reset()
+        self.lbl_rows.setText(f"Deleted {count} rows")
+
+    def shutdown(self):
+        if self.task is not None:
+            self.task.wait()
+        self.model.wait()
+
+    def on_page_loaded(self, loaded):
+        more = "+" if self.model.canFetchMore() else ""
+        self.lbl_rows.setText(f"{loaded}{more} rows")
+
+    def on_load_failed(self, message):
+        self.lbl_rows.setText(f"DB unavailable: {message}")
@@ -0,0 +1,105 @@
+import threading
+from collections import deque
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtWidgets import QWidget
+
+def wrap_rgb(img):
+    """QImage sharing `img`'s memory (uint8 H x W x 3, C-contiguous). The caller keeps `img` alive."""
+    h, w, ch = img.shape
+    return QImage(img.data, w, h, ch * w, QImage.Format_RGB888)
+
+class FrameRing:
+    """Fixed set of reusable uint8 frame buffers passed from a producer thread to the GUI.
+
+    Each slot is allocated once, together with a QImage wrapping its memory,
+    so neither side allocates per frame. A slot is in exactly one state: free,
+    being written, ready (newest unshown frame) or displayed. The displayed
+    slot is never handed back to the producer until the GUI takes a newer
+    frame, which is what keeps the QImage over it valid while it is painted.
+    If the GUI falls behind, a newer frame replaces the ready one (a drop).
+    """
+
+    def __init__(self, shape=(256, 256, 3), slots=3):
+        if slots < 2:
+            raise ValueError("FrameRing needs at least 2 slots")
+        self.buffers = [np.zeros(shape, dtype=np.uint8) for _ in range(slots)]
+        self.images = [wrap_rgb(buf) for buf in self.buffers]
+        self.dropped = 0
+
+        self._free = deque(range(slots))
+        self._ready = None
+        self._displayed = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Producer: a slot to write the next frame into."""
+        with self._lock:
+            if self._free:
+                return self._free.popleft()
+            # Only possible with 2 slots: overwrite the frame the GUI has not taken yet
+            slot, self._ready = self._ready, None
+            self.dropped += 1
+            return slot
+
+    def publish(self, slot):
+        """Producer: marks `slot` as the newest frame. Returns True if it replaced an unshown one."""
+        with self._lock:
+            replaced = self._ready is not None
+            if replaced:
+                self._free.append(self._ready)
+                self.dropped += 1
+            self._ready = slot
+            return replaced
+
+    def take(self):
+        """GUI: the newest frame's slot (now displayed), or None. Releases the previously displayed slot."""
+        with self._lock:
+            if self._ready is None:
+                return None
+            if self._displayed is not None:
+                self._free.append(self._displayed)
+            self._displayed, self._ready = self._ready, None
+            return self._displayed
+
+class FrameView(QWidget):
+    """Fixed-size pane that paints a QImage scaled to its rect, or placeholder text.
+
+    Unlike QLabel.setPixmap, showing a frame converts nothing: the QImage (for
+    example a FrameRing slot) is painted directly. `owner` is kept referenced
+    while the image is shown, for QImages that wrap someone else's array.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self._text = text
+        self._image = None
+        self._owner = None
+
+    def setText(self, text):
+        self._text = text
+        self._image = None
+        self._owner = None
+        self.update()
+
+    def set_image(self, image, owner=None):
+        self._image = image
+        self._owner = owner
+        self.update()
+
+    def image(self):
+        return self._image
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect()
+        painter.fillRect(rect, Qt.black)
+        if self._image is not None:
+            painter.drawImage(rect, self._image)
+        else:
+            painter.setPen(QColor("#aaaaaa"))
+            painter.drawText(rect, Qt.AlignCenter, self._text)
+        painter.setPen(QColor("#333333"))
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+        painter.end()
@@ -32,6 +32,11 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.dashboard_tab, "Dashboard & Monitor")
         self.tabs.addTab(self.data_tab, "Data Management")
 
+    def closeEvent(self, event):
+        self.dashboard_tab.shutdown()
+        self.data_tab.shutdown()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     import sys
     from PyQt5.QtWidgets import QApplication
@@ -0,0 +1,139 @@
+from collections import deque
+from datetime import datetime
+from PyQt5.QtCore import (Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool,
+                          pyqtSignal)
+
+class _PageSignals(QObject):
+    loaded = pyqtSignal(int, object) # generation, rows
+    failed = pyqtSignal(int, str)
+
+class _PageTask(QRunnable):
+    """Runs one page query on a QThreadPool thread and reports back through queued signals."""
+
+    def __init__(self, fetch, generation, after, limit):
+        super().__init__()
+        self.fetch = fetch
+        self.generation = generation
+        self.after = after
+        self.limit = limit
+        self.signals = _PageSignals()
+
+    def run(self):
+        try:
+            rows = self.fetch(after=self.after, limit=self.limit)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.loaded.emit(self.generation, rows)
+
+class ImageTableModel(QAbstractTableModel):
+    """Lazily paged view of the images table for a QTableView.
+
+    Only the pages the view has scrolled to are held in memory. The view asks
+    for more through canFetchMore/fetchMore; each page is a keyset query
+    (rows after the last loaded (created_at, id)) run off the GUI thread, and
+    the result is appended when it arrives. reset() bumps a generation counter
+    so pages still in flight from before the reset are ignored.
+    """
+
+    HEADERS = ["ID", "Filename", "Type", "Defect", "Created At"]
+    CREATED_AT_COLUMN = 4
+
+    page_loaded = pyqtSignal(int) # rows loaded so far
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, fetch_page, page_size=500, parent=None):
+        """`fetch_page(after=None, limit=...)` returns a list of row tuples in HEADERS order."""
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1) # Pages must arrive in order
+
+        self._rows = []
+        self._has_more = True
+        self._loading = False
+        self._generation = 0
+        self._pending = deque() # Keeps tasks (and their signal objects) alive until delivered, in run order
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self._rows[index.row()][index.column()]
+            if value is None:
+                return ""
+            if isinstance(value, datetime):
+                return value.strftime("%Y-%m-%d %H:%M:%S")
+            return str(value)
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def row_data(self, row):
+        return self._rows[row]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last[self.CREATED_AT_COLUMN], last[0])
+        self._loading = True
+        task = _PageTask(self.fetch_page, self._generation, after, self.page_size)
+        task.setAutoDelete(False)
+        task.signals.loaded.connect(self._on_loaded)
+        task.signals.failed.connect(self._on_failed)
+        self._pending.append(task)
+        self.pool.start(task)
+
+    def _on_loaded(self, generation, rows):
+        self._pending.popleft() # Single-thread pool: results arrive in submission order
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._has_more = len(rows) == self.page_size
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        self.page_loaded.emit(len(self._rows))
+
+    def _on_failed(self, generation, message):
+        self._pending.popleft() # Single-thread pool: results arrive in submission order
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._has_more = False
+        self.load_failed.emit(message)
+
+    def reset(self, fetch_page=None):
+        """Drops loaded rows (optionally switching the query) and loads the first page again."""
+        self.beginResetModel()
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        self._generation += 1
+        self._rows = []
+        self._has_more = True
+        self._loading = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def wait(self, msecs=-1):
+        """Blocks until queued page queries have run (their results are delivered by the event loop)."""
+        return self.pool.waitForDone(msecs)
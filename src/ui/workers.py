@@ -0,0 +1,152 @@
+import threading
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+from src.data.cache import ImageCache
+from src.ui.frames import FrameRing
+from src.metrics import METRICS
+
+class GenerationWorker(QThread):
+    """Runs DefectGenerator off the GUI thread and hands the latest frame to the UI.
+
+    Frames are generated straight into the slots of a FrameRing, so steady
+    state allocates no frame memory. Frames are coalesced: if the UI has not
+    picked up the previous frame yet, it is replaced by the newer one and
+    counted as dropped.
+    """
+
+    frame_ready = pyqtSignal()
+    stats_updated = pyqtSignal(float, int) # generation FPS, dropped frames
+
+    def __init__(self, generator, target_fps=10.0, image_cache=None, ring=None, parent=None):
+        super().__init__(parent)
+        self.generator = generator
+        self.image_cache = image_cache if image_cache is not None else ImageCache()
+        size = getattr(generator, "img_size", 256)
+        self.ring = ring if ring is not None else FrameRing((size, size, 3))
+        self.target_fps = target_fps
+        self.generated = 0
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._reference_path = None
+
+    def set_target_fps(self, fps):
+        """0 means generate as fast as possible."""
+        self.target_fps = fps
+
+    def set_reference_path(self, path):
+        with self._lock:
+            self._reference_path = path
+
+    @property
+    def dropped(self):
+        return self.ring.dropped
+
+    def take_frame(self):
+        """Returns the ring slot of the most recent frame (or None) and marks it as displayed.
+
+        The slot's buffer and QImage (ring.buffers[slot], ring.images[slot])
+        stay untouched until the next take_frame() call.
+        """
+        return self.ring.take()
+
+    def stop(self):
+        self._stop_event.set()
+        self.wait()
+
+    def _load_reference(self):
+        with self._lock:
+            path = self._reference_path
+        if not path:
+            return None
+        try:
+            # Decoded + pre-resized once per file version; repeated ticks are free
+            return self.image_cache.get_resized(path, (256, 256))
+        except (OSError, ValueError):
+            return None
+
+    def run(self):
+        self._stop_event.clear()
+        window_start = time.perf_counter()
+        window_frames = 0
+
+        while not self._stop_event.is_set():
+            tick = time.perf_counter()
+
+            # Pass base image for "CycleGAN-like" demo effect in Mock Mode
+            slot = self.ring.acquire()
+            self.generator.generate_image(base_image=self._load_reference(), out=self.ring.buffers[slot])
+
+            # If the UI has not taken the previous frame, it already has a signal queued
+            pending = self.ring.publish(slot)
+            self.generated += 1
+            if not pending:
+                self.frame_ready.emit()
+
+            window_frames += 1
+            now = time.perf_counter()
+            if now - window_start >= 1.0:
+                self.stats_updated.emit(window_frames / (now - window_start), self.dropped)
+                window_start = now
+                window_frames = 0
+
+            if self.target_fps and self.target_fps > 0:
+                remaining = 1.0 / self.target_fps - (now - tick)
+                if remaining > 0:
+                    self._stop_event.wait(remaining)
+
+class ModelLoader(QThread):
+    """Imports torch, builds the DefectGenerator and warms it up off the GUI thread.
+
+    Importing torch and allocating the generator take seconds, so the window
+    is shown first and the model arrives later through `loaded`. The warm-up
+    forward pass pays the first-call costs (allocator growth, kernel
+    selection) before the first real frame; its output doubles as a preview.
+    """
+
+    loaded = pyqtSignal(object, object, float) # DefectGenerator, warm-up frame (HWC, RGB), seconds
+    failed = pyqtSignal(str)
+
+    def __init__(self, model_path=None, z_dim=100, device=None, parent=None):
+        super().__init__(parent)
+        self.model_path = model_path
+        self.z_dim = z_dim
+        self.device = device
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            with METRICS.timer("startup.model_load"):
+                from src.gan.inference import DefectGenerator # First torch import happens here
+                generator = DefectGenerator(model_path=self.model_path, z_dim=self.z_dim, device=self.device)
+            with METRICS.timer("startup.warmup"):
+                frame = generator.generate_image()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(generator, frame, time.perf_counter() - t0)
+
+class DBTaskWorker(QThread):
+    """Runs one long DB operation (export, delete) off the GUI thread.
+
+    `fn(*args, progress=callback, **kwargs)` is called on the worker thread;
+    the callback forwards (done, total) to the `progress` signal.
+    """
+
+    progress = pyqtSignal(int, int)
+    succeeded = pyqtSignal(object) # fn's return value
+    failed = pyqtSignal(str)
+
+    def __init__(self, fn, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress=self.progress.emit, **self.kwargs)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(result)
@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+import benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare_respects_direction(self):
+        """Throughput drops and latency rises beyond the threshold are regressions"""
+        baseline = {"metrics": {"fps": benchmarks.metric(100.0, "frames/s"),
+                                "query": benchmarks.metric(10.0, "ms", higher_is_better=False)}}
+        results = {"metrics": {"fps": benchmarks.metric(90.0, "frames/s"),
+                               "query": benchmarks.metric(13.0, "ms", higher_is_better=False),
+                               "new_metric": benchmarks.metric(1.0, "x")}}
+        report = {r["name"]: r for r in benchmarks.compare(results, baseline, threshold=0.2)}
+        self.assertEqual(set(report), {"fps", "query"}) # No baseline, nothing to compare
+        self.assertFalse(report["fps"]["regressed"])
+        self.assertTrue(report["query"]["regressed"])
+        self.assertAlmostEqual(report["fps"]["change"], -0.1)
+
+    def test_cli_fails_on_regression(self):
+        """A run writes JSON with machine info and exits 1 against an unreachable baseline"""
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "bench.json")
+            self.assertEqual(benchmarks.main(["--quick", "--only", "mock", "--out", out]), 0)
+            with open(out) as f:
+                results = json.load(f)
+            self.assertIn("cpu_count", results["machine"])
+            self.assertGreater(results["metrics"]["mock_generate_image"]["value"], 0)
+
+            results["metrics"]["mock_generate_image"]["value"] *= 1000
+            baseline = os.path.join(tmp, "baseline.json")
+            with open(baseline, "w") as f:
+                json.dump(results, f)
+            self.assertEqual(benchmarks.main(["--quick", "--only", "mock", "--baseline", baseline]), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import tempfile
+import threading
+from unittest import mock
+import numpy as np
+import cv2
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.cache import ImageCache
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ref.png")
+        cv2.imwrite(self.path, np.full((64, 80, 3), 10, dtype=np.uint8))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_reads_hit_cache(self):
+        """Second lookup returns the same decoded and resized arrays"""
+        cache = ImageCache()
+        small = cache.get_resized(self.path, (256, 256))
+        self.assertEqual(small.shape, (256, 256, 3))
+        self.assertIs(cache.get_resized(self.path, (256, 256)), small)
+        self.assertEqual(cache.get(self.path).shape, (64, 80, 3))
+        self.assertEqual(cache.misses, 1)
+        self.assertFalse(small.flags.writeable)
+
+    def test_invalidated_on_file_change(self):
+        """Rewriting the file (new mtime) forces a fresh decode"""
+        cache = ImageCache()
+        first = cache.get(self.path)
+        cv2.imwrite(self.path, np.full((64, 80, 3), 200, dtype=np.uint8))
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        second = cache.get(self.path)
+        self.assertIsNot(first, second)
+        self.assertEqual(int(second[0, 0, 0]), 200)
+
+    def test_byte_budget_evicts_lru(self):
+        """Entries beyond the byte budget are evicted oldest first"""
+        other = os.path.join(self.tmp.name, "other.png")
+        cv2.imwrite(other, np.zeros((64, 80, 3), dtype=np.uint8))
+        cache = ImageCache(max_bytes=64 * 80 * 3)
+        cache.get(self.path)
+        cache.get(other)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+        cache.get(other)
+        self.assertEqual(cache.misses, 2)
+
+    def test_concurrent_misses_keep_byte_count(self):
+        """Two threads decoding the same file at once are accounted for once"""
+        cache = ImageCache()
+        barrier = threading.Barrier(2)
+        real_imread = cv2.imread
+
+        def slow_imread(path):
+            barrier.wait(timeout=5) # Both threads have missed before either inserts
+            return real_imread(path)
+
+        with mock.patch("data.cache.cv2.imread", slow_imread):
+            threads = [threading.Thread(target=cache.get, args=(self.path,)) for _ in range(2)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.current_bytes, 64 * 80 * 3)
+
+if __name__ == "__main__":
+    unittest.main()
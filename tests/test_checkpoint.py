@@ -0,0 +1,68 @@
+import sys
+import os
+import tempfile
+import torch
+import torch.nn as nn
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from gan.checkpoint import CheckpointManager
+
+class TinyTrainer:
+    """Stands in for GANTrainer: same state_dict()/load_state_dict() contract, small weights."""
+
+    def __init__(self):
+        self.net = nn.Linear(4, 2)
+        self.optimizer = torch.optim.Adam(self.net.parameters())
+
+    def step(self):
+        self.optimizer.zero_grad()
+        self.net(torch.randn(3, 4)).sum().backward()
+        self.optimizer.step()
+
+    def state_dict(self):
+        return {"net": self.net.state_dict(), "optimizer": self.optimizer.state_dict()}
+
+    def load_state_dict(self, state):
+        self.net.load_state_dict(state["net"])
+        self.optimizer.load_state_dict(state["optimizer"])
+
+class TestCheckpointManager(unittest.TestCase):
+    def test_snapshot_is_isolated_and_resume_restores(self):
+        """Saved state is a copy; resume restores weights, optimizer and RNG"""
+        with tempfile.TemporaryDirectory() as tmp:
+            trainer = TinyTrainer()
+            trainer.step()
+            manager = CheckpointManager(tmp)
+            manager.save(trainer, step=1, epoch=0)
+            saved_weight = trainer.net.weight.detach().clone()
+            expected_noise = torch.randn(3)
+
+            trainer.step() # Mutates weights while the write may still be in flight
+            manager.wait()
+
+            restored = TinyTrainer()
+            checkpoint = manager.resume(restored)
+            self.assertEqual(checkpoint["step"], 1)
+            self.assertTrue(torch.equal(restored.net.weight, saved_weight))
+            self.assertIn("exp_avg", restored.optimizer.state_dict()["state"][0])
+            self.assertTrue(torch.equal(torch.randn(3), expected_noise))
+
+    def test_retention_keeps_last_and_best(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            trainer = TinyTrainer()
+            manager = CheckpointManager(tmp, keep_last=2, keep_best=1)
+            for step, metric in enumerate([5.0, 1.0, 4.0, 3.0, 2.5]):
+                manager.save(trainer, step=step, epoch=step, metric=metric)
+            manager.close()
+
+            files = sorted(f for f in os.listdir(tmp) if f.endswith(".pt"))
+            self.assertEqual(files, ["ckpt_step_000000001.pt", "ckpt_step_000000003.pt", "ckpt_step_000000004.pt"])
+            self.assertTrue(manager.best().endswith("ckpt_step_000000001.pt"))
+            self.assertTrue(manager.latest().endswith("ckpt_step_000000004.pt"))
+            self.assertEqual(len(CheckpointManager(tmp).entries), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+import os
+import csv
+import tempfile
+from datetime import datetime, timedelta
+import unittest
+from sqlalchemy import inspect, text, func, select
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from database.db_manager import DBManager
+from database.schema import ImageRecord, LabelRecord
+
+class TestDBManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DBManager(db_url=f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}")
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_bulk_insert_images_and_labels(self):
+        """Chunked Core inserts write every row, optional columns may be omitted"""
+        rows = ({"filename": f"gen_{i}.png", "file_path": f"data/generated/gen_{i}.png",
+                 "image_type": "generated", "latent_seed": i} for i in range(2500))
+        self.assertEqual(self.db.bulk_insert_images(rows, chunk_size=1000), 2500)
+        self.assertEqual(self.db.bulk_insert_labels(
+            [{"image_id": 1, "class_id": 0, "x_center": 0.5, "y_center": 0.5, "width": 0.1, "height": 0.1}]), 1)
+
+        with self.db.get_session() as session:
+            self.assertEqual(session.scalar(select(func.count()).select_from(ImageRecord)), 2500)
+            record = session.get(ImageRecord, 2500)
+            self.assertEqual(record.latent_seed, 2499)
+            self.assertIsNotNone(record.created_at)
+
+    def test_keyset_pages_cover_all_rows(self):
+        """Consecutive keyset pages are newest-first and never overlap"""
+        self.db.bulk_insert_images({"filename": f"{i}.png", "file_path": "", "image_type": "original"}
+                                   for i in range(25))
+        seen = []
+        after = None
+        while True:
+            page = self.db.fetch_image_page(after=after, limit=10)
+            if not page:
+                break
+            seen.extend(row[0] for row in page)
+            after = (page[-1][4], page[-1][0])
+        self.assertEqual(seen, list(range(25, 0, -1)))
+
+    def test_filters_export_and_delete(self):
+        """Date/type filters, streamed CSV export and batched delete with labels"""
+        day = datetime(2024, 5, 1, 12, 0)
+        self.db.bulk_insert_images([
+            {"filename": "a.png", "file_path": "", "image_type": "original", "defect_type": "normal", "created_at": day},
+            {"filename": "b.png", "file_path": "", "image_type": "generated", "defect_type": "crack", "created_at": day},
+            {"filename": "c.png", "file_path": "", "image_type": "generated", "defect_type": "crack",
+             "created_at": day + timedelta(days=1)},
+        ])
+        self.db.bulk_insert_labels([{"image_id": i, "class_id": 0, "x_center": 0.5, "y_center": 0.5,
+                                     "width": 0.1, "height": 0.1} for i in (1, 2, 2, 3)])
+
+        self.assertEqual(self.db.count_images(date=day.date()), 2)
+        self.assertEqual(self.db.count_images(type_filter="crack"), 2)
+        self.assertEqual([r[1] for r in self.db.fetch_image_page(date=day.date(), type_filter="generated")], ["b.png"])
+
+        path = os.path.join(self.tmp.name, "export.csv")
+        progress = []
+        self.assertEqual(self.db.export_images_csv(path, type_filter="crack", progress=lambda d, t: progress.append((d, t)),
+                                                   progress_every=1), 2)
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:2], ["id", "filename"])
+        self.assertEqual([r[1] for r in rows[1:]], ["c.png", "b.png"])
+        self.assertEqual(progress[-1], (2, 2))
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+        self.assertEqual(self.db.delete_images([2, 3], chunk_size=1), 2)
+        with self.db.get_session() as session:
+            self.assertEqual(session.scalar(select(func.count()).select_from(ImageRecord)), 1)
+            self.assertEqual(session.scalars(select(LabelRecord.image_id)).all(), [1])
+
+    def test_indexes_foreign_keys_and_pragmas(self):
+        inspector = inspect(self.db.engine)
+        indexed = {tuple(ix["column_names"]) for ix in inspector.get_indexes("images")}
+        for column in ("image_type", "defect_type", "parent_image_id"):
+            self.assertIn((column,), indexed)
+        self.assertIn(("created_at", "id"), indexed)
+        self.assertIn(("image_id",), {tuple(ix["column_names"]) for ix in inspector.get_indexes("labels")})
+        self.assertEqual(inspector.get_foreign_keys("labels")[0]["referred_table"], "images")
+
+        with self.db.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            self.assertEqual(conn.execute(text("PRAGMA foreign_keys")).scalar(), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import cv2
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.dataset import CategoryImageDataset, EpochSampler, make_dataloader
+
+class TestCategoryImageDataset(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "processed")
+        counts = {"normal": 4, "defect_crack": 2, "defect_hole": 1}
+        for category, n in counts.items():
+            os.makedirs(os.path.join(self.root, category))
+            for i in range(n):
+                img = np.full((40, 60, 3), 20 * i, dtype=np.uint8)
+                cv2.imwrite(os.path.join(self.root, category, f"{i}.png"), img)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_items_and_cache_reuse(self):
+        """Items are resized once into a memmap cache that later instances reuse"""
+        ds = CategoryImageDataset(self.root, categories=["normal", "defect_crack"], size=32)
+        self.assertEqual(len(ds), 6)
+        img, label = ds[5]
+        self.assertEqual(tuple(img.shape), (3, 32, 32))
+        self.assertEqual(label, 1)
+
+        mtime = os.path.getmtime(ds.cache_path)
+        again = CategoryImageDataset(self.root, categories=["normal", "defect_crack"], size=32)
+        self.assertEqual(again.cache_path, ds.cache_path)
+        self.assertEqual(os.path.getmtime(again.cache_path), mtime)
+
+    def test_default_categories_and_stale_cache(self):
+        """Non-category folders are ignored by default; a rebuilt cache replaces the old one"""
+        os.makedirs(os.path.join(self.root, "ingested"))
+        cv2.imwrite(os.path.join(self.root, "ingested", "x.png"), np.zeros((40, 60, 3), dtype=np.uint8))
+        ds = CategoryImageDataset(self.root, size=32)
+        self.assertEqual(ds.categories, ["defect_crack", "defect_hole", "normal"])
+
+        cv2.imwrite(os.path.join(self.root, "normal", "new.png"), np.zeros((40, 60, 3), dtype=np.uint8))
+        rebuilt = CategoryImageDataset(self.root, size=32)
+        self.assertNotEqual(rebuilt.cache_path, ds.cache_path)
+        self.assertEqual(sorted(p.name for p in rebuilt.cache_dir.glob("images_*")),
+                         sorted([rebuilt.cache_path.name, rebuilt.cache_path.with_suffix(".json").name]))
+
+    def test_sampler_deterministic_and_balanced(self):
+        """Shuffles depend only on (seed, epoch); balancing equalises categories"""
+        ds = CategoryImageDataset(self.root, size=16)
+        sampler = EpochSampler(ds.labels, seed=3)
+        first = list(sampler)
+        self.assertEqual(first, list(EpochSampler(ds.labels, seed=3)))
+        sampler.set_epoch(1)
+        self.assertNotEqual(first, list(sampler))
+
+        balanced = EpochSampler(ds.labels, seed=3, balance=True)
+        picked = ds.labels[list(balanced)]
+        self.assertEqual(len(balanced), 12)
+        self.assertEqual(np.bincount(picked).tolist(), [4, 4, 4])
+
+    def test_dataloader_batches(self):
+        ds = CategoryImageDataset(self.root, size=16)
+        loader = make_dataloader(ds, batch_size=3)
+        images, labels = next(iter(loader))
+        self.assertEqual(tuple(images.shape), (3, 3, 16, 16))
+        self.assertEqual(len(labels), 3)
+
+if __name__ == "__main__":
+    unittest.main()
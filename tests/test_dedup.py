@@ -0,0 +1,104 @@
+import sys
+import os
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.dedup import DuplicateIndex, perceptual_hash, hamming, to_signed64, from_signed64
+from data.ingestion import ImageLoader, IngestionPipeline
+from database.db_manager import DBManager
+
+def textured(seed, size=128):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (8, 8, 3), dtype=np.uint8)
+    return cv2.resize(small, (size, size), interpolation=cv2.INTER_CUBIC)
+
+class TestPerceptualHash(unittest.TestCase):
+    def test_near_copies_stay_close(self):
+        """Resizing, JPEG re-encoding and mild noise flip few bits; other content flips many"""
+        img = textured(0)
+        h = perceptual_hash(img)
+        resized = cv2.resize(img, (100, 100))
+        jpeg = cv2.imdecode(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 70])[1], cv2.IMREAD_COLOR)
+        noisy = np.clip(img.astype(np.int16) + np.random.default_rng(1).integers(-5, 6, img.shape), 0, 255)
+        for variant in (resized, jpeg, noisy.astype(np.uint8)):
+            self.assertLessEqual(hamming(h, perceptual_hash(variant)), 6)
+        self.assertGreater(hamming(h, perceptual_hash(textured(2))), 12)
+
+    def test_signed_round_trip(self):
+        for h in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            s = to_signed64(h)
+            self.assertTrue(-(1 << 63) <= s < (1 << 63))
+            self.assertEqual(from_signed64(s), h)
+
+class TestDuplicateIndex(unittest.TestCase):
+    def test_radius_queries_match_brute_force(self):
+        """Multi-index lookups return exactly the hashes a linear scan finds"""
+        rng = np.random.default_rng(0)
+        base = [int(x) for x in rng.integers(0, 1 << 63, 200, dtype=np.int64)]
+        index = DuplicateIndex(radius=4)
+        hashes = {}
+        for i, h in enumerate(base):
+            hashes[i] = h
+            # A few near copies of each base hash, 1..6 bits away
+            for j, flips in enumerate((1, 3, 6)):
+                bits = rng.choice(64, flips, replace=False)
+                hashes[(i, j)] = h ^ sum(1 << int(b) for b in bits)
+        for key, h in hashes.items():
+            index.add(key, phash=h)
+
+        for probe in base[:20]:
+            expected = {k for k, h in hashes.items() if hamming(probe, h) <= 4}
+            self.assertEqual({k for k, _ in index.query(probe)}, expected)
+            self.assertEqual(index.query(probe)[0][1], 0)
+
+    def test_exact_and_add_if_new(self):
+        index = DuplicateIndex(radius=2)
+        self.assertIsNone(index.add_if_new("a", "h1", 0b1111))
+        self.assertEqual(index.add_if_new("b", "h1", 1 << 40), ("a", 0)) # Same bytes
+        self.assertEqual(index.add_if_new("c", "h2", 0b0111), ("a", 1)) # Near hash
+        self.assertIsNone(index.add_if_new("d", "h3", 0b1111 << 20))
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.find(phash=0b1111, exclude="a")) # A file is not a duplicate of itself
+
+class TestDedupIngestion(unittest.TestCase):
+    def test_ingestion_drops_duplicates_and_records_hashes(self):
+        """Byte copies and re-encoded copies are dropped; written files get DB rows with both hashes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = os.path.join(tmp, "raw")
+            os.makedirs(raw)
+            cv2.imwrite(os.path.join(raw, "a.png"), textured(0, 256))
+            cv2.imwrite(os.path.join(raw, "b_copy.png"), textured(0, 256))
+            cv2.imwrite(os.path.join(raw, "c_jpeg.jpg"), textured(0, 256))
+            cv2.imwrite(os.path.join(raw, "d.png"), textured(5, 256))
+
+            db = DBManager(db_url=f"sqlite:///{os.path.join(tmp, 'test.db')}")
+            loader = ImageLoader(raw_data_path=raw, processed_path=os.path.join(tmp, "processed"))
+            pipeline = IngestionPipeline(loader, workers=1, dedup=DuplicateIndex(radius=6), db_manager=db)
+            stats = pipeline.run()
+            self.assertEqual((stats["processed"], stats["duplicate"]), (2, 2))
+
+            rows = list(db.iter_image_hashes())
+            self.assertEqual(len(rows), 2)
+            rebuilt = DuplicateIndex.from_db(db, radius=6)
+            self.assertIsNotNone(rebuilt.find(phash=perceptual_hash(textured(0, 256))))
+
+            # Lost manifest (crash before it was saved): a DB-seeded index must not flag files as
+            # duplicates of their own records, and the replayed inserts must not duplicate rows
+            os.remove(pipeline.out_dir / IngestionPipeline.MANIFEST)
+            stats = IngestionPipeline(loader, workers=1, dedup=rebuilt, db_manager=db).run()
+            self.assertEqual((stats["processed"], stats["duplicate"]), (2, 2))
+            self.assertEqual(len(list(db.iter_image_hashes())), 2)
+
+            # A fresh index seeded from the manifest still catches copies of unchanged files
+            cv2.imwrite(os.path.join(raw, "e_copy.png"), textured(5, 256))
+            stats = IngestionPipeline(loader, workers=1, dedup=DuplicateIndex(radius=6)).run()
+            self.assertEqual((stats["skipped"], stats["duplicate"], stats["processed"]), (2, 3, 0))
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    unittest.main()
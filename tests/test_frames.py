@@ -0,0 +1,64 @@
+import sys
+import os
+import unittest
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from PyQt5.QtWidgets import QApplication
+from ui.frames import FrameRing, FrameView
+from gan.inference import DefectGenerator
+
+class TestFrameRing(unittest.TestCase):
+    def test_displayed_slot_is_never_reused(self):
+        """The producer never gets the slot on screen; unshown frames are replaced and counted"""
+        ring = FrameRing((4, 4, 3), slots=3)
+        a = ring.acquire()
+        self.assertFalse(ring.publish(a))
+        self.assertEqual(ring.take(), a)
+        self.assertIsNone(ring.take())
+
+        # GUI stalls on `a` while the producer keeps going
+        for _ in range(10):
+            slot = ring.acquire()
+            self.assertNotEqual(slot, a)
+            ring.publish(slot)
+        self.assertEqual(ring.dropped, 9)
+        b = ring.take()
+        self.assertNotEqual(b, a)
+        self.assertIn(a, ring._free) # Released once a newer frame is displayed
+
+    def test_images_share_buffer_memory(self):
+        ring = FrameRing((8, 8, 3), slots=2)
+        ring.buffers[0][:] = (1, 2, 3)
+        self.assertEqual(ring.images[0].pixelColor(0, 0).getRgb()[:3], (1, 2, 3))
+
+    def test_generator_writes_into_slot(self):
+        """Mock-mode generation fills the preallocated buffer in place"""
+        gen = DefectGenerator(z_dim=100, device="cpu")
+        gen.netG = None # Mock Mode
+        ring = FrameRing((256, 256, 3))
+        slot = ring.acquire()
+        buf = ring.buffers[slot]
+        out = gen.generate_image(base_image=np.full((256, 256, 3), 100, dtype=np.uint8), out=buf)
+        self.assertTrue(np.shares_memory(out, buf))
+        self.assertGreater(int(buf.max()), 0)
+
+class TestFrameView(unittest.TestCase):
+    def test_paints_image_and_placeholder(self):
+        app = QApplication.instance() or QApplication([])
+        view = FrameView("waiting")
+        view.resize(30, 30)
+        ring = FrameRing((10, 10, 3), slots=2)
+        ring.buffers[0][:] = 255
+        view.set_image(ring.images[0], owner=ring.buffers[0])
+        self.assertEqual(view.grab().toImage().pixelColor(15, 15).getRgb()[:3], (255, 255, 255))
+        view.setText("stopped")
+        self.assertIsNone(view.image())
+        self.assertEqual(view.grab().toImage().pixelColor(3, 3).getRgb()[:3], (0, 0, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import sys
 import os
+import tempfile
 import torch
 import unittest
 
@@ -8,8 +9,18 @@ sys.path.append(os.path.abspath("src"))
 
 from gan.model import Generator, Discriminator
 from gan.trainer import GANTrainer
+from gan.runner import TrainingRunner
 from torch.utils.data import DataLoader, TensorDataset
 
+class ResumedManager:
+    """CheckpointManager stand-in that resumes at step 5 of epoch 0 and saves nothing"""
+    def resume(self, trainer, path=None):
+        return {"step": 5, "epoch": 0, "extra": {"images_seen": 100, "epoch_complete": False, "epoch_step": 0}}
+    def save(self, *args, **kwargs):
+        pass
+    def wait(self):
+        pass
+
 class TestGANArchitecture(unittest.TestCase):
     def setUp(self):
         self.z_dim = 100
@@ -56,5 +67,45 @@ class TestGANArchitecture(unittest.TestCase):
         self.assertIsInstance(errD, float)
         self.assertIsInstance(errG, float)
 
+    def test_runner_accumulation_bf16(self):
+        """Runner drives accumulated bf16 steps and reports throughput"""
+        dummy_data = torch.randn(4, 3, 256, 256)
+        dataloader = DataLoader(TensorDataset(dummy_data), batch_size=1)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            trainer = GANTrainer(dataloader, self.device, z_dim=self.z_dim, checkpoint_dir=tmp,
+                                 autocast_dtype=torch.bfloat16)
+            runner = TrainingRunner(trainer, epochs=1, max_steps=1, accumulation_steps=2, log_every=1)
+            summary = runner.run()
+            
+            self.assertEqual(runner.step, 1)
+            self.assertEqual(runner.images_seen, 2)
+            self.assertGreater(summary["images_per_sec"], 0)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "netG_epoch_0.pth")))
+
+    def test_runner_trains_partial_last_group(self):
+        """Batches left over at the end of an epoch form a short accumulation group"""
+        dataloader = DataLoader(TensorDataset(torch.randn(3, 3, 256, 256)), batch_size=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            trainer = GANTrainer(dataloader, self.device, z_dim=self.z_dim, checkpoint_dir=tmp)
+            runner = TrainingRunner(trainer, epochs=1, accumulation_steps=2, log_every=1)
+            runner.run()
+            self.assertEqual(runner.step, 2)
+            self.assertEqual(runner.images_seen, 3)
+
+    def test_resumed_throughput_counts_this_session_only(self):
+        """After resume, img/s divides this session's images by this session's step time"""
+        dataloader = DataLoader(TensorDataset(torch.randn(1, 3, 256, 256)), batch_size=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            trainer = GANTrainer(dataloader, self.device, z_dim=self.z_dim, checkpoint_dir=tmp)
+            runner = TrainingRunner(trainer, epochs=1, log_every=1, checkpoint_manager=ResumedManager())
+            self.assertTrue(runner.resume())
+            summary = runner.run()
+            self.assertEqual(runner.images_seen, 101)
+            self.assertEqual(runner.session_images, 1)
+            self.assertAlmostEqual(summary["images_per_sec"], 1 / sum(runner.step_times))
+            # Telemetry continues the step count instead of restarting at 0
+            self.assertEqual(runner.telemetry.latest()["step"], 6)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from gan.inference import DefectGenerator
+from gan.generate import BulkGenerator
+from data.dedup import DuplicateIndex
+from database.db_manager import DBManager
+
+class RepeatingGenerator:
+    """iter_images stand-in that emits the same frame every other image"""
+    def iter_images(self, total, batch_size=16, timings=None):
+        frames = [np.random.default_rng(seed).integers(0, 255, (64, 64, 3), dtype=np.uint8) for seed in (0, 1)]
+        for i in range(total):
+            yield frames[i % 2]
+
+class TestBulkGenerator(unittest.TestCase):
+    def test_sharded_output_and_resume(self):
+        """Images land in shard folders and a second run resumes after the first"""
+        gen = DefectGenerator(z_dim=100, device="cpu")
+        with tempfile.TemporaryDirectory() as tmp:
+            bulk = BulkGenerator(gen, tmp, workers=2, batch_size=2, shard_size=2)
+            self.assertEqual(bulk.run(3), 3)
+            self.assertTrue(os.path.exists(bulk.image_path(2)))
+            self.assertIn("shard_00001", bulk.image_path(2))
+
+            bulk.timings["encode"] = 1e6 # Stale total from "earlier runs"
+            self.assertEqual(bulk.run(4), 1)
+            self.assertLess(bulk.timings["encode"], 1e6) # Only this run's image
+            with open(os.path.join(tmp, "progress.json")) as f:
+                self.assertEqual(json.load(f)["completed"], 4)
+            self.assertEqual(bulk.run(4), 0)
+
+    def test_dedup_drops_repeats(self):
+        """Only one copy of each repeated image is written"""
+        with tempfile.TemporaryDirectory() as tmp:
+            bulk = BulkGenerator(RepeatingGenerator(), tmp, workers=2, batch_size=2, dedup=DuplicateIndex())
+            self.assertEqual(bulk.run(6), 6)
+            self.assertEqual(bulk.duplicates, 4)
+            written = [i for i in range(6) if os.path.exists(bulk.image_path(i))]
+            # Encode workers race, so the surviving copy is not necessarily the lowest index
+            self.assertEqual(sorted(i % 2 for i in written), [0, 1])
+
+    def test_dedup_survives_resume(self):
+        """A resumed run seeds its index from the hashes written by the previous one"""
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(BulkGenerator(RepeatingGenerator(), tmp, workers=2, batch_size=2,
+                                           dedup=DuplicateIndex()).run(2), 2)
+            bulk = BulkGenerator(RepeatingGenerator(), tmp, workers=2, batch_size=2, dedup=DuplicateIndex())
+            self.assertEqual(bulk.run(6), 4)
+            self.assertEqual(bulk.duplicates, 4)
+            self.assertEqual(sorted(bulk.load_hashes(6)), [0, 1])
+
+    def test_dedup_against_database(self):
+        """Written images are recorded with hashes, and a DB-seeded index drops their repeats"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DBManager(db_url=f"sqlite:///{os.path.join(tmp, 'test.db')}")
+            first = os.path.join(tmp, "first")
+            bulk = BulkGenerator(RepeatingGenerator(), first, workers=2, batch_size=2,
+                                 dedup=DuplicateIndex.from_db(db), db_manager=db)
+            self.assertEqual(bulk.run(4), 4)
+            self.assertEqual(db.count_images(), 2)
+            self.assertEqual(len(list(db.iter_image_hashes())), 2)
+
+            second = os.path.join(tmp, "second")
+            bulk = BulkGenerator(RepeatingGenerator(), second, workers=2, batch_size=2,
+                                 dedup=DuplicateIndex.from_db(db), db_manager=db)
+            self.assertEqual(bulk.run(4), 4)
+            self.assertEqual(bulk.duplicates, 4)
+            self.assertEqual(db.count_images(), 2)
+            db.engine.dispose()
+
+if __name__ == "__main__":
+    unittest.main()
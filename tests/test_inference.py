@@ -0,0 +1,147 @@
+import sys
+import os
+import numpy as np
+import torch
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from gan.inference import DefectGenerator
+from gan.model import Generator
+from gan.optimize import build_inference_generator, parity_check
+from gan.virtual import VirtualGeneratedDataset
+
+class TestDefectGenerator(unittest.TestCase):
+    def setUp(self):
+        self.gen = DefectGenerator(z_dim=100, device="cpu")
+
+    def test_generate_batch_layout(self):
+        """Batch output is a contiguous uint8 NHWC array"""
+        images = self.gen.generate_batch(3)
+        self.assertEqual(images.shape, (3, 256, 256, 3))
+        self.assertEqual(images.dtype, np.uint8)
+        self.assertTrue(images.flags["C_CONTIGUOUS"])
+
+    def test_micro_batching_matches_single_pass(self):
+        """Splitting into micro-batches must not change the generated images"""
+        self.assertEqual(self.gen.micro_batch_size(max_batch_mb=1), 1)
+
+        torch.manual_seed(0)
+        split = self.gen.generate_batch(3, max_batch_mb=1)
+        torch.manual_seed(0)
+        whole = self.gen.generate_batch(3, max_batch_mb=4096)
+
+        diff = np.abs(split.astype(np.int16) - whole.astype(np.int16))
+        self.assertLessEqual(diff.max(), 1)
+
+    def test_iter_images_streams_total(self):
+        """iter_images yields exactly `total` frames across uneven batches"""
+        frames = list(self.gen.iter_images(3, batch_size=2))
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[-1].shape, (256, 256, 3))
+
+    def test_iter_images_early_close(self):
+        """Abandoning the iterator stops the background producer"""
+        it = self.gen.iter_images(1000, batch_size=1)
+        next(it)
+        it.close()
+
+    def test_seeded_generation_is_reproducible(self):
+        """The same seed gives the same image regardless of batch composition"""
+        a = self.gen.generate_batch(seeds=[7, 8])
+        b = self.gen.generate_batch(seeds=[9, 7])
+        self.assertLessEqual(np.abs(a[0].astype(np.int16) - b[1].astype(np.int16)).max(), 1)
+        latents = self.gen.latents_for_seeds([7, 8, 7])
+        self.assertTrue(torch.equal(latents[0], latents[2]))
+        self.assertFalse(torch.equal(latents[0], latents[1]))
+
+    def test_virtual_dataset_blocks_and_cache(self):
+        """Virtual items regenerate per block and are served from the LRU cache after"""
+        ds = VirtualGeneratedDataset(self.gen, length=3, base_seed=100, batch_size=2, cache_size=4,
+                                     model_version="v1")
+        first = ds.get_image(1)
+        self.assertIs(ds.get_image(0), ds._cache[0]) # Same block, no second forward pass
+        self.assertIsNone(first.base) # Owns its pixels, not a view of the whole block
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual((ds.hits, ds.misses), (1, 1))
+        self.assertEqual(tuple(ds[2].shape), (3, 256, 256))
+
+        direct = self.gen.generate_batch(seeds=[101])[0]
+        self.assertLessEqual(np.abs(first.astype(np.int16) - direct.astype(np.int16)).max(), 1)
+        self.assertEqual(next(ds.records())["latent_seed"], 100)
+
+class TestMockMode(unittest.TestCase):
+    def setUp(self):
+        self.gen = DefectGenerator(z_dim=100, device="cpu")
+        self.gen.netG = None # Same path as a failed torch import
+        self.base = np.full((300, 400, 3), 100, dtype=np.uint8)
+
+    def test_mock_batch_with_reference(self):
+        """Batched mock frames blend the reference, noise and a red box"""
+        images = self.gen.generate_batch(8, base_image=self.base)
+        self.assertEqual(images.shape, (8, 256, 256, 3))
+        self.assertTrue(((images >= 80) & (images <= 89)).mean() > 0.9) # 0.8 * 100 + 0..9 noise
+        self.assertTrue((images == (204, 0, 0)).all(axis=-1).any(axis=(1, 2)).all())
+
+        single = self.gen.generate_image(base_image=self.base)
+        self.assertEqual(single.shape, (256, 256, 3))
+
+    def test_mock_seeded_and_preallocated(self):
+        engine = self.gen.mock_engine()
+        a = engine.generate(0, seeds=[1, 2, 3])
+        b = engine.generate(0, seeds=[3])
+        np.testing.assert_array_equal(a[2], b[0])
+
+        out = np.empty((4, 256, 256, 3), dtype=np.uint8)
+        self.assertIs(engine.generate(4, base_image=self.base, out=out), out)
+
+    def test_mock_seeded_across_instances(self):
+        """Seeded mock images do not depend on the generator instance (or process)"""
+        other = DefectGenerator(z_dim=100, device="cpu")
+        other.netG = None
+        other.generate_batch(64) # Unseeded draws first
+        for base in (None, self.base):
+            np.testing.assert_array_equal(self.gen.generate_batch(seeds=[7, 8], base_image=base),
+                                          other.generate_batch(seeds=[7, 8], base_image=base))
+
+    def test_mock_reference_edited_in_place(self):
+        """Large batches stay within the fixed pools, and in-place edits to the reference show up"""
+        engine = self.gen.mock_engine()
+        pool_bytes = engine._blend_noise.nbytes
+        images = engine.generate(engine.pool_frames * 3 + 1, base_image=self.base)
+        self.assertEqual(engine._blend_noise.nbytes, pool_bytes)
+        self.assertTrue(((images[-1] >= 80) & (images[-1] <= 89)).mean() > 0.9)
+
+        self.base[:] = 200
+        images = engine.generate(2, base_image=self.base)
+        self.assertTrue(((images >= 160) & (images <= 169)).mean() > 0.9) # 0.8 * 200 + 0..9 noise
+
+class TestInferenceBuild(unittest.TestCase):
+    def test_folded_generator_matches_reference(self):
+        """BN folding + channels_last reproduce the eval-mode reference output"""
+        torch.manual_seed(0)
+        reference = Generator(100).eval()
+        for m in reference.modules():
+            if isinstance(m, torch.nn.BatchNorm2d):
+                # Non-trivial running stats so folding actually matters
+                m.running_mean.uniform_(-0.2, 0.2)
+                m.running_var.uniform_(0.5, 2.0)
+                m.weight.data.uniform_(0.5, 1.5)
+                m.bias.data.uniform_(-0.2, 0.2)
+
+        optimized = build_inference_generator(reference)
+        self.assertFalse(any(isinstance(m, torch.nn.BatchNorm2d) for m in optimized.modules()))
+        self.assertLess(parity_check(reference, optimized, batch_size=1), 1e-4)
+
+        bf16 = build_inference_generator(reference, bf16=True)
+        self.assertLess(parity_check(reference, bf16, batch_size=1), 5e-2)
+
+    def test_defect_generator_optimized_build(self):
+        gen = DefectGenerator(z_dim=100, device="cpu", optimize=True)
+        images = gen.generate_batch(2)
+        self.assertEqual(images.shape, (2, 256, 256, 3))
+        self.assertTrue(images.flags["C_CONTIGUOUS"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.ingestion import ImageLoader, IngestionPipeline
+
+class TestIngestionPipeline(unittest.TestCase):
+    def test_walks_processes_and_skips_unchanged(self):
+        """Nested files are cropped/resized in parallel; a rerun only redoes changed files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = os.path.join(tmp, "raw")
+            os.makedirs(os.path.join(raw, "line_a"))
+            for i, rel in enumerate(["a.png", "b.jpg", os.path.join("line_a", "c.png")]):
+                img = np.full((120, 160, 3), i * 40, dtype=np.uint8)
+                cv2.imwrite(os.path.join(raw, rel), img)
+            with open(os.path.join(raw, "notes.txt"), "w") as f:
+                f.write("not an image")
+
+            loader = ImageLoader(raw_data_path=raw, processed_path=os.path.join(tmp, "processed"))
+            pipeline = IngestionPipeline(loader, subfolder="ingested", size=(64, 64), roi=(20, 10, 100, 100),
+                                         workers=2, max_in_flight=2)
+            stats = pipeline.run()
+            self.assertEqual((stats["processed"], stats["skipped"], stats["failed"]), (3, 0, 0))
+            self.assertGreater(stats["files_per_sec"], 0)
+            self.assertEqual(set(stats["stage_ms"]), set(IngestionPipeline.STAGES))
+
+            out = cv2.imread(str(pipeline.output_path(os.path.join("line_a", "c.png"))))
+            self.assertEqual(out.shape, (64, 64, 3))
+            self.assertTrue(pipeline.output_path("b.jpg").name.endswith("b.png"))
+
+            # Touch one file's content, leave the others alone
+            cv2.imwrite(os.path.join(raw, "a.png"), np.full((120, 160, 3), 200, dtype=np.uint8))
+            stats = pipeline.run()
+            self.assertEqual((stats["processed"], stats["skipped"]), (1, 2))
+            with open(pipeline.out_dir / IngestionPipeline.MANIFEST) as f:
+                self.assertEqual(len(json.load(f)), 3)
+
+            # Without dedup or a DB, nothing is hashed
+            with open(pipeline.out_dir / IngestionPipeline.MANIFEST) as f:
+                self.assertIsNone(json.load(f)["a.png"]["hash"])
+
+            # New crop/resize params redo every file
+            pipeline = IngestionPipeline(loader, subfolder="ingested", size=(32, 32), workers=2)
+            self.assertEqual(pipeline.run()["processed"], 3)
+            self.assertEqual(cv2.imread(str(pipeline.output_path("a.png"))).shape, (32, 32, 3))
+
+    def test_unreadable_file_is_counted_not_fatal(self):
+        """A corrupt image is reported as failed and retried on the next run"""
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = os.path.join(tmp, "raw")
+            os.makedirs(raw)
+            with open(os.path.join(raw, "broken.png"), "wb") as f:
+                f.write(b"not a png")
+            loader = ImageLoader(raw_data_path=raw, processed_path=os.path.join(tmp, "processed"))
+            stats = IngestionPipeline(loader, workers=1).run()
+            self.assertEqual((stats["processed"], stats["failed"]), (0, 1))
+            self.assertEqual(IngestionPipeline(loader, workers=1).run()["failed"], 1)
+
+    def test_db_records_are_flushed_in_batches(self):
+        """ImageRecord rows are inserted every db_batch_size files, not held until the run ends"""
+        class RecordingDB:
+            def __init__(self):
+                self.batches = []
+            def insert_new_images(self, rows):
+                self.batches.append(len(rows))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = os.path.join(tmp, "raw")
+            os.makedirs(raw)
+            for i in range(5):
+                cv2.imwrite(os.path.join(raw, f"img_{i}.png"), np.full((32, 32, 3), i * 40, dtype=np.uint8))
+            loader = ImageLoader(raw_data_path=raw, processed_path=os.path.join(tmp, "processed"))
+            db = RecordingDB()
+            stats = IngestionPipeline(loader, workers=1, db_manager=db, db_batch_size=2).run()
+            self.assertEqual(stats["processed"], 5)
+            self.assertEqual(db.batches, [2, 2, 1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+import unittest
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+try:
+    from src.metrics import METRICS, MetricsRegistry, Histogram
+except ImportError:
+    from metrics import METRICS, MetricsRegistry, Histogram
+from gan.inference import DefectGenerator
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_error(self):
+        hist = Histogram()
+        values = np.linspace(0.001, 0.1, 1000) # 1..100 ms
+        for v in values:
+            hist.record(float(v))
+        summary = hist.summary()
+        self.assertEqual(summary["count"], 1000)
+        for q, key in ((50, "p50_ms"), (99, "p99_ms")):
+            exact = np.percentile(values, q) * 1000.0
+            self.assertLess(abs(summary[key] - exact) / exact, 0.1)
+        self.assertAlmostEqual(summary["max_ms"], 100.0)
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_timers_counters_and_dump(self):
+        registry = MetricsRegistry()
+        for _ in range(5):
+            with registry.timer("work"):
+                pass
+        registry.count("items", 3)
+        registry.count("items")
+
+        @registry.timed("decorated")
+        def fn(x):
+            """doc"""
+            return x * 2
+        self.assertEqual(fn(2), 4)
+        self.assertEqual(fn.__doc__, "doc")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            registry.dump_json(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data["timers"]["work"]["count"], 5)
+        self.assertEqual(data["timers"]["decorated"]["count"], 1)
+        self.assertEqual(data["counters"]["items"], 4)
+
+    def test_hot_paths_are_instrumented(self):
+        """Mock-mode generation records timers and an image counter on the shared registry"""
+        gen = DefectGenerator(z_dim=100, device="cpu")
+        gen.netG = None # Mock Mode
+        before = METRICS.snapshot()
+        gen.generate_image()
+        gen.generate_batch(3)
+        after = METRICS.snapshot()
+        count = lambda snap, name: snap["timers"].get(name, {}).get("count", 0)
+        self.assertEqual(count(after, "generator.generate_image") - count(before, "generator.generate_image"), 1)
+        self.assertEqual(count(after, "generator.generate_batch") - count(before, "generator.generate_batch"), 1)
+        self.assertEqual(after["counters"]["generator.images"] - before["counters"].get("generator.images", 0), 3)
+
+    def test_bounded_trace_capture(self):
+        """A requested trace records the next spans on one thread and stops after max_spans"""
+        import torch
+        registry = MetricsRegistry()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            self.assertTrue(registry.request_trace(path, duration=60.0, max_spans=3))
+            self.assertFalse(registry.request_trace(path)) # Only one at a time
+
+            # Spans on another thread do not touch the capture owned by this one
+            with registry.timer("step"):
+                torch.ones(8) @ torch.ones(8)
+            other = threading.Thread(target=lambda: registry.timer("other").__enter__())
+            other.start()
+            other.join()
+            for _ in range(2):
+                with registry.timer("step"):
+                    torch.ones(8) @ torch.ones(8)
+            self.assertFalse(registry.tracing)
+            self.assertEqual(registry.last_trace, path)
+            with open(path) as f:
+                self.assertIn("traceEvents", json.load(f))
+
+    def test_trace_ends_after_duration_without_owner(self):
+        """An expired capture frees the registry even if its owner never runs another span"""
+        import torch
+        registry = MetricsRegistry()
+        with tempfile.TemporaryDirectory() as tmp:
+            # Owner thread exits right after its first span: nothing can be written
+            self.assertTrue(registry.request_trace(os.path.join(tmp, "lost.json"), duration=0.2))
+            owner = threading.Thread(target=lambda: registry.timer("db.fetch").__enter__())
+            owner.start()
+            owner.join()
+            time.sleep(1.0)
+            self.assertFalse(registry.tracing)
+            for _ in range(50):
+                with registry.timer("step"):
+                    pass
+            self.assertFalse(os.path.exists(os.path.join(tmp, "lost.json")))
+
+            # Idle but alive owner (this thread): the file is written at its next span
+            path = os.path.join(tmp, "trace.json")
+            self.assertTrue(registry.request_trace(path, duration=0.2, prefix="generator."))
+            with registry.timer("db.fetch"): # Does not match the prefix, cannot own the capture
+                pass
+            with registry.timer("generator.step"):
+                torch.ones(8) @ torch.ones(8)
+            time.sleep(1.0)
+            self.assertFalse(registry.tracing)
+            self.assertFalse(os.path.exists(path))
+            with registry.timer("generator.step"):
+                pass
+            self.assertEqual(registry.last_trace, path)
+            self.assertTrue(os.path.exists(path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.shards import ShardWriter, ShardReader, ShardDataset
+
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.images = np.random.randint(0, 255, (5, 16, 16, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_raw_roundtrip_and_memmap(self):
+        """Raw shards read back exactly and expose an NHWC memmap"""
+        prefix = os.path.join(self.tmp.name, "raw_0")
+        with ShardWriter(prefix, mode="raw", shape=(16, 16, 3)) as writer:
+            writer.write_batch(self.images[:3])
+            writer.write(self.images[3])
+
+        # Reopening appends after the existing records
+        with ShardWriter(prefix, mode="raw", shape=(16, 16, 3)) as writer:
+            self.assertEqual(writer.count, 4)
+            writer.write(self.images[4])
+
+        reader = ShardReader(prefix)
+        self.assertEqual(len(reader), 5)
+        np.testing.assert_array_equal(reader.array, self.images)
+        np.testing.assert_array_equal(reader[-1], self.images[4])
+
+    def test_png_roundtrip_and_dataset(self):
+        """Encoded shards decode losslessly and feed a Dataset in -1..1"""
+        prefix = os.path.join(self.tmp.name, "png_0")
+        with ShardWriter(prefix, mode="png") as writer:
+            writer.write_batch(self.images)
+
+        np.testing.assert_array_equal(ShardReader(prefix)[2], self.images[2])
+
+        dataset = ShardDataset([prefix, prefix])
+        self.assertEqual(len(dataset), 10)
+        sample = dataset[7]
+        self.assertEqual(tuple(sample.shape), (3, 16, 16))
+        self.assertGreaterEqual(float(sample.min()), -1.0)
+        self.assertLessEqual(float(sample.max()), 1.0)
+
+    def test_recovers_from_torn_append(self):
+        """Payload bytes without an index entry are discarded on reopen"""
+        prefix = os.path.join(self.tmp.name, "raw_1")
+        with ShardWriter(prefix, mode="raw", shape=(16, 16, 3)) as writer:
+            writer.write_batch(self.images[:2])
+        with open(prefix + ".bin", "ab") as f:
+            f.write(b"partial record")
+
+        with ShardWriter(prefix, mode="raw", shape=(16, 16, 3)) as writer:
+            writer.write(self.images[2])
+        np.testing.assert_array_equal(ShardReader(prefix).array, self.images[:3])
+
+if __name__ == "__main__":
+    unittest.main()
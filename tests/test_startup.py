@@ -0,0 +1,79 @@
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from PyQt5.QtWidgets import QApplication
+from src.ui.workers import ModelLoader
+import benchmarks
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_main_window_import_does_not_load_torch(self):
+        """torch is only imported by the background model loader, never on the way to the first window"""
+        code = "import sys, src.ui.main_window; print('torch' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                env=dict(os.environ, QT_QPA_PLATFORM="offscreen"), check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+
+    def test_main_window_does_not_wait_for_the_database(self):
+        """A slow DB host delays only the Data Management rows, not the window"""
+        from src.ui.main_window import MainWindow
+        connected_on = []
+
+        class SlowDB:
+            def __init__(self):
+                time.sleep(1.0)
+                connected_on.append(threading.get_ident())
+                self.Session = None # Connection failed
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp, mock.patch("src.ui.dataview.DBManager", SlowDB):
+            os.chdir(tmp) # The dashboard creates its data/ folders in the cwd
+            try:
+                t0 = time.perf_counter()
+                window = MainWindow()
+                self.assertLess(time.perf_counter() - t0, 1.0)
+                window.close()
+                window.data_tab.shutdown()
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(len(connected_on), 1)
+        self.assertNotIn(threading.get_ident(), connected_on)
+
+    def test_model_loader_warms_up(self):
+        """The loader hands over the generator together with a warm-up frame"""
+        results = []
+        loader = ModelLoader(z_dim=100, device="cpu")
+        loader.loaded.connect(lambda gan, frame, seconds: results.append((gan, frame, seconds)))
+        loader.failed.connect(self.fail)
+        loader.run() # Synchronously, on this thread
+
+        self.assertEqual(len(results), 1)
+        gan, frame, seconds = results[0]
+        self.assertEqual(frame.shape, (256, 256, 3))
+        self.assertEqual(gan.generate_image().shape, frame.shape)
+        self.assertGreater(seconds, 0)
+
+    def test_startup_benchmark(self):
+        """main.py --measure-startup reports the first window before the first frame and DB page"""
+        results = benchmarks.bench_startup(quick=True)
+        first_window = results["startup_first_window"]["value"]
+        self.assertGreater(first_window, 0)
+        self.assertGreaterEqual(results["startup_first_frame"]["value"], first_window)
+        self.assertGreater(results["startup_first_page"]["value"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import os
+import csv
+import json
+import tempfile
+import torch
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from gan.telemetry import TrainingTelemetry, CSVExporter, JSONLExporter
+
+class TestTrainingTelemetry(unittest.TestCase):
+    def _step(self, value):
+        return [torch.tensor(float(value)) for _ in range(5)]
+
+    def test_flushes_means_every_n_steps(self):
+        """Per-step tensors are averaged on flush into the history ring"""
+        telemetry = TrainingTelemetry(flush_every=2, history_size=2)
+        self.assertIsNone(telemetry.record(*self._step(1)))
+        entry = telemetry.record(*self._step(3))
+        self.assertEqual(entry["steps"], 2)
+        self.assertAlmostEqual(entry["errD"], 2.0)
+        self.assertAlmostEqual(entry["D_G_z2"], 2.0)
+
+        for value in range(4):
+            telemetry.record(*self._step(value))
+        self.assertEqual(len(telemetry.history), 2)
+        self.assertEqual(telemetry.latest()["step"], 6)
+        self.assertIsNone(telemetry.flush())
+
+    def test_exporters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "metrics.csv")
+            jsonl_path = os.path.join(tmp, "metrics.jsonl")
+            for exporter in (CSVExporter(csv_path), JSONLExporter(jsonl_path)):
+                telemetry = TrainingTelemetry(flush_every=1, exporter=exporter)
+                telemetry.record(*self._step(1))
+                telemetry.record(*self._step(2))
+                telemetry.close()
+
+            with open(csv_path) as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual([float(r["errG"]) for r in rows], [1.0, 2.0])
+            with open(jsonl_path) as f:
+                entries = [json.loads(line) for line in f]
+            self.assertEqual(entries[-1]["step"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
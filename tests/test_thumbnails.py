@@ -0,0 +1,74 @@
+import sys
+import os
+import tempfile
+import threading
+import unittest
+import numpy as np
+import cv2
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.thumbnails import ThumbnailCache
+
+class TestThumbnailCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "capture.png")
+        img = np.zeros((600, 900, 3), dtype=np.uint8)
+        img[:, :, 2] = 255 # Red in BGR
+        cv2.imwrite(self.src, img)
+        self.cache_dir = os.path.join(self.tmp.name, "thumbs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_layers(self):
+        """First get decodes once for all sizes; then memory hits; a new instance reads from disk"""
+        cache = ThumbnailCache(self.cache_dir, sizes={"preview": (300, 300), "row": (32, 32)})
+        preview = cache.get(self.src, "preview")
+        self.assertEqual(preview.shape, (300, 300, 3))
+        self.assertEqual(tuple(preview[0, 0]), (255, 0, 0)) # RGB
+        self.assertFalse(preview.flags.writeable)
+        self.assertEqual(cache.get(self.src, "row").shape, (32, 32, 3))
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+        cache.close()
+
+        # Copy under another name: same content, same thumbnails, nothing decoded
+        copy = os.path.join(self.tmp.name, "copy.png")
+        with open(self.src, "rb") as f, open(copy, "wb") as g:
+            g.write(f.read())
+        cache = ThumbnailCache(self.cache_dir, sizes={"preview": (300, 300), "row": (32, 32)})
+        self.assertEqual(cache.get(copy, "row").shape, (32, 32, 3))
+        self.assertEqual((cache.misses, cache.disk_hits), (0, 1))
+        cache.close()
+
+    def test_changed_file_gets_new_thumbnail(self):
+        cache = ThumbnailCache(self.cache_dir)
+        cache.get(self.src)
+        cv2.imwrite(self.src, np.zeros((50, 50, 3), dtype=np.uint8))
+        os.utime(self.src, ns=(1, 1)) # Make sure the stamp changes even on coarse clocks
+        self.assertEqual(tuple(cache.get(self.src)[0, 0]), (0, 0, 0))
+        cache.close()
+
+    def test_request_runs_in_background(self):
+        cache = ThumbnailCache(self.cache_dir)
+        done = threading.Event()
+        results = []
+        def callback(path, kind, img):
+            results.append((path, kind, None if img is None else img.shape, threading.current_thread().name))
+            done.set()
+        cache.request(self.src, "preview", callback=callback)
+        self.assertTrue(done.wait(10))
+        path, kind, shape, thread_name = results[0]
+        self.assertEqual((path, kind, shape), (self.src, "preview", (300, 300, 3)))
+        self.assertTrue(thread_name.startswith("ThumbnailCache"))
+
+        done.clear()
+        cache.request(os.path.join(self.tmp.name, "missing.png"), callback=callback)
+        self.assertTrue(done.wait(10))
+        self.assertIsNone(results[1][2])
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
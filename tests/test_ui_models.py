@@ -0,0 +1,114 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from PyQt5.QtCore import QCoreApplication
+from PyQt5.QtWidgets import QApplication
+from ui.models import ImageTableModel
+from ui.dataview import DataViewWidget
+
+def fake_fetch(rows):
+    """fetch_image_page stand-in over an in-memory list sorted newest first"""
+    def fetch(after=None, limit=500):
+        start = 0
+        if after is not None:
+            start = next(i for i, r in enumerate(rows) if (r[4], r[0]) == after) + 1
+        return rows[start:start + limit]
+    return fetch
+
+class TestImageTableModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QApplication([])
+
+    def load(self, model):
+        model.wait()
+        QCoreApplication.processEvents()
+
+    def test_pages_in_on_demand(self):
+        """Rows arrive one page per fetchMore until a short page ends the query"""
+        rows = [(i, f"{i}.png", "generated", None, 1000 - i) for i in range(25)]
+        model = ImageTableModel(fake_fetch(rows), page_size=10)
+        self.assertEqual(model.rowCount(), 0)
+
+        model.fetchMore()
+        self.assertFalse(model.canFetchMore()) # One page in flight at a time
+        self.load(model)
+        self.assertEqual(model.rowCount(), 10)
+        self.assertEqual(model.data(model.index(0, 1)), "0.png")
+        self.assertEqual(model.data(model.index(0, 3)), "")
+
+        while model.canFetchMore():
+            model.fetchMore()
+            self.load(model)
+        self.assertEqual(model.rowCount(), 25)
+        self.assertEqual([model.row_data(i)[0] for i in range(25)], list(range(25)))
+
+    def test_reset_discards_stale_pages(self):
+        """A page requested before reset() is dropped when it arrives"""
+        model = ImageTableModel(fake_fetch([(1, "old.png", "original", None, 1)]), page_size=10)
+        model.fetchMore()
+        model.reset(fake_fetch([(2, "new.png", "original", None, 2)]))
+        self.load(model)
+        self.assertEqual(model.rowCount(), 1)
+        self.assertEqual(model.row_data(0)[0], 2)
+
+    def test_failed_query_stops_paging(self):
+        """A failing query is reported and not retried in a loop"""
+        def broken(after=None, limit=500):
+            raise ConnectionError("no db")
+        model = ImageTableModel(broken)
+        errors = []
+        model.load_failed.connect(errors.append)
+        model.fetchMore()
+        self.load(model)
+        self.assertEqual(errors, ["no db"])
+        self.assertFalse(model.canFetchMore())
+
+class FakeDB:
+    """DBManager stand-in whose construction is slow, like connecting to a remote host"""
+    created_on = []
+
+    def __init__(self, connected=True):
+        time.sleep(0.3)
+        FakeDB.created_on.append(threading.get_ident())
+        self.Session = object() if connected else None
+        self.fetch_image_page = fake_fetch([(1, "a.png", "original", None, 1)])
+
+class TestDataViewWidget(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        FakeDB.created_on.clear()
+
+    def test_db_connects_off_the_gui_thread(self):
+        """Constructing the tab does not wait for the database; the first page query connects"""
+        t0 = time.perf_counter()
+        view = DataViewWidget(db_factory=FakeDB)
+        self.assertLess(time.perf_counter() - t0, 0.3)
+        view.shutdown()
+        QCoreApplication.processEvents()
+        self.assertEqual(view.model.rowCount(), 1)
+        self.assertNotIn(threading.get_ident(), FakeDB.created_on)
+
+    def test_failed_connection_is_retried(self):
+        """A failed connection is reported and the next search tries again"""
+        view = DataViewWidget(db_factory=lambda: FakeDB(connected=False))
+        view.shutdown()
+        QCoreApplication.processEvents()
+        self.assertTrue(view.lbl_rows.text().startswith("DB unavailable"))
+        view.apply_filters()
+        view.shutdown()
+        self.assertEqual(len(FakeDB.created_on), 2)
+
+if __name__ == '__main__':
+    unittest.main()
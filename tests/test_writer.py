@@ -0,0 +1,66 @@
+import sys
+import os
+import tempfile
+import threading
+from unittest import mock
+import numpy as np
+import cv2
+import unittest
+
+# Add src to path
+sys.path.append(os.path.abspath("src"))
+
+from data.writer import AsyncImageWriter, png_params
+
+class TestAsyncImageWriter(unittest.TestCase):
+    def test_writes_and_counts(self):
+        """Queued frames are written as PNG and counted"""
+        img = np.random.randint(0, 255, (32, 32, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = AsyncImageWriter(num_workers=2, policy="block")
+            for i in range(5):
+                self.assertTrue(writer.submit(img, os.path.join(tmp, f"gen_{i}.png")))
+            writer.close(wait=True)
+
+            stats = writer.stats()
+            self.assertEqual(stats["queued"], 5)
+            self.assertEqual(stats["written"], 5)
+            self.assertEqual(stats["failed"], 0)
+
+            saved = cv2.cvtColor(cv2.imread(os.path.join(tmp, "gen_0.png")), cv2.COLOR_BGR2RGB)
+            np.testing.assert_array_equal(saved, img)
+
+    def test_drop_policy_never_blocks(self):
+        """With a full queue, the drop policy rejects instead of waiting"""
+        img = np.zeros((8, 8, 3), dtype=np.uint8)
+        busy, release = threading.Event(), threading.Event()
+
+        def stalled_imwrite(*args):
+            busy.set()
+            release.wait(timeout=5)
+            return True
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch("data.writer.cv2.imwrite", stalled_imwrite):
+            writer = AsyncImageWriter(num_workers=1, max_queue=2, policy="drop")
+            self.assertTrue(writer.submit(img, os.path.join(tmp, "0.png")))
+            self.assertTrue(busy.wait(timeout=5)) # The only worker is now stuck on the first image
+            results = [writer.submit(img, os.path.join(tmp, f"{i}.png")) for i in range(1, 5)]
+            self.assertEqual(results, [True, True, False, False])
+            self.assertEqual(writer.stats()["dropped"], 2)
+            release.set()
+            writer.close(wait=True)
+            self.assertEqual(writer.stats()["written"], 3)
+
+    def test_requires_a_worker(self):
+        """Without workers nothing would drain the queue, so close(wait=True) would hang"""
+        with self.assertRaises(ValueError):
+            AsyncImageWriter(num_workers=0)
+
+    def test_png_params_default_to_opencv(self):
+        """No explicit level unless one is asked for"""
+        self.assertEqual(png_params(), [])
+        self.assertEqual(png_params(9), [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        self.assertIsNone(AsyncImageWriter(num_workers=1).compression)
+
+if __name__ == "__main__":
+    unittest.main()